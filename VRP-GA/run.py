@@ -1,7 +1,16 @@
+import os
+import sys
 import pygame
 import math
-from agent import VRPAgentGenetic
-from environment import VRPEnvironment
+import numpy as np
+
+# Visual front end for the localsearch package at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from localsearch.vrp.ga import VRPAgentGenetic, RouteGASolver
+from localsearch.vrp.environment import VRPEnvironment
+from localsearch.metrics import SolverMetrics, Profiler
+from localsearch.checkpoint import AutoCheckpointer, read_checkpoint, restore_checkpoint
+from localsearch.recorder import TraceRecorder
 
 pygame.init()
 
@@ -17,11 +26,59 @@ clock = pygame.time.Clock()
 font = pygame.font.SysFont("Arial", 16)
 
 # Create VRP environment and GA agent
-env = VRPEnvironment(sim_width, height, num_deliveries=20)
+# Set seed to an int for a reproducible instance and solve; each part gets its own stream
+seed = None
+env_seed, solver_seed = np.random.SeedSequence(seed).spawn(2)
+# Optional constraints: set a vehicle capacity and/or a time-window length (e.g. 120) to
+# give every delivery a demand and/or a window; late or overloaded routes are penalized.
+capacity = None
+time_window = None
+env = VRPEnvironment(sim_width, height, num_deliveries=20, seed=env_seed,
+                     capacity=capacity, time_window=time_window)
+
+# Road travel costs: set road_nodes_path/road_edges_path to CSV files (`id,x,y` nodes and
+# `tail,head,cost` edges, in window coordinates) to route over a road network instead of
+# straight lines. The cost matrix is cached in road_cache_dir and reused by later runs.
+road_nodes_path = None
+road_edges_path = None
+road_cache_dir = "road_cache"
+
 num_vehicles = 3
 population_size = 100
 mutation_rate = 0.02
-agent = VRPAgentGenetic(env.depot, env.deliveries, num_vehicles, population_size, mutation_rate)
+# Memetic step: routes per generation polished with 2-opt/Or-opt local search (0 = plain GA)
+local_search_budget = 5
+# Steady-state mode: children replace the worst routes in place instead of a new population each generation
+steady_state = False
+# Stopping rules: a vehicle stops after `stagnation_limit` generations without improvement or once
+# its population diversity (sampled edge overlap) drops below `min_diversity`; None disables a rule
+stagnation_limit = 40
+min_diversity = 0.02
+
+# Instrumentation: hot-path counters are cheap; profilers are off unless enabled here
+collect_metrics = True
+profile_cpu = False
+profile_memory = False
+profiler = Profiler(cpu=profile_cpu, memory=profile_memory)
+
+# Convergence traces: one recorder per vehicle solver feeds the curves in the top area. Set
+# trace_path to e.g. "ga_trace_{vehicle}.jsonl" (or .npz) to also write them to files.
+trace_path = None
+traces = []
+
+def make_trace(index):
+    path = None if trace_path is None else trace_path.format(vehicle=index + 1)
+    trace = TraceRecorder(RouteGASolver.TRACE_FIELDS, path=path)
+    traces.append(trace)
+    return trace
+
+distance_fn = env.road_distances(road_nodes_path, road_edges_path, road_cache_dir)
+agent = VRPAgentGenetic(env.depot, env.deliveries, num_vehicles, population_size, mutation_rate,
+                        metrics_factory=SolverMetrics if collect_metrics else None, seed=solver_seed,
+                        local_search_budget=local_search_budget, steady_state=steady_state,
+                        stagnation_limit=stagnation_limit, min_diversity=min_diversity,
+                        trace_factory=make_trace, constraints=env.constraints(distance_fn),
+                        distance_fn=distance_fn)
 
 # GA simulation control variables
 simulate = False       # Flag to start GA simulation (run generations)
@@ -29,6 +86,29 @@ vehicle_simulation_started = False  # Flag to start vehicle movement
 generation = 0
 max_generations = 200  # Run GA for a fixed number of generations
 
+# Checkpointing: set a path to save the GA every `checkpoint_every` generations.
+# If the file exists at startup the run resumes from it exactly where it stopped.
+checkpoint_path = None
+checkpoint_every = 20
+checkpointer = None
+if checkpoint_path is not None:
+    checkpointer = AutoCheckpointer(checkpoint_path, every=checkpoint_every)
+    if os.path.exists(checkpoint_path):
+        payload = read_checkpoint(checkpoint_path)
+        env.depot = payload["extra"]["depot"]
+        env.deliveries = payload["extra"]["deliveries"]
+        env.demands = payload["extra"].get("demands")
+        env.time_windows = payload["extra"].get("time_windows")
+        distance_fn = env.road_distances(road_nodes_path, road_edges_path, road_cache_dir)
+        agent = VRPAgentGenetic(env.depot, env.deliveries, num_vehicles, population_size, mutation_rate,
+                                metrics_factory=SolverMetrics if collect_metrics else None, seed=solver_seed,
+                                local_search_budget=local_search_budget, steady_state=steady_state,
+                                stagnation_limit=stagnation_limit, min_diversity=min_diversity,
+                                trace_factory=make_trace, constraints=env.constraints(distance_fn),
+                                distance_fn=distance_fn)
+        generation = restore_checkpoint(payload, [agent])["generation"]
+        simulate = generation < max_generations
+
 # Buttons
 button_rect = pygame.Rect(10, 10, 150, 40)      # "Solve VRP" button (top area)
 button_color = (0, 128, 255)
@@ -118,7 +198,8 @@ base_explanation = [
     "",
     "Instructions:",
     "- Click 'Solve VRP' (top) to run GA optimization.",
-    f"- GA runs for {max_generations} generations.",
+    f"- GA runs for up to {max_generations} generations,",
+    "  stopping early once every vehicle has converged.",
     "- After GA, click 'Start Simulation' (bottom)",
     "  to animate vehicles.",
     "",
@@ -161,15 +242,23 @@ while running:
             if event.button == 1 and button_sim_rect.collidepoint(event.pos) and vehicles and not vehicle_simulation_started:
                 vehicle_simulation_started = True
 
-    # Run GA simulation if active and generation count is below threshold
-    if simulate and generation < max_generations:
-        agent.run_generation()
+    # Run GA simulation if active, below the generation limit and not yet converged
+    finished = simulate and (generation >= max_generations or agent.is_converged())
+    if simulate and not finished:
+        with profiler:
+            agent.run_generation()
         generation += 1
-    elif simulate and generation >= max_generations:
+        if checkpointer is not None:
+            checkpointer.step([agent], {"depot": env.depot, "deliveries": env.deliveries,
+                                        "demands": env.demands, "time_windows": env.time_windows,
+                                        "generation": generation})
+    elif finished:
         simulate = False
         # GA finished: create vehicles from best routes
         best_routes = agent.get_best_routes()
         vehicles = [Vehicle(route, speed=2.0) for route in best_routes]
+        if profile_cpu or profile_memory:
+            print(profiler.report())
 
     # Update vehicles if simulation has started
     if vehicles and vehicle_simulation_started:
@@ -199,6 +288,14 @@ while running:
             p1 = transform_point(route[j], 0, sim_width, top_area_height)
             p2 = transform_point(route[j+1], 0, sim_width, top_area_height)
             pygame.draw.line(screen, color, p1, p2, 2)
+    # Best-distance curve per vehicle, read from the trace recorders
+    chart_rect = pygame.Rect(sim_width - 210, 10, 200, 80)
+    pygame.draw.rect(screen, (10, 10, 10), chart_rect)
+    for i, solver in enumerate(agent.solvers):
+        if solver.trace is not None:
+            points = solver.trace.curve_points("best_distance", chart_rect)
+            if len(points) > 1:
+                pygame.draw.lines(screen, vehicle_colors[i % len(vehicle_colors)], False, points, 1)
     # Draw "Solve VRP" button in top area if GA hasn't started
     if not simulate and not vehicles:
         pygame.draw.rect(screen, button_color, button_rect)
@@ -236,8 +333,17 @@ while running:
     # Add GA metrics for each vehicle solver
     ga_info = []
     for i, solver in enumerate(agent.solvers):
-        avg_fit = sum(solver.fitness_values) / len(solver.fitness_values)
+        avg_fit = solver.population_stats()["average"]
         ga_info.append(f"Vehicle {i+1}: Gen {solver.generation}  Max Fit: {solver.best_fitness:.4f}  Avg Fit: {avg_fit:.4f}")
+        status = solver.convergence() or f"stagnant {solver.generation - solver.last_improvement}"
+        ga_info.append(f"  Diversity: {solver.diversity():.2f}  Duplicates: {solver.duplicates_removed}  ({status})")
+        metrics = solver.get_metrics()
+        if metrics is not None:
+            ga_info.append(f"  Evals: {metrics['evaluations']}  Cache hits: {metrics['cache_hits']}"
+                           f"  Gen/s: {metrics['iterations_per_second']:.1f}")
+    if agent.constraints is not None:
+        feasible = sum(solver.violation(solver.best_solution) == (0.0, 0) for solver in agent.solvers)
+        ga_info.append(f"Feasible routes: {feasible}/{len(agent.solvers)}  Unassigned stops: {len(agent.unassigned)}")
     explanation_lines.extend(["", "GA Metrics:"] + ga_info)
     y_offset = 10
     for line in explanation_lines:
@@ -247,4 +353,7 @@ while running:
     
     pygame.display.flip()
 
+profiler.stop()
+for trace in traces:
+    trace.close()
 pygame.quit()
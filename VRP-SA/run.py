@@ -1,7 +1,16 @@
+import os
+import sys
 import pygame
 import math
-from agent import VRPAgentSimulatedAnnealing, SAOptimizer
-from environment import VRPEnvironment
+import numpy as np
+
+# Visual front end for the localsearch package at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from localsearch.vrp.sa import VRPAgentSimulatedAnnealing, SAOptimizer
+from localsearch.vrp.environment import VRPEnvironment
+from localsearch.metrics import SolverMetrics, Profiler
+from localsearch.checkpoint import AutoCheckpointer, read_checkpoint, restore_checkpoint
+from localsearch.recorder import TraceRecorder
 
 # Set overall window dimensions to 800x800 for the left area and 400x for the right panel.
 sim_width = 600          # Left side width (for SA process and path simulation)
@@ -16,15 +25,70 @@ clock = pygame.time.Clock()
 font = pygame.font.SysFont("Arial", 16)
 
 # Create the VRP environment (dimensions for drawing: use sim_width x height for left area)
-env = VRPEnvironment(sim_width, height, num_deliveries=15)
+# Set seed to an int for a reproducible instance and solve; each part gets its own stream
+seed = None
+env_seed, solver_seed = np.random.SeedSequence(seed).spawn(2)
+# Optional constraints: set a vehicle capacity and/or a time-window length (e.g. 120) to
+# give every delivery a demand and/or a window; routes are then kept feasible.
+capacity = None
+time_window = None
+env = VRPEnvironment(sim_width, height, num_deliveries=15, seed=env_seed,
+                     capacity=capacity, time_window=time_window)
+
+# Road travel costs: set road_nodes_path/road_edges_path to CSV files (`id,x,y` nodes and
+# `tail,head,cost` edges, in window coordinates) to route over a road network instead of
+# straight lines. The cost matrix is cached in road_cache_dir and reused by later runs.
+road_nodes_path = None
+road_edges_path = None
+road_cache_dir = "road_cache"
 
 # Global variables
 routes = None           
+unassigned = []         # stops the constraints left out of every route
 optimizers = []         
 vehicles = []           
 optimization_running = False  
 vehicle_simulation_started = False  # Flag for starting vehicle simulation
 
+# Instrumentation: hot-path counters are cheap; profilers are off unless enabled here
+collect_metrics = True
+profile_cpu = False
+profile_memory = False
+profiler = Profiler(cpu=profile_cpu, memory=profile_memory)
+
+# Convergence traces: one recorder per optimizer feeds the curves in the top area. Set
+# trace_path to e.g. "sa_trace_{vehicle}.jsonl" (or .npz) to also write them to files.
+trace_path = None
+traces = []
+
+def make_trace(index):
+    path = None if trace_path is None else trace_path.format(vehicle=index + 1)
+    trace = TraceRecorder(SAOptimizer.TRACE_FIELDS, path=path)
+    traces.append(trace)
+    return trace
+
+# Checkpointing: set a path to save all optimizers every `checkpoint_every` SA steps.
+# If the file exists at startup the run resumes from it exactly where it stopped.
+checkpoint_path = None
+checkpoint_every = 1000
+checkpointer = None
+if checkpoint_path is not None:
+    checkpointer = AutoCheckpointer(checkpoint_path, every=checkpoint_every)
+    if os.path.exists(checkpoint_path):
+        payload = read_checkpoint(checkpoint_path)
+        env.depot = payload["extra"]["depot"]
+        env.deliveries = payload["extra"]["deliveries"]
+        env.demands = payload["extra"].get("demands")
+        env.time_windows = payload["extra"].get("time_windows")
+        unassigned = payload["extra"].get("unassigned", [])
+        distance_fn = env.road_distances(road_nodes_path, road_edges_path, road_cache_dir)
+        constraints = env.constraints(distance_fn)
+        optimizers = [SAOptimizer(state["route"], metrics=SolverMetrics() if collect_metrics else None,
+                                  trace=make_trace(k), constraints=constraints, distance_fn=distance_fn)
+                      for k, state in enumerate(payload["solvers"])]
+        restore_checkpoint(payload, optimizers)
+        optimization_running = True
+
 # Button for SA optimization in the top area
 button_rect = pygame.Rect(10, 10, 150, 40)
 button_color = (0, 128, 255)
@@ -154,9 +218,15 @@ while running:
             # If "Solve VRP" button in top area is clicked (and SA hasn't started)
             if event.button == 1 and button_rect.collidepoint(event.pos) and not optimization_running:
                 num_vehicles = 3
-                agent = VRPAgentSimulatedAnnealing(env.depot, env.deliveries, num_vehicles)
+                distance_fn = env.road_distances(road_nodes_path, road_edges_path, road_cache_dir)
+                agent = VRPAgentSimulatedAnnealing(env.depot, env.deliveries, num_vehicles,
+                                                   constraints=env.constraints(distance_fn),
+                                                   distance_fn=distance_fn)
                 routes = agent.compute_initial_routes()
-                optimizers = [SAOptimizer(route) for route in routes]
+                unassigned = agent.unassigned
+                optimizers = agent.create_optimizers(
+                    routes, seed=solver_seed, metrics_factory=SolverMetrics if collect_metrics else None,
+                    trace_factory=make_trace)
                 optimization_running = True
                 vehicles = []
                 vehicle_simulation_started = False
@@ -166,12 +236,19 @@ while running:
 
     # Update SA process if running
     if optimization_running:
-        for optimizer in optimizers:
-            if not optimizer.is_finished():
-                optimizer.update()
+        with profiler:
+            for optimizer in optimizers:
+                if not optimizer.is_finished():
+                    optimizer.update()
+        if checkpointer is not None:
+            checkpointer.step(optimizers, {"depot": env.depot, "deliveries": env.deliveries,
+                                          "demands": env.demands, "time_windows": env.time_windows,
+                                          "unassigned": unassigned})
         if all(optimizer.is_finished() for optimizer in optimizers):
             optimization_running = False
             vehicles = [Vehicle(optimizer.best_route, speed=2.0) for optimizer in optimizers]
+            if profile_cpu or profile_memory:
+                print(profiler.report())
     # Update vehicles only if SA is finished and simulation has started
     if not optimization_running and vehicles and vehicle_simulation_started:
         for vehicle in vehicles:
@@ -208,6 +285,15 @@ while running:
                     p1 = transform_point(route[j], top_offset_y)
                     p2 = transform_point(route[j+1], top_offset_y)
                     pygame.draw.line(screen, color, p1, p2, 2)
+    # Best-distance curve per vehicle, read from the trace recorders
+    if optimizers:
+        chart_rect = pygame.Rect(sim_width - 210, 10, 200, 80)
+        pygame.draw.rect(screen, (10, 10, 10), chart_rect)
+        for i, optimizer in enumerate(optimizers):
+            if optimizer.trace is not None:
+                points = optimizer.trace.curve_points("best_distance", chart_rect)
+                if len(points) > 1:
+                    pygame.draw.lines(screen, vehicle_colors[i % len(vehicle_colors)], False, points, 1)
     # Draw "Solve VRP" button in top area if SA hasn't started
     if not optimization_running and not vehicles:
         pygame.draw.rect(screen, button_color, button_rect)
@@ -263,6 +349,14 @@ while running:
                     f" Best D: {state['best_distance']:.1f}")
             explanation_lines.append("")
             explanation_lines.extend(info)
+            metrics = optimizer.get_metrics()
+            if metrics is not None:
+                move = "swap" if optimizer.constraints is None else "relocate"
+                explanation_lines.append(
+                    f" Accepted: {metrics['accepted'].get(move, 0)}/{metrics['proposed'].get(move, 0)}"
+                    f"  It/s: {metrics['iterations_per_second']:.0f}")
+    if unassigned:
+        explanation_lines.extend(["", f"Unassigned stops: {len(unassigned)}"])
     line_height = 20
     for i, line in enumerate(explanation_lines):
         text_surface = font.render(line, True, (255, 255, 255))
@@ -270,4 +364,7 @@ while running:
     
     pygame.display.flip()
 
+profiler.stop()
+for trace in traces:
+    trace.close()
 pygame.quit()
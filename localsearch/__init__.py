@@ -0,0 +1,9 @@
+"""
+Local search solvers: vehicle routing by simulated annealing and by a genetic algorithm
+(localsearch.vrp) and robot task scheduling by a genetic algorithm (localsearch.tasks),
+plus the shared instrumentation, checkpoint and trace modules.
+
+Solver and environment modules need only numpy. pygame is imported lazily by the drawing
+helpers, so a headless worker never loads SDL. Nothing is imported here; import the
+module you need, e.g. `from localsearch.vrp.sa import SAOptimizer`.
+"""
@@ -0,0 +1,79 @@
+import os
+import pickle
+import time
+import zlib
+
+MAGIC = b"LSCK"
+VERSION = 2
+
+
+def save_checkpoint(path, solvers, extra=None):
+    """
+    Write the full state of `solvers` (objects with state_dict(), which includes
+    each solver's own RNG state) to `path` as a compressed pickle. The file is
+    replaced atomically, so an eviction mid-write leaves the previous checkpoint intact.
+    extra: optional picklable data needed to rebuild the run (e.g. the instance).
+    """
+    payload = {
+        "version": VERSION,
+        "solvers": [solver.state_dict() for solver in solvers],
+        "extra": extra,
+    }
+    data = MAGIC + zlib.compress(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_checkpoint(path):
+    """Load a checkpoint payload without applying it."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} is not a solver checkpoint")
+    payload = pickle.loads(zlib.decompress(data[len(MAGIC):]))
+    if payload.get("version") != VERSION:
+        raise ValueError(f"Unsupported checkpoint version: {payload.get('version')}")
+    return payload
+
+
+def restore_checkpoint(payload, solvers):
+    """
+    Apply a payload from read_checkpoint to already constructed solvers, so the run
+    continues exactly as if it had never stopped.
+    Returns the payload's extra data.
+    """
+    if len(payload["solvers"]) != len(solvers):
+        raise ValueError(f"Checkpoint holds {len(payload['solvers'])} solvers, got {len(solvers)}")
+    for solver, state in zip(solvers, payload["solvers"]):
+        solver.load_state_dict(state)
+    return payload["extra"]
+
+
+class AutoCheckpointer:
+    """
+    Saves a checkpoint every `every` steps and/or every `interval` seconds.
+    Call step() once per solver iteration / generation.
+    """
+    def __init__(self, path, every=None, interval=None):
+        self.path = path
+        self.every = every
+        self.interval = interval
+        self.steps = 0
+        self.last_save = time.monotonic()
+
+    def step(self, solvers, extra=None):
+        self.steps += 1
+        due = self.every is not None and self.steps % self.every == 0
+        if not due and self.interval is not None:
+            due = time.monotonic() - self.last_save >= self.interval
+        if due:
+            self.save(solvers, extra)
+        return due
+
+    def save(self, solvers, extra=None):
+        save_checkpoint(self.path, solvers, extra)
+        self.last_save = time.monotonic()
@@ -0,0 +1,108 @@
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+
+
+class SolverMetrics:
+    """
+    Hot-path counters for one solver.
+    Solvers take an optional metrics object and skip all bookkeeping when it is None,
+    so leaving metrics off costs a single `is None` check per step.
+    """
+    def __init__(self):
+        self.proposed = {}       # move type -> number of moves proposed
+        self.accepted = {}       # move type -> number of moves accepted
+        self.evaluations = 0     # objective / fitness evaluations actually computed
+        self.cache_hits = 0      # evaluations answered from a cache
+        self.phase_time = {}     # phase name -> seconds spent
+        self.iterations = 0      # SA iterations or GA generations
+        self.start_time = time.perf_counter()
+
+    def propose(self, move_type, count=1):
+        self.proposed[move_type] = self.proposed.get(move_type, 0) + count
+
+    def accept(self, move_type, count=1):
+        self.accepted[move_type] = self.accepted.get(move_type, 0) + count
+
+    def add_phase_time(self, phase, seconds):
+        self.phase_time[phase] = self.phase_time.get(phase, 0.0) + seconds
+
+    def elapsed(self):
+        return time.perf_counter() - self.start_time
+
+    def iterations_per_second(self):
+        elapsed = self.elapsed()
+        return self.iterations / elapsed if elapsed > 0 else 0.0
+
+    def reset(self):
+        self.__init__()
+
+    def snapshot(self):
+        """Return a plain-dict copy of the counters for display or logging."""
+        return {
+            "iterations": self.iterations,
+            "iterations_per_second": self.iterations_per_second(),
+            "elapsed": self.elapsed(),
+            "evaluations": self.evaluations,
+            "cache_hits": self.cache_hits,
+            "proposed": dict(self.proposed),
+            "accepted": dict(self.accepted),
+            "phase_time": dict(self.phase_time),
+        }
+
+
+class Profiler:
+    """
+    Opt-in cProfile / tracemalloc hooks around blocks of solver work.
+    Used as a context manager; with both flags off, entering and leaving does nothing.
+    The same profiler can wrap many blocks (e.g. one per frame) and accumulates across them.
+    """
+    def __init__(self, cpu=False, memory=False):
+        self.cpu = cpu
+        self.memory = memory
+        self.memory_current = 0
+        self.memory_peak = 0
+        self._profile = cProfile.Profile() if cpu else None
+        self._started_tracing = False
+
+    def __enter__(self):
+        if self._profile is not None:
+            self._profile.enable()
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._profile is not None:
+            self._profile.disable()
+        if self.memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            self.memory_current = current
+            self.memory_peak = max(self.memory_peak, peak)
+        return False
+
+    def stop(self):
+        """Stop tracemalloc if this profiler started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def report(self, limit=20, sort="cumulative"):
+        """Return a text report of the collected profile and memory figures."""
+        lines = []
+        if self._profile is not None:
+            stream = io.StringIO()
+            pstats.Stats(self._profile, stream=stream).sort_stats(sort).print_stats(limit)
+            lines.append(stream.getvalue())
+        if self.memory:
+            lines.append(f"Memory: current {self.memory_current / 1024:.1f} KiB, "
+                         f"peak {self.memory_peak / 1024:.1f} KiB")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        """Write raw cProfile stats to a file readable by pstats / snakeviz."""
+        if self._profile is not None:
+            self._profile.dump_stats(path)
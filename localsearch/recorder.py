@@ -0,0 +1,155 @@
+import json
+import threading
+
+import numpy as np
+
+
+class TraceRecorder:
+    """
+    Convergence trace for one solver, cheap enough to leave on in production runs.
+
+    Solvers call record() only once their iteration reaches `next_record`, so an
+    iteration that is not recorded costs one attribute comparison. Each recorded row
+    (iteration plus one value per field) is written into a preallocated ring buffer;
+    nothing is appended or printed per iteration.
+
+    Downsampling is adaptive: a compacted whole-run history holds at most `capacity`
+    rows. Whenever it fills, every other row is dropped and the recording stride
+    doubles, so a run of any length keeps between capacity / 2 and capacity evenly
+    spaced points, and recording gets cheaper the longer the run goes.
+
+    With a `path`, a background thread drains the ring to a JSONL file (appended as
+    the run goes) or collects it for an .npz file (written by close()).
+    """
+    def __init__(self, fields, capacity=2048, every=1, path=None, flush_interval=1.0):
+        if capacity < 2 or capacity % 2:
+            raise ValueError(f"capacity must be an even number >= 2, got {capacity}")
+        if path is not None and not path.endswith((".jsonl", ".npz")):
+            raise ValueError(f"Trace path must end in .jsonl or .npz, got {path!r}")
+        self.fields = tuple(fields)
+        self.columns = ("iteration",) + self.fields
+        self.capacity = capacity
+        self.every = every        # current recording stride, in solver iterations
+        self.next_record = 0      # solvers call record() once their iteration reaches this
+        self.origin = 0           # iteration of the first row; rows lie on origin + k * every
+        self.ring = np.zeros((capacity, len(self.columns)))
+        self.written = 0          # rows ever written to the ring
+        self.flushed = 0          # rows already handed to the output file
+        self.dropped = 0          # rows overwritten before the writer got to them
+        self.history = np.zeros((capacity, len(self.columns)))
+        self.history_size = 0
+        self.path = path
+        self.flush_interval = flush_interval
+        self._chunks = []         # flushed rows waiting for the .npz file
+        self._lock = threading.Lock()  # serializes flushes and file writes
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        if path is not None:
+            if path.endswith(".jsonl"):
+                open(path, "w").close()
+            self._thread = threading.Thread(target=self._flush_loop, name="trace-flush", daemon=True)
+            self._thread.start()
+
+    def record(self, iteration, values):
+        """Store one row; `values` holds one number per field."""
+        if self.written == 0:
+            self.origin = iteration
+        row = self.ring[self.written % self.capacity]
+        row[0] = iteration
+        row[1:] = values
+        self.written += 1
+        self.history[self.history_size] = row
+        self.history_size += 1
+        if self.history_size == self.capacity:
+            # Keep rows 0, 2, 4, ... and record half as often from now on
+            half = self.capacity // 2
+            self.history[:half] = self.history[0::2]
+            self.history_size = half
+            self.every *= 2
+        # Back onto the grid of the (possibly doubled) stride, so the rows a halving keeps
+        # stay evenly spaced
+        self.next_record = iteration + self.every - (iteration - self.origin) % self.every
+        if self._thread is not None and self.written - self.flushed >= self.capacity // 2:
+            self._wake.set()  # the writer is falling behind; do not wait for the interval
+
+    def recent(self, count=None):
+        """The last `count` recorded rows (all rows still in the ring by default), oldest first."""
+        available = min(self.written, self.capacity)
+        count = available if count is None else min(count, available)
+        index = np.arange(self.written - count, self.written) % self.capacity
+        return self.ring[index]
+
+    def curve(self, field):
+        """(iterations, values) of `field` over the whole run, at the current resolution."""
+        rows = self.history[:self.history_size]
+        return rows[:, 0], rows[:, self.columns.index(field)]
+
+    def curve_points(self, field, rect):
+        """
+        The curve of `field` scaled into rect = (x, y, width, height) as integer screen
+        points, for the pygame panels. Fewer than two points means nothing to draw.
+        """
+        iterations, values = self.curve(field)
+        finite = np.isfinite(values)
+        iterations, values = iterations[finite], values[finite]
+        if len(values) < 2:
+            return []
+        x, y, width, height = rect
+        span_x = max(iterations[-1] - iterations[0], 1e-12)
+        low, high = values.min(), values.max()
+        span_y = max(high - low, 1e-12)
+        xs = x + (iterations - iterations[0]) / span_x * (width - 1)
+        ys = y + (high - values) / span_y * (height - 1)
+        return list(zip(xs.astype(int).tolist(), ys.astype(int).tolist()))
+
+    def flush(self):
+        """Write rows recorded since the last flush to the output file. Safe from any thread."""
+        if self.path is None:
+            return
+        with self._lock:
+            written = self.written
+            # record() may be overwriting the slot of row `written` (the oldest one in the
+            # ring) right now, so that slot is never read
+            start = max(self.flushed, written - self.capacity + 1)
+            rows = self.ring[np.arange(start, written) % self.capacity]  # fancy indexing copies
+            # Rows the solver overwrote while they were copied are dropped, not written torn
+            valid = min(written, max(start, self.written - self.capacity + 1))
+            rows = rows[valid - start:]
+            self.dropped += valid - self.flushed
+            self.flushed = written
+            if not len(rows):
+                return
+            if self.path.endswith(".jsonl"):
+                with open(self.path, "a") as f:
+                    for values in rows.tolist():
+                        entry = dict(zip(self.columns, values))
+                        entry["iteration"] = int(entry["iteration"])
+                        f.write(json.dumps(entry) + "\n")
+            else:
+                self._chunks.append(rows)
+
+    def _flush_loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def close(self):
+        """Stop the writer thread and write everything still buffered."""
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        if self.path is not None and self.path.endswith(".npz"):
+            with self._lock:
+                rows = np.concatenate(self._chunks) if self._chunks else np.zeros((0, len(self.columns)))
+                np.savez(self.path, **{name: rows[:, k] for k, name in enumerate(self.columns)})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
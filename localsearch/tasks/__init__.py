@@ -0,0 +1,4 @@
+"""
+Robot task scheduling: the instance and event generator (environment), the genetic
+scheduler (agent) and shared-memory parallel fitness evaluation (parallel).
+"""
@@ -0,0 +1,520 @@
+import heapq
+import time
+
+import numpy as np
+
+class Agent:
+    def __init__(self, id, efficiency):
+        self.id = id  # Unique identifier for each robot
+        self.efficiency = efficiency  # Efficiency factor of the robot
+        self.tasks = []  # List of tasks assigned to this robot
+
+    def assign_task(self, task_duration, task_priority):
+        """
+        Assign a task to the robot and calculate effective task time
+        considering robot efficiency and task priority.
+        """
+        effective_time = task_duration / self.efficiency * task_priority
+        self.tasks.append(effective_time)
+
+    def total_time(self):
+        """Calculate the total time required by this robot to complete all tasks."""
+        return sum(self.tasks)
+
+    def reset_tasks(self):
+        """Clear the tasks assigned to the agent."""
+        self.tasks = []
+
+
+class GeneticScheduler:
+    """
+    Genetic algorithm over task -> robot assignments.
+    Each individual is a row of the population matrix whose i-th entry is the robot assigned to task i.
+    Fitness (to minimize) is the makespan plus the standard deviation of robot times,
+    where each task costs duration / efficiency * priority on its robot.
+    """
+    # Values written to a trace recorder, in order
+    TRACE_FIELDS = ("best_fitness", "current_fitness", "avg_fitness", "diversity")
+
+    def __init__(self, task_durations, task_priorities, robot_efficiencies, population,
+                 population_size=50, mutation_rate=0.1, metrics=None, cache_size=10000, seed=None,
+                 steady_state=False, offspring_per_step=2, eliminate_duplicates=True,
+                 stagnation_limit=None, min_diversity=None, trace=None, evaluator=None):
+        # seed: int, SeedSequence or Generator for this GA's own RNG
+        # steady_state: breed a few children at a time into a preallocated buffer and overwrite
+        # the worst rows in place instead of building a new population matrix every generation
+        # eliminate_duplicates: re-mutate children that repeat a row already in the new population
+        # stagnation_limit, min_diversity: stopping rules checked by convergence(); None disables
+        # trace: optional TraceRecorder over TRACE_FIELDS, written after a generation when due
+        # evaluator: optional whole-population scorer with set_problem(), allocate() and
+        # evaluate() (e.g. parallel.SharedEvaluator); used instead of the per-individual loop in
+        # evaluate(). Populations are then built in the arrays it allocates, so it scores them
+        # without copying
+        self.rng = np.random.default_rng(seed)
+        self.task_durations = task_durations
+        self.task_priorities = task_priorities
+        self.robot_efficiencies = robot_efficiencies
+        self.num_tasks = len(task_durations)
+        self.num_robots = len(robot_efficiencies)
+        self.population = np.array(population)
+        self.population_size = population_size
+        self.mutation_rate = mutation_rate
+        self.metrics = metrics  # optional SolverMetrics; skipped when None
+        self.trace = trace
+        # Fitness cache keyed by the assignment bytes; selection and best-tracking
+        # score the same individuals repeatedly. Cleared when full.
+        self.cache_size = cache_size
+        self.fitness_cache = {}
+        self.generation = 0
+        self.best_solution = None
+        self.best_fitness = float('inf')
+        self.current_best = None
+        self.current_fitness = float('inf')
+        self.steady_state = steady_state
+        self.offspring_per_step = offspring_per_step
+        # Incremental population statistics, built on the first steady-state generation
+        self.fitness_values = None
+        self.fitness_sum = 0.0
+        self.member_counts = {}  # assignment bytes -> copies in the population
+        self._worst_heap = None  # (-fitness, row) min-heap, so the worst row is on top
+        self._children = None
+        self.eliminate_duplicates = eliminate_duplicates
+        self.duplicates_removed = 0
+        self.stagnation_limit = stagnation_limit
+        self.min_diversity = min_diversity
+        self.last_improvement = 0  # generation of the last best-fitness improvement
+        # Robots that may take tasks (all of them unless repair() says otherwise) and each
+        # robot's position in that array
+        self.robots = np.arange(self.num_robots)
+        self._slots = np.arange(self.num_robots)
+        # Scores of the current population, reused by the next selection
+        self.population_fitness = None
+        self.evaluator = evaluator
+        if evaluator is not None:
+            evaluator.set_problem(task_durations, task_priorities, robot_efficiencies, self.robots)
+            self.population = self._adopt(self.population)
+
+    def fitness(self, individual):
+        key = individual.tobytes()
+        value = self.fitness_cache.get(key)
+        if value is not None:
+            if self.metrics is not None:
+                self.metrics.cache_hits += 1
+            return value
+        robot_times = np.zeros(self.num_robots)
+        for task, robot in enumerate(individual):
+            duration = self.task_durations[task]
+            priority = self.task_priorities[task]
+            robot_times[robot] += duration / self.robot_efficiencies[robot] * priority
+        robot_times = robot_times[self.robots]
+        total_time = np.max(robot_times)
+        workload_balance = np.std(robot_times)
+        value = total_time + workload_balance
+        if self.metrics is not None:
+            self.metrics.evaluations += 1
+        if len(self.fitness_cache) >= self.cache_size:
+            self.fitness_cache.clear()
+        self.fitness_cache[key] = value
+        return value
+
+    def _allocate(self, shape, dtype):
+        """Empty population matrix, on the evaluator's shared memory when there is one."""
+        if self.evaluator is None:
+            return np.empty(shape, dtype=dtype)
+        return self.evaluator.allocate(shape, dtype)
+
+    def _adopt(self, population):
+        """`population` copied into a matrix from _allocate."""
+        adopted = self._allocate(population.shape, population.dtype)
+        np.copyto(adopted, population)
+        return adopted
+
+    def evaluate(self, population):
+        """Fitness of every row of `population`."""
+        if self.evaluator is not None:
+            if self.metrics is not None:
+                self.metrics.evaluations += len(population)
+            return self.evaluator.evaluate(population)
+        return np.array([self.fitness(individual) for individual in population])
+
+    def selection(self):
+        """Keep the fitter half of the population."""
+        fitness_values = self.population_fitness
+        if fitness_values is None:
+            fitness_values = self.evaluate(self.population)
+        order = np.argsort(fitness_values, kind="stable")
+        return self.population[order[:self.population_size // 2]]
+
+    def crossover(self, parents1, parents2, points, out=None):
+        """Single-point crossover of each row pair at the matching entry of `points` (into `out` if given)."""
+        head = np.arange(self.num_tasks) < points[:, None]
+        if out is None:
+            return np.where(head, parents1, parents2)
+        np.copyto(out, parents2)
+        np.copyto(out, parents1, where=head)
+        return out
+
+    def mutate(self, children, mask):
+        """Reassign the tasks selected by `mask` to random robots, in place."""
+        children[mask] = self.robots[self.rng.integers(0, len(self.robots), size=int(mask.sum()))]
+        return children
+
+    def repair(self, task_durations, task_priorities, columns, robots=None):
+        """
+        Warm-start after the problem changed (see Environment.advance) instead of solving
+        from scratch. columns[i] is the previous column of task i, or -1 for a new task;
+        robots lists the robots that may take tasks (default all). Every row keeps its
+        surviving assignments; only new tasks and tasks on robots that went offline are
+        reassigned, greedily in the best solution (which is copied into row 0) and at
+        random in the other rows, so the evolved population and its diversity carry over.
+        """
+        metrics = self.metrics
+        if metrics is not None:
+            t0 = time.perf_counter()
+        self.task_durations = task_durations
+        self.task_priorities = task_priorities
+        self.num_tasks = len(task_durations)
+        if robots is not None:
+            self.robots = np.asarray(robots)
+            self._slots = np.zeros(self.num_robots, dtype=np.intp)
+            self._slots[self.robots] = np.arange(len(self.robots))
+        online = np.zeros(self.num_robots, dtype=bool)
+        online[self.robots] = True
+        columns = np.asarray(columns)
+        survivors = columns >= 0
+        best = self.population[:1] if self.best_solution is None else self.best_solution[None]
+        best = self._remap(best, columns, survivors)[0]
+        self.population = self._adopt(self._remap(self.population, columns, survivors))
+        affected = ~online[self.population]
+        affected[:, ~survivors] = True
+        count = int(affected.sum())
+        self.population[affected] = self.robots[self.rng.integers(0, len(self.robots), size=count)]
+        self.greedy_assign(best, np.flatnonzero(~survivors | ~online[best]))
+        self.population[0] = best
+        # Old fitness values describe another problem
+        self.fitness_cache.clear()
+        self.fitness_values = None
+        self._worst_heap = None
+        self.population_fitness = None
+        if self.evaluator is not None:
+            self.evaluator.set_problem(task_durations, task_priorities, self.robot_efficiencies, self.robots)
+        self.best_solution = best.copy()
+        self.best_fitness = self.fitness(best)
+        self.current_best = self.best_solution
+        self.current_fitness = self.best_fitness
+        self.last_improvement = self.generation
+        if metrics is not None:
+            metrics.add_phase_time("repair", time.perf_counter() - t0)
+            metrics.propose("repair", count)
+            metrics.accept("repair", count)
+
+    def _remap(self, assignments, columns, survivors):
+        """Rows of `assignments` with columns rearranged per `columns`; new columns are zero."""
+        remapped = np.zeros((len(assignments), len(columns)), dtype=assignments.dtype)
+        remapped[:, survivors] = assignments[:, columns[survivors]]
+        return remapped
+
+    def greedy_assign(self, individual, tasks):
+        """
+        Assign `tasks` of `individual` in place, costliest first, each to the available
+        robot that would finish it earliest given the tasks already placed.
+        """
+        efficiencies = np.asarray(self.robot_efficiencies, dtype=float)
+        work = np.asarray(self.task_durations) * np.asarray(self.task_priorities)
+        placed = np.ones(self.num_tasks, dtype=bool)
+        placed[tasks] = False
+        robot_times = np.zeros(self.num_robots)
+        np.add.at(robot_times, individual[placed], work[placed] / efficiencies[individual[placed]])
+        speeds = efficiencies[self.robots]
+        for task in sorted(tasks.tolist(), key=lambda t: -work[t]):
+            slot = int(np.argmin(robot_times[self.robots] + work[task] / speeds))
+            robot = self.robots[slot]
+            individual[task] = robot
+            robot_times[robot] += work[task] / speeds[slot]
+
+    def next_generation(self):
+        """Breed a full new population and update the current and overall best."""
+        if self.num_tasks < 2:
+            # Nothing to cross over; repair() already placed a single task greedily
+            self.generation += 1
+            return
+        if self.steady_state:
+            best_before = self.best_fitness
+            self.steady_state_generation()
+            if self.best_fitness < best_before:
+                self.last_improvement = self.generation
+            if self.trace is not None and self.generation >= self.trace.next_record:
+                self.record_trace(self.fitness_sum / len(self.population))
+            return
+        metrics = self.metrics
+        n = self.population_size
+        if metrics is not None:
+            t0 = time.perf_counter()
+        selected = self.selection()
+        # Draw all parent pairs at once; a non-zero offset keeps the two parents distinct
+        k = len(selected)
+        first = self.rng.integers(0, k, size=n)
+        second = (first + self.rng.integers(1, k, size=n)) % k
+        if metrics is not None:
+            t1 = time.perf_counter()
+        points = self.rng.integers(1, self.num_tasks, size=n)
+        # `selected` is a copy, so the children may overwrite the current population's memory
+        children = self._allocate((n, self.num_tasks), self.population.dtype)
+        self.crossover(selected[first], selected[second], points, out=children)
+        if metrics is not None:
+            t2 = time.perf_counter()
+        mask = self.rng.random((n, self.num_tasks)) < self.mutation_rate
+        self.population = self.mutate(children, mask)
+        if self.eliminate_duplicates:
+            self.remove_duplicates(self.population)
+        if metrics is not None:
+            t3 = time.perf_counter()
+            metrics.add_phase_time("selection", t1 - t0)
+            metrics.add_phase_time("crossover", t2 - t1)
+            metrics.add_phase_time("mutation", t3 - t2)
+            metrics.propose("one_point", n)
+            metrics.accept("one_point", n)
+            changed = int(mask.sum())
+            metrics.propose("reassign", changed)
+            metrics.accept("reassign", changed)
+
+        if metrics is not None:
+            t0 = time.perf_counter()
+        fitness_values = self.evaluate(self.population)
+        self.population_fitness = fitness_values
+        best_index = int(np.argmin(fitness_values))
+        self.current_best = self.population[best_index].copy()
+        self.current_fitness = fitness_values[best_index]
+        if metrics is not None:
+            metrics.add_phase_time("evaluation", time.perf_counter() - t0)
+            metrics.iterations += 1
+        self.generation += 1
+        if self.current_fitness < self.best_fitness:
+            self.best_fitness = self.current_fitness
+            self.best_solution = self.current_best
+            self.last_improvement = self.generation
+        if self.trace is not None and self.generation >= self.trace.next_record:
+            self.record_trace(float(fitness_values.mean()))
+
+    def record_trace(self, average):
+        """Write this generation's fitness and diversity to the trace."""
+        self.trace.record(self.generation, (self.best_fitness, self.current_fitness, average, self.diversity()))
+
+    def remove_duplicates(self, children, max_tries=3):
+        """
+        Hash every row; a row equal to an earlier one gets up to `max_tries` random
+        reassignments (always to a different robot) until it is new, in place.
+        """
+        robots = len(self.robots)
+        if robots < 2:
+            return
+        seen = set()
+        for child in children:
+            key = child.tobytes()
+            if key in seen:
+                self.duplicates_removed += 1
+                tasks = self.rng.integers(0, self.num_tasks, size=max_tries).tolist()
+                shifts = self.rng.integers(1, robots, size=max_tries).tolist()
+                for task, shift in zip(tasks, shifts):
+                    child[task] = self.robots[(self._slots[child[task]] + shift) % robots]
+                    key = child.tobytes()
+                    if key not in seen:
+                        break
+            seen.add(key)
+
+    def diversity(self, samples=16):
+        """
+        Cheap diversity estimate in [0, 1]: the mean Hamming distance (fraction of tasks
+        assigned differently) between `samples` fixed row pairs k and k + rows / 2.
+        Uses no randomness, so checking it never changes a run.
+        """
+        rows = len(self.population)
+        if rows < 2 or self.num_tasks == 0:
+            return 0.0
+        first = np.arange(0, rows, max(1, rows // samples))[:samples]
+        second = (first + rows // 2) % rows
+        return float((self.population[first] != self.population[second]).mean())
+
+    def convergence(self):
+        """Name of the stopping rule that fired ("stagnation" or "low_diversity"), or None."""
+        if self.stagnation_limit is not None and self.generation - self.last_improvement >= self.stagnation_limit:
+            return "stagnation"
+        if self.min_diversity is not None and self.diversity() < self.min_diversity:
+            return "low_diversity"
+        return None
+
+    def get_generation_info(self):
+        """Generation, fitness, diversity and convergence summary of the current population."""
+        stats = self.population_stats()
+        return {
+            "generation": self.generation,
+            "best_fitness": stats["best"],
+            "avg_fitness": stats["average"],
+            "distinct": stats["distinct"],
+            "diversity": self.diversity(),
+            "stagnation": self.generation - self.last_improvement,
+            "duplicates_removed": self.duplicates_removed,
+            "converged": self.convergence(),
+        }
+
+    def start_steady_state(self):
+        """Score the population once and build the statistics steady-state steps keep up to date."""
+        self.population = self._adopt(self.population[:self.population_size])
+        self.fitness_values = self.evaluate(self.population)
+        self.fitness_sum = float(self.fitness_values.sum())
+        self.member_counts = {}
+        for individual in self.population:
+            key = individual.tobytes()
+            self.member_counts[key] = self.member_counts.get(key, 0) + 1
+        # Ties break on the row, so the worst row is the one np.argmax would pick
+        self._worst_heap = [(-value, k) for k, value in enumerate(self.fitness_values.tolist())]
+        heapq.heapify(self._worst_heap)
+        self._children = np.empty((self.offspring_per_step, self.num_tasks), dtype=self.population.dtype)
+        best_index = int(np.argmin(self.fitness_values))
+        self.current_best = self.population[best_index].copy()
+        self.current_fitness = self.fitness_values[best_index]
+        if self.current_fitness < self.best_fitness:
+            self.best_fitness = self.current_fitness
+            self.best_solution = self.current_best
+
+    def steady_state_generation(self):
+        """
+        Breed population_size children, `offspring_per_step` at a time, into a preallocated
+        buffer; each child is copied over the worst row when it is fitter and not already in
+        the population. Parents are binary-tournament winners from the population as it
+        changes. Fitness sum, distinct count and best are updated per replaced row.
+        """
+        if self.fitness_values is None:
+            self.start_steady_state()
+        metrics = self.metrics
+        if metrics is not None:
+            t0 = time.perf_counter()
+        n = self.population_size
+        rows = len(self.population)
+        # Every random number this generation needs is drawn up front
+        entrants = self.rng.integers(0, rows, size=(n, 2, 2))
+        points = self.rng.integers(1, self.num_tasks, size=n)
+        mask = self.rng.random((n, self.num_tasks)) < self.mutation_rate
+        genes = self.robots[self.rng.integers(0, len(self.robots), size=int(mask.sum()))]
+        ends = np.concatenate(([0], np.cumsum(mask.sum(axis=1))))
+        columns = np.arange(self.num_tasks)
+        replaced = 0
+        for first in range(0, n, self.offspring_per_step):
+            last = min(first + self.offspring_per_step, n)
+            children = self._children[:last - first]
+            tournaments = entrants[first:last]
+            winners = np.take_along_axis(
+                tournaments, self.fitness_values[tournaments].argmin(axis=2)[..., None], axis=2)[..., 0]
+            np.copyto(children, self.population[winners[:, 1]])
+            np.copyto(children, self.population[winners[:, 0]], where=columns < points[first:last, None])
+            children[mask[first:last]] = genes[ends[first]:ends[last]]
+            for child in children:
+                replaced += self.replace_worst(child)
+        self.generation += 1
+        if metrics is not None:
+            metrics.add_phase_time("steady_state", time.perf_counter() - t0)
+            metrics.propose("one_point", n)
+            metrics.accept("one_point", replaced)
+            changed = int(mask.sum())
+            metrics.propose("reassign", changed)
+            metrics.accept("reassign", changed)
+            metrics.iterations += 1
+
+    def replace_worst(self, child):
+        """Copy `child` over the worst row if it is fitter and new; returns whether it was."""
+        key = child.tobytes()
+        if key in self.member_counts:
+            self.duplicates_removed += 1
+            return False
+        value = self.fitness(child)
+        worst_value, worst = self._worst_heap[0]
+        if value >= -worst_value:
+            return False
+        slot = self.population[worst]
+        old_key = slot.tobytes()
+        if self.member_counts[old_key] > 1:
+            self.member_counts[old_key] -= 1
+        else:
+            del self.member_counts[old_key]
+        self.member_counts[key] = 1
+        slot[:] = child
+        self.fitness_sum += value - self.fitness_values[worst]
+        self.fitness_values[worst] = value
+        heapq.heapreplace(self._worst_heap, (-float(value), worst))
+        # The population best is never the worst row, so it is also the overall best
+        if value < self.current_fitness:
+            self.current_fitness = value
+            self.current_best = child.copy()
+            if value < self.best_fitness:
+                self.best_fitness = value
+                self.best_solution = self.current_best
+        return True
+
+    def population_stats(self):
+        """Best and average fitness and the fraction of distinct individuals."""
+        size = len(self.population)
+        if self.fitness_values is not None:
+            # Kept up to date by replace_worst
+            average = self.fitness_sum / size
+            distinct = len(self.member_counts)
+        else:
+            average = float(self.evaluate(self.population).mean())
+            distinct = len(np.unique(self.population, axis=0))
+        return {"best": self.best_fitness, "average": average, "distinct": distinct / size}
+
+    def state_dict(self):
+        """Return everything needed to resume this GA exactly (see checkpoint.py)."""
+        return {
+            "population": self.population.copy(),  # steady-state mode overwrites rows in place
+            "population_size": self.population_size,
+            "mutation_rate": self.mutation_rate,
+            "generation": self.generation,
+            "best_solution": self.best_solution,
+            "best_fitness": self.best_fitness,
+            "current_best": self.current_best,
+            "current_fitness": self.current_fitness,
+            "last_improvement": self.last_improvement,
+            "duplicates_removed": self.duplicates_removed,
+            "robots": self.robots.copy(),
+            # Steady-state statistics as replace_worst left them (None before steady state
+            # starts); the running fitness sum would round differently if rebuilt
+            "fitness_values": None if self.fitness_values is None else self.fitness_values.copy(),
+            "worst_heap": None if self._worst_heap is None else self._worst_heap[:],
+            "fitness_sum": self.fitness_sum,
+            "member_counts": dict(self.member_counts),
+            "rng": self.rng.bit_generator.state,
+        }
+
+    def load_state_dict(self, state):
+        """Restore a state produced by state_dict()."""
+        self.population = self._adopt(state["population"])
+        self.population_size = state["population_size"]
+        self.mutation_rate = state["mutation_rate"]
+        self.generation = state["generation"]
+        self.best_solution = state["best_solution"]
+        self.best_fitness = state["best_fitness"]
+        self.current_best = state["current_best"]
+        self.current_fitness = state["current_fitness"]
+        self.last_improvement = state["last_improvement"]
+        self.duplicates_removed = state["duplicates_removed"]
+        self.robots = state["robots"].copy()
+        self._slots = np.zeros(self.num_robots, dtype=np.intp)
+        self._slots[self.robots] = np.arange(len(self.robots))
+        self.rng.bit_generator.state = state["rng"]
+        self.population_fitness = None
+        if self.evaluator is not None:
+            self.evaluator.set_problem(self.task_durations, self.task_priorities, self.robot_efficiencies,
+                                       self.robots)
+        fitness_values = state.get("fitness_values")
+        self.fitness_values = None if fitness_values is None else fitness_values.copy()
+        self._worst_heap = None if state.get("worst_heap") is None else state["worst_heap"][:]
+        self.fitness_sum = state.get("fitness_sum", 0.0)
+        self.member_counts = dict(state.get("member_counts", {}))
+        if self.fitness_values is not None:
+            self._children = np.empty((self.offspring_per_step, self.num_tasks), dtype=self.population.dtype)
+
+    def get_metrics(self):
+        """Return a snapshot of the hot-path counters, or None if metrics are disabled."""
+        if self.metrics is None:
+            return None
+        return self.metrics.snapshot()
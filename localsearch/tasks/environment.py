@@ -0,0 +1,185 @@
+import heapq
+
+import numpy as np
+
+class Environment:
+    def __init__(self, num_tasks, num_robots, seed=None):
+        # seed: int, SeedSequence or Generator for the environment's own RNG
+        self.rng = np.random.default_rng(seed)
+        self.num_tasks = num_tasks
+        self.num_robots = num_robots
+        self.task_durations = self.rng.integers(1, 11, size=num_tasks)
+        self.task_priorities = self.rng.integers(1, 6, size=num_tasks)
+        self.robot_efficiencies = self.rng.uniform(0.5, 1.5, size=num_robots)
+        # Event-driven mode: the active tasks by id (column order of the arrays above),
+        # which robots are online and a queue of timed events, applied by advance()
+        self.time = 0.0
+        self.tasks = {task: (int(d), int(p)) for task, (d, p)
+                      in enumerate(zip(self.task_durations, self.task_priorities))}
+        self.task_ids = list(self.tasks)
+        self.next_task_id = num_tasks
+        self.robots_online = np.ones(num_robots, dtype=bool)
+        self.events = []  # heap of (time, sequence, kind, args)
+        self._sequence = 0
+
+    def schedule_event(self, time, kind, *args):
+        """
+        Queue an event for advance():
+          ("arrive", duration, priority)  a new task; its id is assigned when it arrives
+          ("complete", task) / ("cancel", task)  remove an active task (ignored if already gone)
+          ("offline", robot) / ("online", robot)  take a robot out of or back into service
+        """
+        heapq.heappush(self.events, (time, self._sequence, kind, args))
+        self._sequence += 1
+
+    def generate_events(self, until, arrival_rate=0.5, mean_lifetime=20.0, cancel_probability=0.1,
+                        offline_rate=0.005, repair_time=10.0):
+        """
+        Queue a random event stream up to time `until`: tasks arrive as a Poisson process
+        (durations and priorities drawn as in __init__), every task (including the initial
+        ones) ends after an exponential lifetime, cancelled with `cancel_probability` and
+        completed otherwise, and each robot goes offline at `offline_rate` for `repair_time`.
+        The active task count hovers around arrival_rate * mean_lifetime.
+        """
+        rng = self.rng
+        arrivals = np.sort(rng.uniform(self.time, until, size=rng.poisson(arrival_rate * (until - self.time))))
+        durations = rng.integers(1, 11, size=len(arrivals))
+        priorities = rng.integers(1, 6, size=len(arrivals))
+        for time, duration, priority in zip(arrivals.tolist(), durations.tolist(), priorities.tolist()):
+            self.schedule_event(time, "arrive", duration, priority)
+        # Ids are handed out in arrival order, so the ending of every future task is known now
+        starts = [self.time] * len(self.task_ids) + arrivals.tolist()
+        ids = self.task_ids + list(range(self.next_task_id, self.next_task_id + len(arrivals)))
+        ends = np.asarray(starts) + rng.exponential(mean_lifetime, size=len(starts))
+        cancelled = rng.random(len(starts)) < cancel_probability
+        for task, end, cancel in zip(ids, ends.tolist(), cancelled.tolist()):
+            if end <= until:
+                self.schedule_event(end, "cancel" if cancel else "complete", task)
+        outages = rng.poisson(offline_rate * self.num_robots * (until - self.time))
+        times = rng.uniform(self.time, until, size=outages)
+        robots = rng.integers(0, self.num_robots, size=outages)
+        for time, robot in zip(times.tolist(), robots.tolist()):
+            self.schedule_event(time, "offline", robot)
+            self.schedule_event(time + repair_time, "online", robot)
+
+    def advance(self, until):
+        """
+        Apply every queued event up to time `until`, batched into one change. Returns None
+        if nothing changed, otherwise `columns`: for each active task column, its column
+        before the call, or -1 for a task that arrived (see GeneticScheduler.repair).
+        The last online robot never goes offline.
+        """
+        old_columns = {task: column for column, task in enumerate(self.task_ids)}
+        changed = False
+        while self.events and self.events[0][0] <= until:
+            _, _, kind, args = heapq.heappop(self.events)
+            if kind == "arrive":
+                self.tasks[self.next_task_id] = args
+                self.next_task_id += 1
+            elif kind in ("complete", "cancel"):
+                if self.tasks.pop(args[0], None) is None:
+                    continue
+            elif kind == "offline":
+                if not self.robots_online[args[0]] or self.robots_online.sum() == 1:
+                    continue
+                self.robots_online[args[0]] = False
+            elif kind == "online":
+                if self.robots_online[args[0]]:
+                    continue
+                self.robots_online[args[0]] = True
+            else:
+                raise ValueError(f"Unknown event kind: {kind!r}")
+            changed = True
+        self.time = max(self.time, until)
+        if not changed:
+            return None
+        self._sync_arrays()
+        return np.array([old_columns.get(task, -1) for task in self.task_ids], dtype=np.intp)
+
+    def state_dict(self):
+        """The dynamic state (tasks, robots, clock and queued events) for a checkpoint."""
+        return {
+            "time": self.time,
+            "tasks": dict(self.tasks),
+            "next_task_id": self.next_task_id,
+            "robots_online": self.robots_online.copy(),
+            "events": list(self.events),
+            "sequence": self._sequence,
+        }
+
+    def load_state_dict(self, state):
+        """Restore a state produced by state_dict()."""
+        self.time = state["time"]
+        self.tasks = dict(state["tasks"])
+        self.next_task_id = state["next_task_id"]
+        self.robots_online = state["robots_online"].copy()
+        self.events = list(state["events"])
+        self._sequence = state["sequence"]
+        self._sync_arrays()
+
+    def _sync_arrays(self):
+        """Rebuild the task arrays (one column per active task, in id order) from self.tasks."""
+        self.task_ids = list(self.tasks)
+        self.num_tasks = len(self.task_ids)
+        values = np.array(list(self.tasks.values()), dtype=int).reshape(-1, 2)
+        self.task_durations = values[:, 0]
+        self.task_priorities = values[:, 1]
+
+    def generate_assignments(self):
+        """
+        Randomly assign tasks to robots for initial population in the genetic algorithm.
+        Returns a (50, num_tasks) array with one individual per row.
+        """
+        return self.rng.integers(0, self.num_robots, size=(50, self.num_tasks))
+
+    def draw_grid(self, screen, font, task_assignments):
+        """
+        Draw a grid representing the task assignments on the Pygame screen.
+        Each row is a robot, each column is a task, colors are based on task durations, and annotations
+        show task priorities and durations inside the grid.
+        """
+        import pygame  # only the visual front end needs it; headless solvers never load SDL
+
+        screen.fill((255, 255, 255))  # Background color
+        
+        color_map = [(0, 0, 255 - i * 25) for i in range(10)]  # Color gradient for durations
+        
+        # Set spacing and margins
+        cell_size = 60
+        margin_left = 150
+        margin_top = 100
+
+        # Display task names on the top (X-axis labels)
+        for col in range(self.num_tasks):
+            task_text = font.render(f"Task {self.task_ids[col] + 1}", True, (0, 0, 0))
+            screen.blit(task_text, (margin_left + col * cell_size + cell_size // 3, margin_top - 30))
+
+        # Draw each robot row with tasks assigned
+        for row in range(self.num_robots):
+            # Display robot efficiency on the left of each row
+            label = f"Efficiency: {self.robot_efficiencies[row]:.2f}" if self.robots_online[row] else "Offline"
+            efficiency_text = font.render(label, True, (0, 0, 0))
+            screen.blit(efficiency_text, (10, margin_top + row * cell_size + cell_size // 3))
+
+            for col in range(self.num_tasks):
+                # Determine if this task is assigned to the current robot
+                assigned_robot = task_assignments[col]
+                
+                # Set color based on task duration
+                color = color_map[self.task_durations[col] - 1] if assigned_robot == row else (200, 200, 200)
+                
+                # Draw the cell
+                cell_rect = pygame.Rect(
+                    margin_left + col * cell_size,
+                    margin_top + row * cell_size,
+                    cell_size,
+                    cell_size
+                )
+                pygame.draw.rect(screen, color, cell_rect)
+                pygame.draw.rect(screen, (0, 0, 0), cell_rect, 1)  # Draw cell border
+
+                # Display task priority and duration within the cell
+                priority_text = font.render(f"P{self.task_priorities[col]}", True, (255, 255, 255) if assigned_robot == row else (0, 0, 0))
+                duration_text = font.render(f"{self.task_durations[col]}h", True, (255, 255, 255) if assigned_robot == row else (0, 0, 0))
+                screen.blit(priority_text, (cell_rect.x + 5, cell_rect.y + 5))
+                screen.blit(duration_text, (cell_rect.x + 5, cell_rect.y + 25))
@@ -0,0 +1,179 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+# Shared blocks a worker process has attached, by name
+_attached = {}
+
+
+def score_assignments(population, costs, robots, out, chunk_rows=64):
+    """
+    Vectorized GeneticScheduler fitness of every row of `population`, written to `out`.
+    costs[t, r] is the time task t takes on robot r and `robots` the robots that count
+    towards the makespan and balance. Rows are scored `chunk_rows` at a time so the
+    temporaries stay small however long the chromosomes are.
+    """
+    num_tasks = population.shape[1]
+    num_robots = costs.shape[1]
+    tasks = np.arange(num_tasks)
+    for start in range(0, len(population), chunk_rows):
+        block = population[start:start + chunk_rows]
+        rows = len(block)
+        # One bincount sums every row's robot times: row k's robot r lands in bin k * R + r
+        bins = block + (np.arange(rows) * num_robots)[:, None]
+        robot_times = np.bincount(bins.ravel(), weights=costs[tasks, block].ravel(),
+                                  minlength=rows * num_robots).reshape(rows, num_robots)[:, robots]
+        out[start:start + rows] = robot_times.max(axis=1) + robot_times.std(axis=1)
+
+
+def _view(name, shape, dtype):
+    """Array over an attached shared block, attaching on first use."""
+    block = _attached.get(name)
+    if block is None:
+        block = shared_memory.SharedMemory(name=name)
+        if multiprocessing.get_start_method() != "fork":
+            # The parent owns (and unlinks) the block; a forked worker shares the parent's
+            # resource tracker, but any other worker's own tracker would unlink it at exit
+            resource_tracker.unregister(block._name, "shared_memory")
+        _attached[name] = block
+    return np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _score_slice(spec, start, stop, chunk_rows):
+    """Worker task: score rows start:stop of the shared population in place."""
+    arrays = {role: _view(*layout) for role, layout in spec.items()}
+    for name in [name for name in _attached if name not in {layout[0] for layout in spec.values()}]:
+        _attached.pop(name).close()  # the parent replaced this block
+    score_assignments(arrays["population"][start:stop], arrays["costs"], arrays["robots"],
+                      arrays["fitness"][start:stop], chunk_rows)
+    return stop - start
+
+
+class SharedEvaluator:
+    """
+    Scores whole GeneticScheduler populations in worker processes (pass it as
+    `evaluator=`). The population matrix, the cost matrix (duration / efficiency *
+    priority per task and robot), the available robots and the fitness vector live in
+    multiprocessing.shared_memory blocks. Workers map them once and score their slice
+    of rows in place, so a task carries only block names and a row range, never
+    chromosomes. Selection and variation stay in the parent, which builds each
+    population directly in the shared block (see allocate) and reads the scores back.
+
+    workers=0 scores in the calling process with the same vectorized kernel, which
+    is already far faster than the per-individual loop on one core.
+    Serve one solver at a time: every allocate() hands out the same block.
+    Call close() (or use it as a context manager) to stop the workers and free the
+    blocks; arrays from allocate() must not be used after that.
+    """
+    def __init__(self, workers=None, chunk_rows=64):
+        self.workers = os.cpu_count() if workers is None else workers
+        self.chunk_rows = chunk_rows
+        self._pool = ProcessPoolExecutor(self.workers) if self.workers > 0 else None
+        self._blocks = {}   # role -> SharedMemory
+        self._layouts = {}  # role -> (block name, shape, dtype string)
+        self._population = None  # the array allocate() handed out last
+        self._retired = []       # population blocks outgrown by the last allocate(), still mapped
+        self._costs = None
+        self._robots = None
+
+    def _buffer(self, role, shape, dtype, retire=False):
+        """
+        Array of `shape` on the shared block for `role`, reallocated only when too small.
+        retire: keep an outgrown block mapped (in _retired) instead of closing it, for
+        blocks the caller may still hold arrays on.
+        """
+        dtype = np.dtype(dtype)
+        nbytes = max(1, int(np.prod(shape)) * dtype.itemsize)
+        block = self._blocks.get(role)
+        if block is None or block.size < nbytes:
+            if block is not None:
+                if retire:
+                    self._retired.append(block)
+                else:
+                    block.close()
+                block.unlink()
+            block = shared_memory.SharedMemory(create=True, size=nbytes)
+            self._blocks[role] = block
+        self._layouts[role] = (block.name, tuple(shape), dtype.str)
+        return np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+    def set_problem(self, task_durations, task_priorities, robot_efficiencies, robots):
+        """Publish the cost matrix and available robots; call again whenever they change."""
+        self._costs = self._robots = None  # drop the old views so their blocks can be replaced
+        durations = np.asarray(task_durations, dtype=float)
+        efficiencies = np.asarray(robot_efficiencies, dtype=float)
+        costs = durations[:, None] / efficiencies[None, :] * np.asarray(task_priorities)[:, None]
+        self._costs = self._buffer("costs", costs.shape, costs.dtype)
+        np.copyto(self._costs, costs)
+        robots = np.asarray(robots, dtype=np.intp)
+        self._robots = self._buffer("robots", robots.shape, robots.dtype)
+        np.copyto(self._robots, robots)
+
+    def allocate(self, shape, dtype):
+        """
+        Uninitialized array of `shape` on the shared population block, for the solver to
+        build its next population in; evaluate() scores it in place instead of copying
+        it. Every call returns the same memory while the block is large enough. A larger
+        shape moves to a new block; the old one stays mapped until the following
+        allocate(), so the previous population can still be read while the new one is built.
+        """
+        for block in self._retired:
+            block.close()
+        self._retired = []
+        self._population = self._buffer("population", shape, dtype, retire=True)
+        return self._population
+
+    def _is_shared(self, population):
+        """Whether `population` is the leading rows of the array allocate() handed out."""
+        shared = self._population
+        return (shared is not None and population.dtype == shared.dtype
+                and population.shape[1:] == shared.shape[1:] and len(population) <= len(shared)
+                and population.flags.c_contiguous
+                and population.__array_interface__["data"][0] == shared.__array_interface__["data"][0])
+
+    def evaluate(self, population):
+        """Fitness of every row of `population`; copied to shared memory unless it is there already."""
+        rows = len(population)
+        if self._is_shared(population):
+            role = "population"
+            shared = self._population[:rows]
+        else:
+            role = "scratch"
+            shared = self._buffer(role, population.shape, population.dtype)
+            np.copyto(shared, population)
+        fitness = self._buffer("fitness", (rows,), np.float64)
+        if self._pool is None:
+            score_assignments(shared, self._costs, self._robots, fitness, self.chunk_rows)
+        else:
+            bounds = np.linspace(0, rows, min(self.workers, rows) + 1).astype(int).tolist()
+            spec = {"population": self._layouts[role], "costs": self._layouts["costs"],
+                    "robots": self._layouts["robots"], "fitness": self._layouts["fitness"]}
+            tasks = [self._pool.submit(_score_slice, spec, start, stop, self.chunk_rows)
+                     for start, stop in zip(bounds, bounds[1:])]
+            for task in tasks:
+                task.result()
+        return fitness.copy()
+
+    def close(self):
+        """Stop the workers and free the shared blocks."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        self._costs = self._robots = self._population = None
+        for block in self._blocks.values():
+            block.close()
+            block.unlink()
+        for block in self._retired:
+            block.close()
+        self._blocks = {}
+        self._layouts = {}
+        self._retired = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
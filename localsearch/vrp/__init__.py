@@ -0,0 +1,4 @@
+"""
+Vehicle routing: the instance generator (environment), capacity and time-window
+constraints, and the simulated annealing (sa) and genetic algorithm (ga) solvers.
+"""
@@ -0,0 +1,537 @@
+import math
+import time
+
+import numpy as np
+
+from localsearch.vrp.sa import metropolis
+
+
+# Destroy operators: (alns, count) -> ids of about `count` assigned stops to take out.
+
+def random_removal(alns, count):
+    """Stops drawn uniformly at random."""
+    assigned = np.flatnonzero(alns.where >= 0)
+    return alns.rng.choice(assigned, size=min(count, len(assigned)), replace=False).tolist()
+
+
+def worst_removal(alns, count):
+    """Stops whose removal saves the most distance, with randomized ranks (alns.randomization)."""
+    stops, savings = [], []
+    for route in alns.routes:
+        if len(route) < 3:
+            continue
+        a = np.asarray(route)
+        before, stop, after = a[:-2], a[1:-1], a[2:]
+        stops.append(stop)
+        savings.append(alns.D[before, stop] + alns.D[stop, after] - alns.D[before, after])
+    if not stops:
+        return []
+    ranked = np.concatenate(stops)[np.argsort(-np.concatenate(savings), kind="stable")].tolist()
+    return [ranked.pop(int(alns.rng.random() ** alns.randomization * len(ranked)))
+            for _ in range(min(count, len(ranked)))]
+
+
+def shaw_removal(alns, count):
+    """
+    Related stops (Shaw): starting from a random stop, repeatedly remove a stop close
+    in distance, window opening and demand to one already removed, so the repair can
+    reshuffle them together.
+    """
+    candidates = np.flatnonzero(alns.where >= 0)
+    if not len(candidates):
+        return []
+    first = int(alns.rng.integers(len(candidates)))
+    removed = [int(candidates[first])]
+    candidates = np.delete(candidates, first)
+    while len(removed) < count and len(candidates):
+        reference = removed[int(alns.rng.integers(len(removed)))]
+        ranked = np.argsort(alns.relatedness(reference, candidates), kind="stable")
+        pick = ranked[int(alns.rng.random() ** alns.randomization * len(ranked))]
+        removed.append(int(candidates[pick]))
+        candidates = np.delete(candidates, pick)
+    return removed
+
+
+def route_removal(alns, count):
+    """Every stop of one random non-empty route, freeing a vehicle for the others' stops."""
+    used = [route for route in alns.routes if len(route) > 2]
+    if not used:
+        return []
+    return used[int(alns.rng.integers(len(used)))][1:-1]
+
+
+# Repair operators: (alns, stops) -> the stops that fit in no route.
+
+def _insert_all(alns, pending, regret):
+    """
+    Insert `pending` stops one at a time. regret=1 takes the cheapest insertion overall
+    (greedy); regret=k takes the stop that loses most by not getting its best route now
+    (sum of the gaps to its k - 1 next-best routes), so stops with few options go first.
+    Insertion costs come from alns.insertions and its cache: after each insertion only
+    the changed route's column is looked up again.
+    """
+    pending = list(pending)
+    num_routes = len(alns.routes)
+    costs = np.empty((len(pending), num_routes))
+    positions = np.empty((len(pending), num_routes), dtype=np.intp)
+    for r in range(num_routes):
+        costs[:, r], positions[:, r] = alns.insertions(pending, r)
+    width = min(regret, num_routes)
+    while pending:
+        if width <= 1:
+            i = int(costs.min(axis=1).argmin())
+        else:
+            ordered = np.partition(costs, width - 1, axis=1)[:, :width]
+            ordered.sort(axis=1)
+            with np.errstate(invalid="ignore"):
+                regrets = (ordered[:, 1:] - ordered[:, :1]).sum(axis=1)
+            regrets[~np.isfinite(ordered[:, 0])] = -math.inf
+            i = int(np.lexsort((ordered[:, 0], -regrets))[0])
+        r = int(costs[i].argmin())
+        if not math.isfinite(costs[i, r]):
+            break  # no remaining stop fits anywhere
+        alns.insert(pending[i], r, int(positions[i, r]))
+        del pending[i]
+        costs = np.delete(costs, i, axis=0)
+        positions = np.delete(positions, i, axis=0)
+        if pending:
+            costs[:, r], positions[:, r] = alns.insertions(pending, r)
+    return pending
+
+
+def greedy_insertion(alns, stops):
+    """Cheapest feasible insertion first."""
+    return _insert_all(alns, stops, 1)
+
+
+def regret_insertion(k):
+    """Regret-k insertion operator (k >= 2)."""
+    def insert(alns, stops):
+        return _insert_all(alns, stops, k)
+    insert.__name__ = f"regret_{k}"
+    return insert
+
+
+DESTROY_OPERATORS = {"random": random_removal, "worst": worst_removal, "shaw": shaw_removal,
+                     "route": route_removal}
+REPAIR_OPERATORS = {"greedy": greedy_insertion, "regret_2": regret_insertion(2),
+                    "regret_3": regret_insertion(3)}
+
+
+class ALNSOptimizer:
+    """
+    Adaptive Large Neighborhood Search over a whole fleet. Each iteration a destroy
+    operator removes a share of the stops and a repair operator reinserts them (plus
+    any still unassigned); the new solution is accepted with the Metropolis criterion
+    of the SA solvers under geometric cooling. Operators are picked by roulette wheel
+    on weights that adapt every `segment_length` iterations to how often each one
+    found a new best, an improvement or an accepted solution (Ropke & Pisinger).
+
+    Stops are ids 0..n-1 into `points` and the depot is id n; routes are id lists
+    with the depot at both ends. Cheapest insertions of a stop into a route are cached
+    per route version, so after a destroy only the routes it touched are searched
+    again. With RouteConstraints, insertions are checked in O(1) by RouteSchedule and
+    every route stays feasible; stops that fit nowhere stay unassigned at
+    `unassigned_penalty` each.
+    """
+    # Values written to a trace recorder, in order
+    TRACE_FIELDS = ("best_cost", "current_cost", "temperature", "acceptance_rate")
+
+    def __init__(self, depot, routes, unassigned=(), initial_temp=None, cooling_rate=0.995, min_temp=1e-8,
+                 constraints=None, distance_fn=None, destroy_operators=None, repair_operators=None,
+                 removal_range=(0.05, 0.3), max_removed=100, randomization=4, segment_length=100,
+                 reaction=0.1, scores=(33, 9, 13), start_tolerance=0.05, unassigned_penalty=None,
+                 metrics=None, seed=None, trace=None, cache_size=500000):
+        """
+        depot: (x, y); routes: initial routes (lists of points from depot to depot).
+        unassigned: stops in no route yet (they are inserted whenever they fit).
+        initial_temp: start temperature; by default one at which a solution
+        `start_tolerance` (5 %) worse than the initial one is accepted half the time.
+        cooling_rate, min_temp: geometric cooling; the search ends below min_temp.
+        constraints: optional RouteConstraints (capacity, time windows).
+        distance_fn: optional callable (a, b) -> travel cost; straight lines by default.
+        destroy_operators / repair_operators: name -> operator dicts, default
+        DESTROY_OPERATORS and REPAIR_OPERATORS.
+        removal_range: smallest and largest share of the stops removed per iteration,
+        at most max_removed.
+        randomization: exponent p of the randomized rank u ** p used by worst and Shaw
+        removal; larger values follow the ranking more closely.
+        segment_length, reaction, scores: the weight update. Each segment an operator
+        earns scores[0] for a new best, scores[1] for an accepted improvement and
+        scores[2] for an accepted worse solution, and its weight moves by `reaction`
+        towards its average score.
+        unassigned_penalty: cost per unassigned stop, by default twice the longest leg.
+        metrics: optional SolverMetrics; moves are counted per operator name and
+        insertion cache hits as cache_hits.
+        seed: int, np.random.SeedSequence or np.random.Generator.
+        trace: optional TraceRecorder over TRACE_FIELDS.
+        cache_size: cached insertions kept before the cache is cleared.
+        """
+        self.depot = depot
+        self.constraints = constraints
+        self.metrics = metrics
+        self.trace = trace
+        self.rng = np.random.default_rng(seed)
+        self.points = [p for route in routes for p in route[1:-1]] + list(unassigned)
+        n = len(self.points)
+        self.depot_id = n
+        self.D = self._cost_matrix(self.points + [depot], distance_fn)
+        self.destroy_operators = dict(DESTROY_OPERATORS if destroy_operators is None else destroy_operators)
+        self.repair_operators = dict(REPAIR_OPERATORS if repair_operators is None else repair_operators)
+        self.destroy_weights = np.ones(len(self.destroy_operators))
+        self.repair_weights = np.ones(len(self.repair_operators))
+        self._destroy_scores = np.zeros(len(self.destroy_operators))
+        self._destroy_uses = np.zeros(len(self.destroy_operators))
+        self._repair_scores = np.zeros(len(self.repair_operators))
+        self._repair_uses = np.zeros(len(self.repair_operators))
+        self.removal_range = removal_range
+        self.max_removed = max_removed
+        self.randomization = randomization
+        self.segment_length = segment_length
+        self.reaction = reaction
+        self.scores = scores
+        self.cache_size = cache_size
+        self.unassigned_penalty = 2.0 * float(self.D.max()) if unassigned_penalty is None else unassigned_penalty
+        # Shaw relatedness terms, each scaled to [0, 1]
+        if constraints is not None:
+            opens = np.array([constraints.window[p][0] for p in self.points] + [0.0])
+            demands = np.array([constraints.demand[p] for p in self.points] + [0.0])
+        else:
+            opens = demands = np.zeros(n + 1)
+        self._opens = opens / max(float(opens.max()), 1e-12)
+        self._demands = demands / max(float(demands.max()), 1e-12)
+        self._distance_scale = max(float(self.D.max()), 1e-12)
+
+        # Solution state; every route change gets a new version, the key of the caches
+        self.routes = []
+        self.versions = []
+        self.distances = []
+        self.where = np.full(n, -1, dtype=np.intp)  # route of each stop, -1 if unassigned
+        self._next_version = 0
+        self._insertions = {}   # (stop, version) -> (cost delta, position)
+        self._route_info = {}   # version -> (id array, RouteSchedule or None)
+        start = 0
+        for route in routes:
+            size = len(route) - 2
+            self.routes.append(None)
+            self.versions.append(None)
+            self.distances.append(0.0)
+            self._set_route(len(self.routes) - 1, [n] + list(range(start, start + size)) + [n])
+            start += size
+        self.unassigned = list(range(start, n))
+        self.current_cost = self.cost()
+        self._save_best()
+        self.temperature = (-start_tolerance * self.current_cost / math.log(0.5)
+                            if initial_temp is None else initial_temp)
+        self.cooling_rate = cooling_rate
+        self.min_temp = min_temp
+        self.iteration = 0
+        self.accepted_moves = 0
+        self._trace_mark = (0, 0)
+
+    def _cost_matrix(self, points, distance_fn):
+        if self.constraints is not None:
+            distance_fn = self.constraints.distance
+        if distance_fn is None:
+            xy = np.asarray(points, dtype=float)[:, :2]
+            return np.sqrt(((xy[:, None, :] - xy[None, :, :]) ** 2).sum(axis=2))
+        return np.array([[distance_fn(a, b) for b in points] for a in points], dtype=float)
+
+    def _set_route(self, r, route):
+        self._next_version += 1
+        version = self._next_version
+        array = np.asarray(route)
+        schedule = None
+        if self.constraints is not None:
+            schedule = self.constraints.schedule([self.depot if k == self.depot_id else self.points[k]
+                                                  for k in route])
+        self._route_info[version] = (array, schedule)
+        self.routes[r] = route
+        self.versions[r] = version
+        self.distances[r] = float(self.D[array[:-1], array[1:]].sum())
+        self.where[array[1:-1]] = r
+
+    def cost(self):
+        """Total distance plus the penalty for unassigned stops."""
+        return sum(self.distances) + self.unassigned_penalty * len(self.unassigned)
+
+    def relatedness(self, stop, others):
+        """Shaw relatedness of `stop` to each of `others` (lower is more related)."""
+        D = self.D
+        return (9.0 * (D[stop, others] + D[others, stop]) / (2.0 * self._distance_scale)
+                + 3.0 * np.abs(self._opens[stop] - self._opens[others])
+                + 2.0 * np.abs(self._demands[stop] - self._demands[others]))
+
+    def insertion(self, stop, r):
+        """
+        (cost delta, position k) of the cheapest feasible insertion of `stop` between
+        positions k and k + 1 of route r, or (inf, -1) if it fits nowhere.
+        """
+        costs, positions = self.insertions([stop], r)
+        return float(costs[0]), int(positions[0])
+
+    def insertions(self, stops, r):
+        """
+        Cheapest feasible insertions of every stop in `stops` into route r, as arrays of
+        cost deltas and positions (inf / -1 where a stop fits nowhere). Results are
+        cached per route version, so an unchanged route is never searched twice for a
+        stop; the misses are scored together, one (stops x positions) array per call.
+        """
+        version = self.versions[r]
+        cache = self._insertions
+        costs = np.empty(len(stops))
+        positions = np.empty(len(stops), dtype=np.intp)
+        missing = []
+        for i, stop in enumerate(stops):
+            cached = cache.get((stop, version))
+            if cached is None:
+                missing.append(i)
+            else:
+                costs[i], positions[i] = cached
+        if self.metrics is not None:
+            self.metrics.cache_hits += len(stops) - len(missing)
+            self.metrics.evaluations += len(missing)
+        if not missing:
+            return costs, positions
+        if len(cache) + len(missing) > self.cache_size:
+            cache.clear()
+        array, schedule = self._route_info[version]
+        D = self.D
+        tails, heads = array[:-1], array[1:]
+        new = np.array([stops[i] for i in missing])
+        deltas = D[new][:, heads] + D[tails][:, new].T - D[tails, heads]
+        if schedule is None:
+            best = deltas.argmin(axis=1)
+            found = deltas[np.arange(len(new)), best]
+        else:
+            c = self.constraints
+            best = np.full(len(new), -1, dtype=np.intp)
+            found = np.full(len(new), math.inf)
+            for row, stop in enumerate(new.tolist()):
+                point = self.points[stop]
+                if schedule.load[-1] + c.demand[point] > c.capacity:
+                    continue
+                # Cheapest first: the first feasible position is the best one
+                for k in np.argsort(deltas[row], kind="stable").tolist():
+                    if schedule.insertion(k, point, check_load=False)[1]:
+                        best[row], found[row] = k, deltas[row, k]
+                        break
+        for i, stop, cost, k in zip(missing, new.tolist(), found.tolist(), best.tolist()):
+            costs[i], positions[i] = cost, k
+            cache[(stop, version)] = (cost, k)
+        return costs, positions
+
+    def insert(self, stop, r, k):
+        """Put `stop` between positions k and k + 1 of route r."""
+        route = self.routes[r]
+        self._set_route(r, route[:k + 1] + [stop] + route[k + 1:])
+
+    def remove(self, stops):
+        """Take `stops` out of their routes."""
+        by_route = {}
+        for stop in stops:
+            by_route.setdefault(int(self.where[stop]), set()).add(stop)
+        for r, gone in by_route.items():
+            if r >= 0:
+                self._set_route(r, [k for k in self.routes[r] if k not in gone])
+        self.where[list(stops)] = -1
+
+    def _snapshot(self):
+        return (self.routes[:], self.versions[:], self.distances[:], self.where.copy(), self.unassigned[:])
+
+    def _restore(self, snapshot):
+        routes, versions, distances, where, unassigned = snapshot
+        self.routes, self.versions, self.distances = routes[:], versions[:], distances[:]
+        self.where, self.unassigned = where.copy(), unassigned[:]
+
+    def _save_best(self):
+        self.best = self._snapshot()
+        self.best_cost = self.current_cost
+        self._prune()
+
+    def _prune(self):
+        """Drop route data no longer referenced by the current or best solution."""
+        if len(self._route_info) > 4 * len(self.routes) + 64:
+            live = set(self.versions) | set(self.best[1])
+            self._route_info = {v: info for v, info in self._route_info.items() if v in live}
+
+    def _choose(self, weights):
+        return int(np.searchsorted(np.cumsum(weights), self.rng.random() * weights.sum(), side="right"))
+
+    def update(self):
+        """
+        One ALNS iteration: destroy, repair, Metropolis acceptance against the current
+        solution, operator scoring and cooling.
+        """
+        if self.is_finished():
+            return
+        metrics = self.metrics
+        if metrics is not None:
+            t0 = time.perf_counter()
+        n = len(self.points)
+        low, high = self.removal_range
+        low = max(1, int(low * n))
+        high = max(low, min(int(high * n), self.max_removed))
+        count = int(self.rng.integers(low, high + 1))
+        d = self._choose(self.destroy_weights)
+        r = self._choose(self.repair_weights)
+        destroy_name = list(self.destroy_operators)[d]
+        repair_name = list(self.repair_operators)[r]
+        snapshot = self._snapshot()
+
+        removed = list(self.destroy_operators[destroy_name](self, count))
+        self.remove(removed)
+        if metrics is not None:
+            t1 = time.perf_counter()
+        pending = removed + self.unassigned
+        self.unassigned = []
+        self.unassigned = list(self.repair_operators[repair_name](self, pending))
+        new_cost = self.cost()
+        if metrics is not None:
+            t2 = time.perf_counter()
+            metrics.add_phase_time("destroy", t1 - t0)
+            metrics.add_phase_time("repair", t2 - t1)
+            metrics.propose(destroy_name)
+            metrics.propose(repair_name)
+            metrics.iterations += 1
+
+        score = 0
+        delta = new_cost - self.current_cost
+        if metropolis(delta, self.temperature, self.rng.random()):
+            self.accepted_moves += 1
+            if metrics is not None:
+                metrics.accept(destroy_name)
+                metrics.accept(repair_name)
+            self.current_cost = new_cost
+            if new_cost < self.best_cost:
+                score = self.scores[0]
+                self._save_best()
+            else:
+                score = self.scores[1] if delta < 0 else self.scores[2]
+        else:
+            self._restore(snapshot)
+        self._destroy_scores[d] += score
+        self._destroy_uses[d] += 1
+        self._repair_scores[r] += score
+        self._repair_uses[r] += 1
+
+        self.temperature *= self.cooling_rate
+        self.iteration += 1
+        if self.iteration % self.segment_length == 0:
+            self._update_weights()
+        self._prune()
+        if self.trace is not None and self.iteration >= self.trace.next_record:
+            self.record_trace()
+
+    def _update_weights(self):
+        """End of a segment: move each used operator's weight towards its average score."""
+        for weights, scores, uses in ((self.destroy_weights, self._destroy_scores, self._destroy_uses),
+                                      (self.repair_weights, self._repair_scores, self._repair_uses)):
+            used = uses > 0
+            weights[used] = ((1 - self.reaction) * weights[used]
+                             + self.reaction * scores[used] / uses[used])
+            # Keep every operator selectable even after a bad segment
+            np.maximum(weights, 1e-3, out=weights)
+            scores[:] = 0
+            uses[:] = 0
+
+    def run(self, max_iterations=None):
+        """Iterate until cooled (or for at most max_iterations iterations)."""
+        steps = 0
+        while not self.is_finished() and (max_iterations is None or steps < max_iterations):
+            self.update()
+            steps += 1
+        return steps
+
+    def record_trace(self):
+        """Write the current state to the trace; the acceptance rate covers iterations since the last row."""
+        iteration, accepted = self._trace_mark
+        steps = self.iteration - iteration
+        rate = (self.accepted_moves - accepted) / steps if steps else 0.0
+        self._trace_mark = (self.iteration, self.accepted_moves)
+        self.trace.record(self.iteration, (self.best_cost, self.current_cost, self.temperature, rate))
+
+    def is_finished(self):
+        """Return True once the temperature is below the threshold."""
+        return self.temperature <= self.min_temp
+
+    def _to_points(self, route):
+        return [self.depot if k == self.depot_id else self.points[k] for k in route]
+
+    def best_routes(self):
+        """Best routes found, as lists of points from depot to depot (like SAOptimizer.best_route)."""
+        return [self._to_points(route) for route in self.best[0]]
+
+    def best_unassigned(self):
+        """Stops left out of the best solution, as points."""
+        return [self.points[k] for k in self.best[4]]
+
+    def best_distance(self):
+        """Total distance of the best routes (without the unassigned penalty)."""
+        return sum(self.best[2])
+
+    def get_state(self):
+        """Return current state information for display."""
+        return {
+            "iteration": self.iteration,
+            "temperature": self.temperature,
+            "current_cost": self.current_cost,
+            "best_cost": self.best_cost,
+            "best_distance": self.best_distance(),
+            "unassigned": len(self.best[4]),
+            "destroy_weights": dict(zip(self.destroy_operators, self.destroy_weights.tolist())),
+            "repair_weights": dict(zip(self.repair_operators, self.repair_weights.tolist())),
+        }
+
+    def state_dict(self):
+        """Return everything needed to resume this search exactly (see checkpoint.py)."""
+        return {
+            "routes": [route[:] for route in self.routes],
+            "unassigned": self.unassigned[:],
+            "best_routes": [route[:] for route in self.best[0]],
+            "best_unassigned": self.best[4][:],
+            "current_cost": self.current_cost,
+            "best_cost": self.best_cost,
+            "temperature": self.temperature,
+            "cooling_rate": self.cooling_rate,
+            "min_temp": self.min_temp,
+            "iteration": self.iteration,
+            "accepted_moves": self.accepted_moves,
+            "destroy_weights": self.destroy_weights.copy(),
+            "repair_weights": self.repair_weights.copy(),
+            "segment": (self._destroy_scores.copy(), self._destroy_uses.copy(),
+                        self._repair_scores.copy(), self._repair_uses.copy()),
+            "rng": self.rng.bit_generator.state,
+        }
+
+    def load_state_dict(self, state):
+        """Restore a state produced by state_dict() of a search over the same stops."""
+        self.where[:] = -1
+        for r, route in enumerate(state["best_routes"]):
+            self._set_route(r, route[:])
+        self.unassigned = state["best_unassigned"][:]
+        self.current_cost = state["best_cost"]
+        self._save_best()
+        self.where[:] = -1
+        for r, route in enumerate(state["routes"]):
+            self._set_route(r, route[:])
+        self.unassigned = state["unassigned"][:]
+        self.current_cost = state["current_cost"]
+        self.temperature = state["temperature"]
+        self.cooling_rate = state["cooling_rate"]
+        self.min_temp = state["min_temp"]
+        self.iteration = state["iteration"]
+        self.accepted_moves = state["accepted_moves"]
+        self._trace_mark = (self.iteration, self.accepted_moves)
+        self.destroy_weights = state["destroy_weights"].copy()
+        self.repair_weights = state["repair_weights"].copy()
+        segment = state["segment"]
+        self._destroy_scores, self._destroy_uses = segment[0].copy(), segment[1].copy()
+        self._repair_scores, self._repair_uses = segment[2].copy(), segment[3].copy()
+        self.rng.bit_generator.state = state["rng"]
+
+    def get_metrics(self):
+        """Return a snapshot of the hot-path counters, or None if metrics are disabled."""
+        if self.metrics is None:
+            return None
+        return self.metrics.snapshot()
@@ -0,0 +1,241 @@
+import time
+
+import numpy as np
+
+
+class BatchedAnnealer:
+    """
+    Simulated annealing over many routes in lockstep: the same swap moves, acceptance
+    rule and geometric cooling as SAOptimizer, but all B routes live in one padded
+    (B, L) matrix of local stop indices and every update() proposes, scores and applies
+    one move per route with array operations. Meant for fleets of many small routes
+    (e.g. thousands of vans with 15-30 stops), where a Python-level update() per route
+    would be dominated by interpreter overhead.
+    """
+    def __init__(self, routes, initial_temp=10000, cooling_rate=0.995, min_temp=1e-8, metrics=None,
+                 seed=None, block_size=64, distance_fn=None):
+        """
+        routes: initial routes (lists of points; each starts and ends at its depot).
+        initial_temp, cooling_rate, min_temp: SA parameters; initial_temp may also be a
+        sequence with one starting temperature per route.
+        metrics: optional SolverMetrics counting the moves of the whole batch.
+        seed: int, np.random.SeedSequence or np.random.Generator for the batch's RNG.
+        block_size: lockstep iterations of swap positions and uniforms drawn per RNG call.
+        distance_fn: optional callable (a, b) -> travel cost; straight-line distance by default.
+        """
+        self.metrics = metrics
+        self.rng = np.random.default_rng(seed)
+        self.block_size = block_size
+        self.cooling_rate = cooling_rate
+        self.min_temp = min_temp
+        self.distance_fn = distance_fn
+        self.stops = [route[:] for route in routes]  # initial routes, the points behind local indices
+        count = len(routes)
+        self.lengths = np.array([len(route) for route in routes], dtype=np.intp)
+        # At least 4 columns so the neighbours of any drawn position are in range
+        width = max(int(self.lengths.max()) if count else 0, 4)
+        # Row b holds a permutation of 0..n_b - 1 (0 and n_b - 1 are the depots), padded with
+        # the end depot so the padding adds zero-cost depot -> depot legs
+        self.order = np.repeat((self.lengths - 1)[:, None], width, axis=1)
+        for b, length in enumerate(self.lengths.tolist()):
+            self.order[b, :length] = np.arange(length)
+        self.costs = self._cost_tensor(width)
+        self._rows = np.arange(count)
+        # Flat views: leg (x, y) of row b is _flat_costs[_offsets[b] + x * L + y]
+        self._flat_costs = self.costs.reshape(-1)
+        self._offsets = self._rows * width * width
+        self.current_distance = self.route_distances(self.order)
+        self.best_order = self.order.copy()
+        self.best_distance = self.current_distance.copy()
+        self.temperature = np.broadcast_to(np.asarray(initial_temp, dtype=float), (count,)).copy()
+        self.iteration = np.zeros(count, dtype=np.int64)
+        self.accepted_moves = np.zeros(count, dtype=np.int64)
+        # Pre-drawn (block_size, B) swap positions and uniforms, consumed one row per update
+        self._swap_i = None
+        self._swap_j = None
+        self._uniforms = None
+        self._cursor = block_size
+
+    def _cost_tensor(self, width):
+        """(B, L, L) travel costs between the local stops of every route; zero on the diagonal."""
+        count = len(self.stops)
+        costs = np.zeros((count, width, width))
+        if self.distance_fn is None:
+            xy = np.zeros((count, width, 2))
+            for b, route in enumerate(self.stops):
+                xy[b, :len(route)] = route
+                xy[b, len(route):] = route[-1]
+            costs = np.sqrt(((xy[:, :, None, :] - xy[:, None, :, :]) ** 2).sum(axis=3))
+        else:
+            for b, route in enumerate(self.stops):
+                for i, a in enumerate(route):
+                    for j, c in enumerate(route):
+                        if i != j:
+                            costs[b, i, j] = self.distance_fn(a, c)
+        costs[:, np.arange(width), np.arange(width)] = 0.0
+        return costs
+
+    def route_distances(self, order):
+        """Total cost of every row of a (B, L) order matrix."""
+        legs = self.costs[self._rows[:, None], order[:, :-1], order[:, 1:]]
+        return legs.sum(axis=1)
+
+    def _draw_block(self):
+        """Draw the next block of distinct swap positions (excluding the depots) and uniforms."""
+        shape = (self.block_size, len(self.stops))
+        m = np.maximum(self.lengths - 2, 2)  # rows with fewer than two deliveries never move
+        first = (self.rng.random(shape) * m).astype(np.intp)
+        # A non-zero offset modulo m guarantees the second position differs from the first
+        second = (first + 1 + (self.rng.random(shape) * (m - 1)).astype(np.intp)) % m
+        self._swap_i = np.minimum(first, second) + 1
+        self._swap_j = np.maximum(first, second) + 1
+        self._uniforms = self.rng.random(shape)
+        self._cursor = 0
+        # Deltas accumulate rounding error; resynchronize with the exact totals once per block
+        self.current_distance = self.route_distances(self.order)
+
+    def update(self):
+        """
+        One lockstep iteration: every route still above min_temp proposes a swap of two
+        deliveries, the cost deltas of all proposals are computed at once from the few
+        legs they touch, Metropolis acceptance is applied by mask, and every active
+        route cools by cooling_rate.
+        """
+        active = self.temperature > self.min_temp
+        if not active.any():
+            return  # finished
+        metrics = self.metrics
+        if metrics is not None:
+            t0 = time.perf_counter()
+        if self._cursor >= self.block_size:
+            self._draw_block()
+        c = self._cursor
+        self._cursor = c + 1
+        movable = active & (self.lengths >= 4)
+        rows, order, flat = self._rows, self.order, self._flat_costs
+        width = order.shape[1]
+        i, j = self._swap_i[c], self._swap_j[c]
+        a, b = order[rows, i], order[rows, j]
+        before_i, after_i = order[rows, i - 1], order[rows, i + 1]
+        before_j, after_j = order[rows, j - 1], order[rows, j + 1]
+        # Row offsets folded into the leg tails once, so each leg is a single flat gather
+        a_out, b_out = self._offsets + a * width, self._offsets + b * width
+        before_i = self._offsets + before_i * width
+        before_j = self._offsets + before_j * width
+        adjacent = j == i + 1
+        # Swapping positions i < j changes the legs around both; when they are neighbours
+        # the leg between them is reversed instead
+        removed = flat[before_i + a] + flat[b_out + after_j] + np.where(
+            adjacent, flat[a_out + b], flat[a_out + after_i] + flat[before_j + b])
+        added = flat[before_i + b] + flat[a_out + after_j] + np.where(
+            adjacent, flat[b_out + a], flat[b_out + after_i] + flat[before_j + a])
+        delta = added - removed
+        if metrics is not None:
+            t1 = time.perf_counter()
+        with np.errstate(over="ignore", divide="ignore", invalid="ignore"):
+            threshold = np.exp(-np.maximum(delta, 0.0) / self.temperature)
+        accept = movable & ((delta < 0) | (self._uniforms[c] < threshold))
+        moved = np.flatnonzero(accept)
+        order[moved, i[moved]] = b[moved]
+        order[moved, j[moved]] = a[moved]
+        self.current_distance[moved] += delta[moved]
+        self.accepted_moves[moved] += 1
+        improved = moved[self.current_distance[moved] < self.best_distance[moved]]
+        self.best_distance[improved] = self.current_distance[improved]
+        self.best_order[improved] = order[improved]
+        self.temperature[active] *= self.cooling_rate
+        self.iteration[active] += 1
+        if metrics is not None:
+            t2 = time.perf_counter()
+            proposed = int(movable.sum())
+            metrics.add_phase_time("evaluation", t1 - t0)
+            metrics.add_phase_time("acceptance", t2 - t1)
+            metrics.propose("swap", proposed)
+            metrics.accept("swap", len(moved))
+            metrics.evaluations += proposed
+            metrics.iterations += 1
+
+    def run(self, max_iterations=None):
+        """Update until every route has cooled (or for at most max_iterations lockstep iterations)."""
+        steps = 0
+        while not self.is_finished() and (max_iterations is None or steps < max_iterations):
+            self.update()
+            steps += 1
+        return steps
+
+    def is_finished(self):
+        """Return True once every route has cooled below the threshold."""
+        return bool((self.temperature <= self.min_temp).all())
+
+    def _points(self, b, order):
+        route = self.stops[b]
+        return [route[k] for k in order[b, :self.lengths[b]].tolist()]
+
+    def best_route(self, b):
+        """Best route found for route b, as a list of points like SAOptimizer.best_route."""
+        return self._points(b, self.best_order)
+
+    def best_routes(self):
+        """Best route of every route in the batch, in the order they were given."""
+        return [self.best_route(b) for b in range(len(self.stops))]
+
+    def current_route(self, b):
+        """Current route b as a list of points like SAOptimizer.route."""
+        return self._points(b, self.order)
+
+    def get_state(self):
+        """Return batch-wide state information for display."""
+        return {
+            "iteration": int(self.iteration.max()) if len(self.iteration) else 0,
+            "temperature": float(self.temperature.max()) if len(self.temperature) else 0.0,
+            "current_distance": float(self.current_distance.sum()),
+            "best_distance": float(self.best_distance.sum()),
+        }
+
+    def state_dict(self):
+        """Return everything needed to resume this batch exactly (see checkpoint.py)."""
+        return {
+            "order": self.order.copy(),
+            "best_order": self.best_order.copy(),
+            "current_distance": self.current_distance.copy(),
+            "best_distance": self.best_distance.copy(),
+            "temperature": self.temperature.copy(),
+            "cooling_rate": self.cooling_rate,
+            "min_temp": self.min_temp,
+            "iteration": self.iteration.copy(),
+            "accepted_moves": self.accepted_moves.copy(),
+            "rng": self.rng.bit_generator.state,
+            # Only the unused tail of the pre-drawn block is needed to continue exactly
+            "swap_i": None if self._swap_i is None else self._swap_i[self._cursor:].copy(),
+            "swap_j": None if self._swap_j is None else self._swap_j[self._cursor:].copy(),
+            "uniforms": None if self._uniforms is None else self._uniforms[self._cursor:].copy(),
+        }
+
+    def load_state_dict(self, state):
+        """Restore a state produced by state_dict() of a batch built from the same routes."""
+        self.order = state["order"].copy()
+        self.best_order = state["best_order"].copy()
+        self.current_distance = state["current_distance"].copy()
+        self.best_distance = state["best_distance"].copy()
+        self.temperature = state["temperature"].copy()
+        self.cooling_rate = state["cooling_rate"]
+        self.min_temp = state["min_temp"]
+        self.iteration = state["iteration"].copy()
+        self.accepted_moves = state["accepted_moves"].copy()
+        self.rng.bit_generator.state = state["rng"]
+        if state["uniforms"] is None:
+            self._swap_i = self._swap_j = self._uniforms = None
+            self._cursor = self.block_size
+        else:
+            # The restored tail is shorter than a block: index from where it would have been
+            self._cursor = self.block_size - len(state["uniforms"])
+            pad = ((self._cursor, 0), (0, 0))
+            self._swap_i = np.pad(state["swap_i"], pad)
+            self._swap_j = np.pad(state["swap_j"], pad)
+            self._uniforms = np.pad(state["uniforms"], pad)
+
+    def get_metrics(self):
+        """Return a snapshot of the hot-path counters, or None if metrics are disabled."""
+        if self.metrics is None:
+            return None
+        return self.metrics.snapshot()
@@ -0,0 +1,240 @@
+import math
+
+
+class RouteConstraints:
+    """
+    Vehicle capacity and delivery time windows for the VRP solvers.
+
+    Travel time is distance / speed and every delivery takes `service_time`. A vehicle
+    that arrives before a window opens waits; arriving after it closes is infeasible.
+    Vehicles leave the depot at time 0 and must be back by `horizon`.
+    Stops are identified by their point, so duplicate points share a demand and window.
+    Distances are straight lines unless a `distance_fn` (a, b) -> cost is given.
+    """
+    def __init__(self, depot, deliveries, demands=None, time_windows=None, capacity=None,
+                 service_time=0.0, speed=1.0, horizon=None, distance_fn=None):
+        self.depot = depot
+        self.distance_fn = distance_fn
+        self.capacity = math.inf if capacity is None else capacity
+        self.service_time = service_time
+        self.speed = speed
+        self.horizon = math.inf if horizon is None else horizon
+        self.demand = {}
+        self.window = {}
+        for k, point in enumerate(deliveries):
+            self.demand[point] = 0 if demands is None else demands[k]
+            self.window[point] = (0.0, math.inf) if time_windows is None else tuple(time_windows[k])
+        self.demand[depot] = 0
+        self.window[depot] = (0.0, self.horizon)
+
+    def distance(self, a, b):
+        if self.distance_fn is not None:
+            return self.distance_fn(a, b)
+        return math.hypot(b[0] - a[0], b[1] - a[1])
+
+    def schedule(self, route, relocations=False):
+        """
+        Precompute the O(1) move-check data of a route depot -> stops -> depot; with
+        `relocations` also the segment table RouteSchedule.relocate needs.
+        """
+        return RouteSchedule(self, route, relocations)
+
+    def node(self, point, depot=False):
+        """Segment summary (see concatenate) of serving `point` alone."""
+        earliest, latest = self.window[point]
+        return (0.0 if depot else self.service_time, 0.0, earliest, latest, self.demand[point])
+
+    def evaluate(self, route):
+        """
+        (distance, lateness, overload) of a route in one O(n) pass. Lateness is the
+        total time by which windows are missed (the vehicle continues as if it had
+        arrived on time) and overload the load above capacity; (d, 0, 0) means
+        feasible. Used for penalty fitness where no move checks follow.
+        """
+        last = len(route) - 1
+        segment = self.node(route[0], True)
+        distance = 0.0
+        for k in range(1, last + 1):
+            leg = self.distance(route[k - 1], route[k])
+            distance += leg
+            segment = concatenate(segment, self.node(route[k], k == last), leg / self.speed)
+        # The time warp of the whole route is the lateness: being late by some amount and
+        # carrying on as if on time is exactly warping back by that amount
+        lateness = segment[1] if segment[1] > RouteSchedule.EPSILON else 0.0
+        return distance, lateness, max(0, segment[4] - self.capacity)
+
+    def violation(self, route):
+        """(lateness, overload) of a route as evaluate() reports them."""
+        return self.evaluate(route)[1:]
+
+    def construct_routes(self, deliveries, num_vehicles):
+        """
+        Build feasible routes by cheapest feasible insertion, placing stops with the
+        earliest closing windows first. Each candidate position is checked in O(1)
+        with RouteSchedule.insertion. Returns (routes, unassigned stops).
+        """
+        depot = self.depot
+        routes = [[depot, depot] for _ in range(num_vehicles)]
+        schedules = [self.schedule(route) for route in routes]
+        unassigned = []
+        order = sorted(deliveries, key=lambda p: (self.window[p][1],
+                                                  math.atan2(p[1] - depot[1], p[0] - depot[0])))
+        for point in order:
+            best = None
+            for r, schedule in enumerate(schedules):
+                for k in range(len(routes[r]) - 1):
+                    delta, feasible = schedule.insertion(k, point)
+                    if feasible and (best is None or delta < best[0]):
+                        best = (delta, r, k)
+            if best is None:
+                unassigned.append(point)
+                continue
+            _, r, k = best
+            routes[r].insert(k + 1, point)
+            schedules[r] = self.schedule(routes[r])
+        return routes, unassigned
+
+
+def concatenate(first, second, travel):
+    """
+    Summary of two route segments driven one after the other, `travel` time apart
+    (Vidal et al.'s concatenation with time warp). A segment summary is (duration,
+    time warp, earliest start, latest start, load): the shortest time from the start of
+    the first service to the end of the last one including waiting, the total lateness
+    that cannot be avoided, the window for starting the first service so that nothing
+    extra is late or waited for, and the total demand. A segment is feasible exactly
+    when its time warp is zero.
+    """
+    duration1, warp1, earliest1, latest1, load1 = first
+    duration2, warp2, earliest2, latest2, load2 = second
+    delta = duration1 - warp1 + travel
+    wait = max(earliest2 - delta - latest1, 0.0)
+    warp = max(earliest1 + delta - latest2, 0.0)
+    return (duration1 + duration2 + travel + wait, warp1 + warp2 + warp,
+            max(earliest2 - delta, earliest1) - wait, min(latest2 - delta, latest1) + warp,
+            load1 + load2)
+
+
+class RouteSchedule:
+    """
+    Timing and load data of one route for constant-time move checks:
+      prefix[k]  segment summary (see concatenate) of positions 0..k
+      suffix[k]  segment summary of positions k..n-1
+      load[k]    load prefix, total demand of positions 0..k
+      table      with `relocations`, a disjoint sparse table of segment summaries:
+                 table[h][k] summarizes k..m - 1 or m..k, where m is the multiple of
+                 2 ** h that a range through k and across the middle of its block of
+                 2 ** (h + 1) positions would be split at
+    plus the route's distance, lateness and overload (as RouteConstraints.evaluate
+    reports them). A move is checked exactly by concatenating the prefix before it, the
+    moved stop, any reordered middle part (two table entries) and the suffix after it,
+    all in O(1). Building it takes O(n), or O(n log n) with the table; rebuild it after
+    every applied move.
+    """
+    # Time warp below this counts as zero (rounding in the concatenations)
+    EPSILON = 1e-9
+
+    def __init__(self, constraints, route, relocations=False):
+        c = self.constraints = constraints
+        self.route = route
+        n = len(route)
+        nodes = self.nodes = [c.node(point, k in (0, n - 1)) for k, point in enumerate(route)]
+        travel = self.travel = []
+        prefix = [nodes[0]]
+        distance = 0.0
+        for k in range(1, n):
+            leg = c.distance(route[k - 1], route[k])
+            distance += leg
+            travel.append(leg / c.speed)
+            prefix.append(concatenate(prefix[-1], nodes[k], travel[-1]))
+        suffix = [nodes[n - 1]] * n
+        for k in range(n - 2, -1, -1):
+            suffix[k] = concatenate(nodes[k], suffix[k + 1], travel[k])
+        self.prefix = prefix
+        self.suffix = suffix
+        self.table = self._segment_table() if relocations else None
+        self.load = [segment[4] for segment in prefix]
+        self.distance = distance
+        self.lateness = prefix[-1][1] if prefix[-1][1] > self.EPSILON else 0.0
+        self.overload = max(0, self.load[-1] - c.capacity)
+        self.feasible = self.lateness == 0 and self.overload == 0
+
+    def _segment_table(self):
+        """Level h: every block of 2 ** (h + 1) positions summarized outwards from its middle m."""
+        nodes, travel = self.nodes, self.travel
+        n = len(nodes)
+        table = []
+        half = 1
+        while half < n:
+            level = [None] * n
+            for middle in range(half, n, 2 * half):
+                level[middle - 1] = nodes[middle - 1]
+                for k in range(middle - 2, middle - half - 1, -1):
+                    level[k] = concatenate(nodes[k], level[k + 1], travel[k])
+                level[middle] = nodes[middle]
+                for k in range(middle + 1, min(middle + half, n)):
+                    level[k] = concatenate(level[k - 1], nodes[k], travel[k - 1])
+            table.append(level)
+            half *= 2
+        return table
+
+    def _leg(self, a, b):
+        c = self.constraints
+        return c.distance(a, b) / c.speed
+
+    def _middle(self, first, last):
+        """Summary of positions first..last (first <= last) from two table entries."""
+        if first == last:
+            return self.nodes[first]
+        # The highest bit in which first and last differ picks the level whose block
+        # middle lies between them
+        h = (first ^ last).bit_length() - 1
+        middle = last >> h << h
+        level = self.table[h]
+        return concatenate(level[first], level[last], self.travel[middle - 1])
+
+    def insertion(self, k, point, check_load=True):
+        """
+        (distance delta, feasible) of inserting `point` between positions k and k + 1.
+        O(1): prefix k, the new stop and suffix k + 1 are concatenated.
+        """
+        c = self.constraints
+        a, b = self.route[k], self.route[k + 1]
+        to_point, from_point = c.distance(a, point), c.distance(point, b)
+        delta = to_point + from_point - c.distance(a, b)
+        if check_load and self.load[-1] + c.demand[point] > c.capacity:
+            return delta, False
+        segment = concatenate(self.prefix[k], c.node(point), to_point / c.speed)
+        segment = concatenate(segment, self.suffix[k + 1], from_point / c.speed)
+        return delta, segment[1] <= self.EPSILON
+
+    def removal(self, i):
+        """Distance delta of removing position i; always feasible (times only get earlier)."""
+        c = self.constraints
+        p, v, n = self.route[i - 1], self.route[i], self.route[i + 1]
+        return c.distance(p, n) - c.distance(p, v) - c.distance(v, n)
+
+    def relocate(self, i, k):
+        """
+        (distance delta, feasible) of moving the stop at position i between positions
+        k and k + 1 of the same route (k not i - 1 or i); needs a schedule built with
+        `relocations`. Exact and O(1): the new route is the concatenation of an unchanged
+        prefix, the stop, the stops it jumps over and an unchanged suffix (or prefix,
+        jumped stops, stop, suffix when moving forward). The load is unchanged.
+        """
+        route = self.route
+        stop = route[i]
+        delta = self.insertion(k, stop, check_load=False)[0] + self.removal(i)
+        node = self.nodes[i]
+        if k > i:
+            # 0..i-1, i+1..k, i, k+1..n-1
+            segment = concatenate(self.prefix[i - 1], self._middle(i + 1, k),
+                                  self._leg(route[i - 1], route[i + 1]))
+            segment = concatenate(segment, node, self._leg(route[k], stop))
+            segment = concatenate(segment, self.suffix[k + 1], self._leg(stop, route[k + 1]))
+        else:
+            # 0..k, i, k+1..i-1, i+1..n-1
+            segment = concatenate(self.prefix[k], node, self._leg(route[k], stop))
+            segment = concatenate(segment, self._middle(k + 1, i - 1), self._leg(stop, route[k + 1]))
+            segment = concatenate(segment, self.suffix[i + 1], self._leg(route[i - 1], route[i + 1]))
+        return delta, segment[1] <= self.EPSILON
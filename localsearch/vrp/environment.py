@@ -0,0 +1,83 @@
+import numpy as np
+
+class VRPEnvironment:
+    def __init__(self, width, height, num_deliveries=15, seed=None, capacity=None, time_window=None,
+                 horizon=480.0, speed=5.0, service_time=10.0):
+        """
+        Initializes the VRP environment.
+         - width, height: dimensions for the simulation area.
+         - num_deliveries: number of delivery points to generate.
+         - seed: int, SeedSequence or Generator for the environment's own RNG.
+         - capacity: vehicle capacity; when set, each delivery gets a demand of 1-10 units.
+         - time_window: window length (e.g. 120 minutes); when set, each delivery gets a
+           window reachable from the depot within `horizon`.
+         - horizon, speed, service_time: working day length, distance units per time unit
+           and time spent at each delivery (see constraints.py).
+        """
+        self.rng = np.random.default_rng(seed)
+        self.width = width
+        self.height = height
+        self.num_deliveries = num_deliveries
+        # Depot is set at the center of the simulation area
+        self.depot = (width // 2, height // 2)
+        self.deliveries = self.generate_deliveries()
+        # Optional constraints, drawn after the deliveries so the points do not change
+        self.capacity = capacity
+        self.horizon = horizon
+        self.speed = speed
+        self.service_time = service_time
+        self.demands = self.generate_demands() if capacity is not None else None
+        self.time_windows = self.generate_time_windows(time_window) if time_window is not None else None
+
+    def generate_deliveries(self):
+        """Randomly generate delivery points within the screen margins."""
+        margin = 50
+        xs = self.rng.integers(margin, self.width - margin, size=self.num_deliveries, endpoint=True)
+        ys = self.rng.integers(margin, self.height - margin, size=self.num_deliveries, endpoint=True)
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def generate_demands(self, max_demand=10):
+        """Random demand per delivery, 1..max_demand units."""
+        return self.rng.integers(1, max_demand, size=self.num_deliveries, endpoint=True).tolist()
+
+    def generate_time_windows(self, length):
+        """
+        Random (earliest, latest) window of `length` per delivery, opening no earlier than
+        a direct drive from the depot and closing in time to drive back before the horizon.
+        """
+        points = np.array(self.deliveries, dtype=float)
+        direct = np.hypot(points[:, 0] - self.depot[0], points[:, 1] - self.depot[1]) / self.speed
+        latest_open = np.maximum(direct, self.horizon - length - self.service_time - direct)
+        opens = direct + self.rng.random(self.num_deliveries) * (latest_open - direct)
+        return list(zip(opens.tolist(), (opens + length).tolist()))
+
+    def constraints(self, distance_fn=None):
+        """
+        RouteConstraints for this instance, or None without demands or time windows. The
+        working day (horizon) only binds when there are time windows; capacity-only
+        instances are untimed.
+        """
+        if self.demands is None and self.time_windows is None:
+            return None
+        from localsearch.vrp.constraints import RouteConstraints
+        horizon = self.horizon if self.time_windows is not None else None
+        return RouteConstraints(self.depot, self.deliveries, self.demands, self.time_windows, self.capacity,
+                                self.service_time, self.speed, horizon, distance_fn=distance_fn)
+
+    def road_distances(self, nodes_path, edges_path, cache_dir=None):
+        """
+        roads.RoadDistances between the depot and deliveries over the road network in the
+        given CSV files (see RoadNetwork.from_files), or None without a nodes path. The
+        matrix is cached in cache_dir and reused by later runs on the same stops.
+        """
+        if nodes_path is None:
+            return None
+        from localsearch.vrp.roads import RoadNetwork
+        network = RoadNetwork.from_files(nodes_path, edges_path)
+        # A window's worth of stops is quick to solve in this process
+        return network.cost_matrix([self.depot] + self.deliveries, cache_dir=cache_dir, workers=0)
+
+    def draw(self, screen):
+        """This method is kept for reference but is not used directly 
+           since drawing is handled via transform functions."""
+        pass
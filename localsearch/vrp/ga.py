@@ -0,0 +1,760 @@
+import heapq
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+def distance(a, b):
+    return math.hypot(a[0] - b[0], a[1] - b[1])
+
+class LocalSearch:
+    """
+    2-opt and Or-opt improvement of one route (depot -> points -> depot), restricted to
+    each stop's nearest neighbours and driven by don't-look bits: a stop is only
+    re-examined after a move touches it, so polishing an almost-good route is cheap.
+    Used by RouteGASolver as the memetic step on offspring.
+    """
+    def __init__(self, depot, route_points, num_neighbors=8, max_segment=3, distance_fn=None):
+        self.nodes = [depot] + list(route_points)  # node 0 is the depot
+        if distance_fn is not None:
+            # Moves assume symmetric costs; RouteGASolver.polish re-checks results under distance_fn
+            dist = np.array([[distance_fn(p, q) for q in self.nodes] for p in self.nodes], dtype=float)
+        else:
+            xy = np.array([(p[0], p[1]) for p in self.nodes], dtype=float)
+            dist = np.hypot(xy[:, None, 0] - xy[None, :, 0], xy[:, None, 1] - xy[None, :, 1])
+        self.dist = dist.tolist()
+        np.fill_diagonal(dist, np.inf)
+        k = min(num_neighbors, len(self.nodes) - 1)
+        self.neighbors = np.argsort(dist, axis=1)[:, :k].tolist()  # nearest first
+        self.max_segment = max_segment
+        # Node ids per point; repeated coordinates get distinct ids
+        self.ids = {}
+        for node, point in enumerate(route_points, start=1):
+            self.ids.setdefault(point, []).append(node)
+
+    def encode(self, route):
+        used = {}
+        tour = [0]
+        for point in route:
+            k = used.get(point, 0)
+            used[point] = k + 1
+            tour.append(self.ids[point][k])
+        return tour
+
+    def decode(self, tour):
+        return [self.nodes[node] for node in tour[1:]]
+
+    def improve(self, route, max_evaluations=5000):
+        """
+        Apply improving moves until no stop is active or `max_evaluations` candidate moves
+        have been checked. Returns (route, gain, checked, applied), the last two being
+        {move type: count} dicts of candidate moves evaluated and moves applied.
+        """
+        tour = self.encode(route)
+        n = len(tour)
+        checked = {"2opt": 0, "oropt": 0}
+        applied = {"2opt": 0, "oropt": 0}
+        if n < 4:
+            return route, 0.0, checked, applied
+        pos = [0] * n
+        for i, node in enumerate(tour):
+            pos[node] = i
+        queue = deque(tour[1:])
+        active = [True] * n  # don't-look bits, inverted: True means "look at this stop"
+        active[0] = False    # the depot never starts a move
+        gain = 0.0
+        evaluations = 0
+        while queue and evaluations < max_evaluations:
+            a = queue.popleft()
+            active[a] = False
+            for move_type, move in (("2opt", self._two_opt), ("oropt", self._or_opt)):
+                delta, touched, count = move(tour, pos, a)
+                checked[move_type] += count
+                evaluations += count
+                if touched:
+                    gain += delta
+                    applied[move_type] += 1
+                    for node in touched:
+                        if node and not active[node]:
+                            active[node] = True
+                            queue.append(node)
+                    break
+        return self.decode(tour), gain, checked, applied
+
+    def _reverse(self, tour, pos, lo, hi):
+        tour[lo:hi + 1] = tour[lo:hi + 1][::-1]
+        for i in range(lo, hi + 1):
+            pos[tour[i]] = i
+
+    def _two_opt(self, tour, pos, a):
+        """First improving 2-opt move replacing an edge at `a` with (a, neighbour)."""
+        D = self.dist
+        n = len(tour)
+        i = pos[a]
+        checked = 0
+        for direction in (1, -1):
+            b = tour[(i + direction) % n]
+            d_ab = D[a][b]
+            for c in self.neighbors[a]:
+                d_ac = D[a][c]
+                if d_ac >= d_ab:
+                    break  # neighbours are sorted, so no later one can gain either
+                j = pos[c]
+                d = tour[(j + direction) % n]
+                if c == b or d == a:
+                    continue
+                checked += 1
+                delta = d_ab + D[c][d] - d_ac - D[b][d]
+                if delta > 1e-9:
+                    lo, hi = min(i, j), max(i, j)
+                    if direction == 1:
+                        self._reverse(tour, pos, lo + 1, hi)
+                    elif lo > 0:
+                        self._reverse(tour, pos, lo, hi - 1)
+                    else:
+                        self._reverse(tour, pos, hi, n - 1)  # keep the depot at position 0
+                    return delta, (a, b, c, d), checked
+        return 0.0, None, checked
+
+    def _or_opt(self, tour, pos, a):
+        """First improving move of a segment of 1..max_segment stops starting at `a` next to a neighbour."""
+        D = self.dist
+        n = len(tour)
+        i = pos[a]
+        checked = 0
+        for length in range(1, self.max_segment + 1):
+            if i + length > n:
+                break
+            e = tour[i + length - 1]
+            p = tour[i - 1]
+            nx = tour[(i + length) % n]
+            removal = D[p][a] + D[e][nx] - D[p][nx]
+            if removal <= 1e-9:
+                continue
+            for c in self.neighbors[a]:
+                if D[c][a] >= removal:
+                    break
+                j = pos[c]
+                if i <= j < i + length:
+                    continue
+                # Insert after c (c a..e succ) or before c (pred e..a c) so a ends up next to c
+                for x, y, reverse in ((c, tour[(j + 1) % n], False), (tour[j - 1], c, True)):
+                    if i <= pos[x] < i + length or i <= pos[y] < i + length:
+                        continue
+                    checked += 1
+                    if reverse:
+                        insertion = D[x][e] + D[a][y] - D[x][y]
+                    else:
+                        insertion = D[x][a] + D[e][y] - D[x][y]
+                    delta = removal - insertion
+                    if delta > 1e-9:
+                        segment = tour[i:i + length]
+                        del tour[i:i + length]
+                        k = tour.index(x) + 1
+                        tour[k:k] = segment[::-1] if reverse else segment
+                        for idx, node in enumerate(tour):
+                            pos[node] = idx
+                        return delta, (p, nx, a, e, x, y), checked
+        return 0.0, None, checked
+
+class RouteGASolver:
+    """
+    Solves a single route optimization problem using a genetic algorithm.
+    The candidate solution is a permutation of the delivery points assigned to a vehicle.
+    The complete route is assumed to be: depot -> candidate permutation -> depot.
+    """
+    # Values written to a trace recorder, in order
+    TRACE_FIELDS = ("best_distance", "avg_fitness", "diversity", "distinct")
+
+    def __init__(self, depot, route_points, population_size=100, mutation_rate=0.01,
+                 metrics=None, cache_size=10000, seed=None, local_search_budget=0,
+                 local_search_evaluations=2000, num_neighbors=8, steady_state=False, offspring_per_step=2,
+                 eliminate_duplicates=True, stagnation_limit=None, min_diversity=None, trace=None,
+                 constraints=None, penalty_weight=100.0, initial_solution=None, distance_fn=None,
+                 state=None):
+        """
+        seed: int, np.random.SeedSequence or np.random.Generator for this solver's own RNG.
+        local_search_budget: routes polished by LocalSearch per generation (the elite first,
+        then new children); 0 turns the memetic step off. local_search_evaluations caps the
+        candidate moves checked per polished route.
+        steady_state: breed `offspring_per_step` children at a time into preallocated buffers
+        and overwrite the worst individuals in place instead of rebuilding the population
+        every generation (see steady_state_generation).
+        eliminate_duplicates: give children that repeat a chromosome already in the next
+        population extra random swaps (steady-state mode always rejects duplicates).
+        stagnation_limit, min_diversity: stopping rules checked by convergence(); None disables.
+        trace: optional TraceRecorder over TRACE_FIELDS, written by run_generation when due.
+        constraints: optional RouteConstraints; fitness then adds penalty_weight times the
+        route's lateness plus overload, so infeasible candidates survive only while nothing
+        better exists. initial_solution: an ordering of route_points (e.g. a feasible
+        construction) placed in the initial population.
+        distance_fn: optional callable (a, b) -> travel cost between two stops (e.g.
+        roads.RoadDistances); straight-line distance by default.
+        state: optional state_dict() to resume from instead of building and scoring a new
+        population (seed and initial_solution are then unused).
+        """
+        self.rng = np.random.default_rng(seed)
+        self.depot = depot
+        self.route_points = route_points[:]  # list of delivery points for this vehicle
+        self.population_size = population_size
+        self.mutation_rate = mutation_rate
+        self.metrics = metrics  # optional SolverMetrics; skipped when None
+        self.trace = trace
+        self.constraints = constraints
+        self.penalty_weight = penalty_weight
+        self.distance_fn = distance_fn
+        # Fitness cache keyed by the route tuple. Elites and clones are re-scored every
+        # generation, so this saves most of those evaluations. Cleared when full.
+        self.cache_size = cache_size
+        self.fitness_cache = {}
+        self.local_search_budget = local_search_budget
+        self.local_search_evaluations = local_search_evaluations
+        self.local_search = None
+        if local_search_budget > 0 and len(self.route_points) >= 3:
+            self.local_search = LocalSearch(depot, self.route_points, num_neighbors, distance_fn=distance_fn)
+        self.steady_state = steady_state
+        self.offspring_per_step = offspring_per_step
+        # Incremental population statistics, built on the first steady-state generation
+        self.fitness_sum = 0.0
+        self.member_counts = {}   # route tuple -> copies in the population
+        self._worst_heap = None   # (fitness, index) min-heap; None until steady state starts
+        self._buffers = None
+        self.eliminate_duplicates = eliminate_duplicates
+        self.duplicates_removed = 0
+        # Stopping rules
+        self.stagnation_limit = stagnation_limit
+        self.min_diversity = min_diversity
+        self.best_seen = 0
+        self.last_improvement = 0  # generation of the last best-fitness improvement
+        self.population = []
+        self.fitness_values = []
+        self.best_solution = None
+        self.best_fitness = 0
+        self.generation = 0
+        if state is not None:
+            self.load_state_dict(state)
+            return
+        self.initialize_population()
+        if initial_solution is not None:
+            self.population[0] = initial_solution[:]
+        self.evaluate_population()  # Evaluate initial population so best_solution is set
+        self.best_seen = self.best_fitness
+    
+    def initialize_population(self):
+        base = self.route_points[:]
+        # One RNG call for the whole population: argsort of uniform keys gives random permutations
+        orders = self.rng.random((self.population_size, len(base))).argsort(axis=1)
+        for order in orders.tolist():
+            self.population.append([base[k] for k in order])
+    
+    def total_distance(self, route):
+        """Compute total route distance: depot -> route -> depot."""
+        if not route:
+            return 0.0
+        leg = distance if self.distance_fn is None else self.distance_fn
+        d = leg(self.depot, route[0])
+        for i in range(len(route) - 1):
+            d += leg(route[i], route[i+1])
+        d += leg(route[-1], self.depot)
+        return d
+    
+    def fitness(self, route):
+        """Define fitness as the inverse of the route distance (plus any constraint penalty)."""
+        if self.constraints is None:
+            return 1.0 / (self.total_distance(route) + 1e-6)
+        # One pass gives the distance and both violations
+        d, lateness, overload = self.constraints.evaluate([self.depot] + route + [self.depot])
+        d += self.penalty_weight * (lateness + overload)
+        return 1.0 / (d + 1e-6)
+    
+    def violation(self, route):
+        """(lateness, overload) of depot -> route -> depot; (0, 0) without constraints."""
+        if self.constraints is None:
+            return 0.0, 0
+        return self.constraints.violation([self.depot] + route + [self.depot])
+    
+    def cached_fitness(self, route):
+        """Fitness with memoization on the route's point sequence."""
+        key = tuple(route)
+        fit = self.fitness_cache.get(key)
+        if fit is not None:
+            if self.metrics is not None:
+                self.metrics.cache_hits += 1
+            return fit
+        fit = self.fitness(route)
+        if self.metrics is not None:
+            self.metrics.evaluations += 1
+        if len(self.fitness_cache) >= self.cache_size:
+            self.fitness_cache.clear()
+        self.fitness_cache[key] = fit
+        return fit
+
+    def evaluate_population(self):
+        metrics = self.metrics
+        if metrics is not None:
+            t0 = time.perf_counter()
+        self.fitness_values = []
+        for candidate in self.population:
+            fit = self.cached_fitness(candidate)
+            self.fitness_values.append(fit)
+        if metrics is not None:
+            metrics.add_phase_time("evaluation", time.perf_counter() - t0)
+        self.best_fitness = max(self.fitness_values)
+        best_index = self.fitness_values.index(self.best_fitness)
+        self.best_solution = self.population[best_index]
+    
+    def select_parents(self, count):
+        """Tournament selection of `count` parents at once (entrants drawn with replacement)."""
+        tournament_size = 5
+        fitness = np.asarray(self.fitness_values)
+        entrants = self.rng.integers(0, len(self.population), size=(count, tournament_size))
+        winners = entrants[np.arange(count), fitness[entrants].argmax(axis=1)]
+        return [self.population[k] for k in winners.tolist()]
+    
+    def draw_cut_points(self, count):
+        """Draw `count` pairs of distinct OX cut points a < b."""
+        size = len(self.route_points)
+        first = self.rng.integers(0, size, size=count)
+        # A non-zero offset modulo size guarantees the two cut points differ
+        second = (first + self.rng.integers(1, size, size=count)) % size
+        return np.minimum(first, second).tolist(), np.maximum(first, second).tolist()
+    
+    def crossover(self, parent1, parent2, a, b):
+        """Order crossover (OX) keeping parent1[a:b+1] in place"""
+        return self.crossover_into([None] * len(parent1), parent1, parent2, a, b)
+    
+    def crossover_into(self, child, parent1, parent2, a, b):
+        """OX written into the existing list `child` (a steady-state buffer)."""
+        size = len(parent1)
+        child[a:b+1] = parent1[a:b+1]
+        kept = set(child[a:b+1])
+        pos = (b + 1) % size
+        for gene in parent2:
+            if gene not in kept:
+                child[pos] = gene
+                pos = (pos + 1) % size
+        return child
+    
+    def mutate(self, candidate, positions, targets):
+        """Swap mutation: swap each of `positions` with the matching entry of `targets`."""
+        for i, j in zip(positions, targets):
+            candidate[i], candidate[j] = candidate[j], candidate[i]
+        return candidate
+    
+    def polish(self, candidate):
+        """Memetic step: return `candidate` improved by a budgeted LocalSearch pass."""
+        route, gain, checked, applied = self.local_search.improve(candidate, self.local_search_evaluations)
+        if self.metrics is not None:
+            # Every checked move counts as proposed; applied moves are the accepted ones
+            for move_type in checked:
+                self.metrics.propose(move_type, checked[move_type])
+                self.metrics.accept(move_type, applied[move_type])
+        if self.constraints is not None or self.distance_fn is not None:
+            # The local search ignores time windows and assumes symmetric costs; keep only
+            # results that are no worse under the real fitness
+            if self.fitness(route) < self.fitness(candidate):
+                return candidate
+        return route
+    
+    def next_generation(self):
+        if self.steady_state:
+            self.steady_state_generation()
+            return
+        metrics = self.metrics
+        self.evaluate_population()
+        n_children = self.population_size - 1
+        size = len(self.route_points)
+        # Every random number this generation needs is drawn up front, one RNG call per kind
+        if metrics is not None:
+            t0 = time.perf_counter()
+        parents = self.select_parents(2 * n_children)
+        if metrics is not None:
+            t1 = time.perf_counter()
+        cut_a, cut_b = self.draw_cut_points(n_children)
+        children = [self.crossover(parents[2 * k], parents[2 * k + 1], cut_a[k], cut_b[k])
+                    for k in range(n_children)]
+        if metrics is not None:
+            t2 = time.perf_counter()
+        mask = self.rng.random((n_children, size)) < self.mutation_rate
+        positions = np.nonzero(mask)[1].tolist()  # row-major, so grouped by child
+        targets = self.rng.integers(0, size, size=len(positions)).tolist()
+        ends = np.cumsum(mask.sum(axis=1)).tolist()
+        start = 0
+        for child, end in zip(children, ends):
+            self.mutate(child, positions[start:end], targets[start:end])
+            start = end
+        if metrics is not None:
+            t3 = time.perf_counter()
+            metrics.add_phase_time("selection", t1 - t0)
+            metrics.add_phase_time("crossover", t2 - t1)
+            metrics.add_phase_time("mutation", t3 - t2)
+            # Generational replacement: every child enters the next population
+            metrics.propose("ox", n_children)
+            metrics.accept("ox", n_children)
+            metrics.propose("swap", len(positions))
+            metrics.accept("swap", len(positions))
+        elite = self.best_solution[:]
+        if self.local_search is not None:
+            if metrics is not None:
+                t4 = time.perf_counter()
+            elite = self.polish(elite)
+            for k in range(min(self.local_search_budget - 1, n_children)):
+                children[k] = self.polish(children[k])
+            if metrics is not None:
+                metrics.add_phase_time("local_search", time.perf_counter() - t4)
+        if self.eliminate_duplicates:
+            self.remove_duplicates(elite, children)
+        # Elitism: preserve the best candidate
+        self.population = [elite] + children
+        self.generation += 1
+        if metrics is not None:
+            metrics.iterations += 1
+    
+    def run_generation(self):
+        self.next_generation()
+        if not self.steady_state:
+            self.evaluate_population()
+        if self.best_fitness > self.best_seen:
+            self.best_seen = self.best_fitness
+            self.last_improvement = self.generation
+        if self.trace is not None and self.generation >= self.trace.next_record:
+            stats = self.population_stats()
+            self.trace.record(self.generation, (self.total_distance(self.best_solution), stats["average"],
+                                                self.diversity(), stats["distinct"]))
+    
+    def remove_duplicates(self, elite, children, max_tries=3):
+        """
+        Hash every chromosome of the next population; a child equal to the elite or an
+        earlier child gets up to `max_tries` random swaps until it is new. Clones only
+        cost evaluations (cache hits at best) and crowd out diversity.
+        """
+        size = len(self.route_points)
+        seen = {tuple(elite)}
+        for child in children:
+            key = tuple(child)
+            if key in seen and size > 1:
+                self.duplicates_removed += 1
+                for i, j in self.rng.integers(0, size, size=(max_tries, 2)).tolist():
+                    child[i], child[j] = child[j], child[i]
+                    key = tuple(child)
+                    if key not in seen:
+                        break
+            seen.add(key)
+    
+    def diversity(self, samples=16):
+        """
+        Cheap diversity estimate in [0, 1]: one minus the mean fraction of route edges
+        (depot legs included) shared by `samples` fixed pairs of individuals k and
+        k + population_size / 2. Uses no randomness, so checking it never changes a run.
+        """
+        size = len(self.population)
+        if size < 2:
+            return 0.0
+        half = size // 2
+        pairs = range(0, size, max(1, size // samples))[:samples]
+        overlap = 0.0
+        for k in pairs:
+            edges = self.route_edges(self.population[k])
+            overlap += len(edges & self.route_edges(self.population[(k + half) % size])) / len(edges)
+        return 1.0 - overlap / len(pairs)
+    
+    def route_edges(self, candidate):
+        """Undirected edges of depot -> candidate -> depot as a set of point pairs."""
+        route = [self.depot] + candidate + [self.depot]
+        return {(p, q) if p <= q else (q, p) for p, q in zip(route, route[1:])}
+    
+    def convergence(self):
+        """Name of the stopping rule that fired ("stagnation", "low_diversity" or "trivial"), or None."""
+        if len(self.route_points) < 2:
+            return "trivial"  # nothing to reorder
+        if self.stagnation_limit is not None and self.generation - self.last_improvement >= self.stagnation_limit:
+            return "stagnation"
+        if self.min_diversity is not None and self.diversity() < self.min_diversity:
+            return "low_diversity"
+        return None
+    
+    def start_steady_state(self):
+        """Build the statistics steady-state steps keep up to date from the scored population."""
+        if len(self.fitness_values) != len(self.population):
+            self.evaluate_population()
+        self.fitness_sum = sum(self.fitness_values)
+        self.member_counts = {}
+        for candidate in self.population:
+            key = tuple(candidate)
+            self.member_counts[key] = self.member_counts.get(key, 0) + 1
+        # Ties break on the index, so the worst slot does not depend on the heap's history
+        self._worst_heap = [(fit, k) for k, fit in enumerate(self.fitness_values)]
+        heapq.heapify(self._worst_heap)
+        self._buffers = [[None] * len(self.route_points) for _ in range(self.offspring_per_step)]
+    
+    def steady_state_generation(self):
+        """
+        Breed population_size - 1 children, `offspring_per_step` at a time, into preallocated
+        buffers. A child is copied over the worst individual (in place) when it is fitter and
+        not already in the population; best, fitness sum and distinct count are updated for
+        that one slot, so no step rebuilds or rescans the population.
+        """
+        if self._worst_heap is None:
+            self.start_steady_state()
+        metrics = self.metrics
+        if metrics is not None:
+            t0 = time.perf_counter()
+        n_children = self.population_size - 1
+        size = len(self.route_points)
+        # Every random number this generation needs is drawn up front, as in next_generation;
+        # only the tournament winners depend on the population as it changes
+        entrants = self.rng.integers(0, len(self.population), size=(2 * n_children, 5)).tolist()
+        cut_a, cut_b = self.draw_cut_points(n_children)
+        mask = self.rng.random((n_children, size)) < self.mutation_rate
+        positions = np.nonzero(mask)[1].tolist()
+        targets = self.rng.integers(0, size, size=len(positions)).tolist()
+        ends = [0] + np.cumsum(mask.sum(axis=1)).tolist()
+        fitness = self.fitness_values.__getitem__
+        replaced = 0
+        for first in range(0, n_children, self.offspring_per_step):
+            batch = range(first, min(first + self.offspring_per_step, n_children))
+            for buffer, k in zip(self._buffers, batch):
+                parent1 = self.population[max(entrants[2 * k], key=fitness)]
+                parent2 = self.population[max(entrants[2 * k + 1], key=fitness)]
+                self.crossover_into(buffer, parent1, parent2, cut_a[k], cut_b[k])
+                self.mutate(buffer, positions[ends[k]:ends[k + 1]], targets[ends[k]:ends[k + 1]])
+                if self.local_search is not None and k < self.local_search_budget:
+                    buffer[:] = self.polish(buffer)
+            for buffer, k in zip(self._buffers, batch):
+                replaced += self.replace_worst(buffer)
+        self.generation += 1
+        if metrics is not None:
+            metrics.add_phase_time("steady_state", time.perf_counter() - t0)
+            metrics.propose("ox", n_children)
+            metrics.accept("ox", replaced)
+            metrics.propose("swap", len(positions))
+            metrics.accept("swap", len(positions))
+            metrics.iterations += 1
+    
+    def replace_worst(self, child):
+        """Copy `child` over the worst individual if it is fitter and new; returns whether it was."""
+        key = tuple(child)
+        if key in self.member_counts:
+            self.duplicates_removed += 1
+            return False
+        fit = self.cached_fitness(child)
+        worst_fit, worst = self._worst_heap[0]
+        if fit <= worst_fit:
+            return False
+        slot = self.population[worst]
+        old_key = tuple(slot)
+        if self.member_counts[old_key] > 1:
+            self.member_counts[old_key] -= 1
+        else:
+            del self.member_counts[old_key]
+        self.member_counts[key] = 1
+        slot[:] = child
+        self.fitness_sum += fit - worst_fit
+        self.fitness_values[worst] = fit
+        heapq.heapreplace(self._worst_heap, (fit, worst))
+        if fit > self.best_fitness:
+            self.best_fitness = fit
+            self.best_solution = slot
+        return True
+    
+    def population_stats(self):
+        """Best and average fitness and the fraction of distinct individuals."""
+        size = len(self.population)
+        if self._worst_heap is not None:
+            # Kept up to date by replace_worst
+            average = self.fitness_sum / size
+            distinct = len(self.member_counts)
+        else:
+            average = sum(self.fitness_values) / len(self.fitness_values)
+            distinct = len(set(map(tuple, self.population)))
+        return {"best": self.best_fitness, "average": average, "distinct": distinct / size}
+    
+    def state_dict(self):
+        """Return everything needed to resume this solver exactly (see checkpoint.py)."""
+        # The fitness cache is left out: it only saves work and does not affect results.
+        return {
+            "route_points": self.route_points,
+            "population_size": self.population_size,
+            "mutation_rate": self.mutation_rate,
+            # Copies: steady-state mode overwrites population members in place
+            "population": [candidate[:] for candidate in self.population],
+            "fitness_values": self.fitness_values[:],
+            "best_solution": self.best_solution[:],
+            # The population slot best_solution refers to, so ties resolve the same after a resume
+            "best_index": next((k for k, candidate in enumerate(self.population)
+                                if candidate is self.best_solution), None),
+            "best_fitness": self.best_fitness,
+            "generation": self.generation,
+            "best_seen": self.best_seen,
+            "last_improvement": self.last_improvement,
+            "duplicates_removed": self.duplicates_removed,
+            # Steady-state statistics as replace_worst left them (None before steady state
+            # starts); the running fitness sum would round differently if rebuilt
+            "worst_heap": None if self._worst_heap is None else self._worst_heap[:],
+            "fitness_sum": self.fitness_sum,
+            "member_counts": dict(self.member_counts),
+            "rng": self.rng.bit_generator.state,
+        }
+    
+    def load_state_dict(self, state):
+        """Restore a state produced by state_dict()."""
+        self.route_points = state["route_points"][:]
+        self.population_size = state["population_size"]
+        self.mutation_rate = state["mutation_rate"]
+        self.population = [candidate[:] for candidate in state["population"]]
+        self.fitness_values = state["fitness_values"][:]
+        best_index = state.get("best_index")
+        if best_index is None:
+            self.best_solution = state["best_solution"][:]
+        else:
+            self.best_solution = self.population[best_index]
+        self.best_fitness = state["best_fitness"]
+        self.generation = state["generation"]
+        self.best_seen = state["best_seen"]
+        self.last_improvement = state["last_improvement"]
+        self.duplicates_removed = state["duplicates_removed"]
+        self.rng.bit_generator.state = state["rng"]
+        self._worst_heap = None if state.get("worst_heap") is None else state["worst_heap"][:]
+        self.fitness_sum = state.get("fitness_sum", 0.0)
+        self.member_counts = dict(state.get("member_counts", {}))
+        if self._worst_heap is not None:
+            self._buffers = [[None] * len(self.route_points) for _ in range(self.offspring_per_step)]
+    
+    def get_metrics(self):
+        """Return a snapshot of the hot-path counters, or None if metrics are disabled."""
+        if self.metrics is None:
+            return None
+        return self.metrics.snapshot()
+
+class VRPAgentGenetic:
+    """
+    Solves the VRP by partitioning the delivery points among a fixed number of vehicles
+    and creating one RouteGASolver per vehicle.
+    """
+    def __init__(self, depot, deliveries, num_vehicles, population_size=100, mutation_rate=0.01,
+                 metrics_factory=None, seed=None, local_search_budget=0, local_search_evaluations=2000,
+                 steady_state=False, stagnation_limit=None, min_diversity=None, trace_factory=None,
+                 constraints=None, distance_fn=None, state=None):
+        """
+        metrics_factory: optional callable (e.g. SolverMetrics) giving each
+        per-vehicle solver its own metrics object. Metrics are off when None.
+        seed: int or np.random.SeedSequence; each vehicle solver gets an independent child stream.
+        local_search_budget, local_search_evaluations: memetic step settings passed to
+        every RouteGASolver (off when the budget is 0).
+        steady_state: run every RouteGASolver in steady-state mode.
+        stagnation_limit, min_diversity: per-vehicle stopping rules (see RouteGASolver.convergence);
+        a vehicle whose solver has converged is skipped by run_generation.
+        trace_factory: optional callable taking the vehicle index and returning a trace
+        recorder (e.g. a TraceRecorder over RouteGASolver.TRACE_FIELDS) for that solver.
+        constraints: optional RouteConstraints. Deliveries are then split by cheapest
+        feasible insertion (stops that fit nowhere go to self.unassigned), each solver is
+        seeded with its feasible ordering and scores candidates with a constraint penalty.
+        distance_fn: optional callable (a, b) -> travel cost used by every solver.
+        state: optional state_dict() to resume from; the deliveries are then not partitioned
+        again and no solver builds an initial population.
+        """
+        self.depot = depot
+        self.deliveries = deliveries[:]
+        self.num_vehicles = num_vehicles
+        self.population_size = population_size
+        self.mutation_rate = mutation_rate
+        self.constraints = constraints
+        if state is None:
+            self.unassigned = []
+            self.partitions = self.partition_deliveries()
+        else:
+            if len(state["solvers"]) != num_vehicles:
+                raise ValueError(f"State holds {len(state['solvers'])} vehicle solvers, "
+                                 f"agent has {num_vehicles}")
+            self.unassigned = state.get("unassigned", [])[:]
+            self.partitions = [part[:] for part in state["partitions"]]
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        solver_states = [None] * len(self.partitions) if state is None else state["solvers"]
+        self.solvers = []
+        for k, (part, child_seed) in enumerate(zip(self.partitions, seed.spawn(len(self.partitions)))):
+            metrics = metrics_factory() if metrics_factory is not None else None
+            solver = RouteGASolver(depot, part, population_size, mutation_rate, metrics=metrics,
+                                   seed=child_seed, local_search_budget=local_search_budget,
+                                   local_search_evaluations=local_search_evaluations,
+                                   steady_state=steady_state, stagnation_limit=stagnation_limit,
+                                   min_diversity=min_diversity,
+                                   trace=trace_factory(k) if trace_factory is not None else None,
+                                   constraints=constraints,
+                                   initial_solution=part if constraints is not None else None,
+                                   distance_fn=distance_fn, state=solver_states[k])
+            self.solvers.append(solver)
+    
+    def partition_deliveries(self):
+        """Sort deliveries by angle from the depot and assign them round-robin."""
+        if self.constraints is not None:
+            routes, self.unassigned = self.constraints.construct_routes(self.deliveries, self.num_vehicles)
+            return [route[1:-1] for route in routes]
+        points_with_angle = []
+        for point in self.deliveries:
+            dx = point[0] - self.depot[0]
+            dy = point[1] - self.depot[1]
+            angle = math.atan2(dy, dx)
+            points_with_angle.append((point, angle))
+        points_with_angle.sort(key=lambda x: x[1])
+        partitions = [[] for _ in range(self.num_vehicles)]
+        for i, (point, angle) in enumerate(points_with_angle):
+            partitions[i % self.num_vehicles].append(point)
+        return partitions
+    
+    def run_generation(self):
+        for solver in self.solvers:
+            if solver.convergence() is None:
+                solver.run_generation()
+    
+    def is_converged(self):
+        """True once every vehicle's solver has met a stopping rule."""
+        return all(solver.convergence() is not None for solver in self.solvers)
+    
+    def get_best_routes(self):
+        routes = []
+        for solver in self.solvers:
+            best = solver.best_solution
+            # Complete route: depot -> best solution -> depot
+            route = [self.depot] + best + [self.depot]
+            routes.append(route)
+        return routes
+    
+    def get_generation_info(self):
+        info = []
+        for solver in self.solvers:
+            stats = solver.population_stats()
+            info.append({
+                "generation": solver.generation,
+                "max_fitness": stats["best"],
+                "avg_fitness": stats["average"],
+                "distinct": stats["distinct"],
+                "diversity": solver.diversity(),
+                "stagnation": solver.generation - solver.last_improvement,
+                "duplicates_removed": solver.duplicates_removed,
+                "converged": solver.convergence(),
+                "feasible": solver.violation(solver.best_solution) == (0.0, 0)
+            })
+        return info
+    
+    def state_dict(self):
+        """Return the partitions, the unassigned stops and every per-vehicle solver state."""
+        return {
+            "partitions": self.partitions,
+            "unassigned": self.unassigned[:],
+            "solvers": [solver.state_dict() for solver in self.solvers],
+        }
+    
+    def load_state_dict(self, state):
+        """Restore a state produced by state_dict(); the agent must have the same vehicle count."""
+        if len(state["solvers"]) != len(self.solvers):
+            raise ValueError(f"State holds {len(state['solvers'])} vehicle solvers, agent has {len(self.solvers)}")
+        self.partitions = [part[:] for part in state["partitions"]]
+        self.unassigned = state.get("unassigned", self.unassigned)[:]
+        for solver, solver_state in zip(self.solvers, state["solvers"]):
+            solver.load_state_dict(solver_state)
+    
+    def get_metrics(self):
+        """Per-vehicle metrics snapshots (None entries when metrics are disabled)."""
+        return [solver.get_metrics() for solver in self.solvers]
@@ -0,0 +1,174 @@
+import hashlib
+import heapq
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# The graph of a worker process as Python lists, set once by _init_worker
+_graph = None
+
+
+def _init_worker(indptr, indices, weights):
+    global _graph
+    _graph = (indptr.tolist(), indices.tolist(), weights.tolist())
+
+
+def dijkstra(graph, source, targets):
+    """
+    Costs from `source` to every node in `targets` over graph = (indptr, indices, weights)
+    in CSR form (lists). Stops as soon as every target is settled; inf where unreachable.
+    """
+    indptr, indices, weights = graph
+    best = {source: 0.0}
+    settled = set()
+    remaining = set(targets)
+    heap = [(0.0, source)]
+    while heap and remaining:
+        cost, node = heapq.heappop(heap)
+        if node in settled:
+            continue
+        settled.add(node)
+        remaining.discard(node)
+        for k in range(indptr[node], indptr[node + 1]):
+            other = indices[k]
+            new_cost = cost + weights[k]
+            if new_cost < best.get(other, math.inf):
+                best[other] = new_cost
+                heapq.heappush(heap, (new_cost, other))
+    return [best.get(target, math.inf) for target in targets]
+
+
+def _rows(sources, targets):
+    """Worker task: one cost row per source node."""
+    return np.array([dijkstra(_graph, source, targets) for source in sources])
+
+
+class RoadNetwork:
+    """
+    A road graph for travel costs between stops: node coordinates plus an edge list
+    of (tail, head, cost), e.g. drive times exported from OSM. Stops are snapped to
+    their nearest node, and cost_matrix() runs Dijkstra from every stop (in parallel
+    across processes) to get all pairwise costs. Edges are two-way unless `directed`.
+    """
+    def __init__(self, node_xy, tails, heads, costs, directed=False):
+        self.node_xy = np.asarray(node_xy, dtype=float)
+        tails = np.asarray(tails, dtype=np.intp)
+        heads = np.asarray(heads, dtype=np.intp)
+        costs = np.asarray(costs, dtype=float)
+        if (costs < 0).any():
+            raise ValueError("Road costs must be non-negative")
+        self.directed = directed
+        if not directed:
+            tails, heads = np.concatenate([tails, heads]), np.concatenate([heads, tails])
+            costs = np.concatenate([costs, costs])
+        # Compressed sparse rows: the edges leaving node u are indptr[u]:indptr[u + 1]
+        order = np.argsort(tails, kind="stable")
+        self.indices = heads[order]
+        self.weights = costs[order]
+        counts = np.bincount(tails, minlength=len(self.node_xy))
+        self.indptr = np.concatenate(([0], np.cumsum(counts)))
+        digest = hashlib.sha1()
+        for array in (self.node_xy, self.indptr, self.indices, self.weights):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        self.digest = digest.hexdigest()
+
+    @classmethod
+    def from_files(cls, nodes_path, edges_path, directed=False):
+        """
+        Load comma-separated `id,x,y` node lines and `tail,head,cost` edge lines ('#'
+        starts a comment). Node ids may be arbitrary integers such as OSM ids.
+        """
+        nodes = np.loadtxt(nodes_path, delimiter=",", comments="#", ndmin=2)
+        edges = np.loadtxt(edges_path, delimiter=",", comments="#", ndmin=2)
+        ids = nodes[:, 0].astype(np.int64)
+        order = np.argsort(ids)
+        ends = edges[:, :2].astype(np.int64)
+        positions = np.minimum(np.searchsorted(ids, ends, sorter=order), len(ids) - 1)
+        if (ids[order][positions] != ends).any():
+            raise ValueError(f"{edges_path} has edges between nodes missing from {nodes_path}")
+        tails, heads = order[positions].T
+        return cls(nodes[:, 1:3], tails, heads, edges[:, 2], directed)
+
+    def snap(self, points, chunk=256):
+        """Nearest node of every point, `chunk` points at a time."""
+        xy = np.asarray(points, dtype=float)[:, :2]
+        nodes = np.empty(len(xy), dtype=np.intp)
+        for start in range(0, len(xy), chunk):
+            block = xy[start:start + chunk]
+            squared = ((block[:, None, :] - self.node_xy[None, :, :]) ** 2).sum(axis=2)
+            nodes[start:start + chunk] = squared.argmin(axis=1)
+        return nodes
+
+    def cost_matrix(self, points, cache_dir=None, workers=None, dtype=np.float32):
+        """
+        RoadDistances between `points` (depot and deliveries). With a `cache_dir` the
+        matrix is stored there as a .npy file named by a hash of the graph and the
+        snapped nodes, and opened as a read-only memory map, so a repeated solve of the
+        same instance reuses it without recomputing, and only the rows a solver
+        touches are read from disk. Rows are written as workers finish, so the whole
+        matrix is never held in memory. workers: processes for the Dijkstra runs
+        (default os.cpu_count(); 0 runs them in this process).
+        """
+        points = [tuple(p) for p in points]
+        nodes = self.snap(points)
+        dtype = np.dtype(dtype)
+        key = hashlib.sha1(f"{self.digest}:{dtype.str}:".encode() + nodes.tobytes()).hexdigest()
+        path = None if cache_dir is None else os.path.join(cache_dir, f"roads-{key}.npy")
+        if path is not None and os.path.exists(path):
+            return RoadDistances(points, np.load(path, mmap_mode="r"), key)
+        shape = (len(points), len(points))
+        if path is None:
+            matrix = np.empty(shape, dtype=dtype)
+        else:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            matrix = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype, shape=shape)
+        # Stops sharing a node share a row: run Dijkstra once per distinct node
+        unique, inverse = np.unique(nodes, return_inverse=True)
+        targets = unique.tolist()
+        workers = os.cpu_count() if workers is None else workers
+        chunks = [chunk for chunk in np.array_split(np.arange(len(unique)), max(1, workers) * 4) if len(chunk)]
+        if workers == 0:
+            _init_worker(self.indptr, self.indices, self.weights)
+            results = ((chunk, _rows(unique[chunk].tolist(), targets)) for chunk in chunks)
+            self._fill(matrix, inverse, results)
+        else:
+            with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                     initargs=(self.indptr, self.indices, self.weights)) as pool:
+                futures = [(chunk, pool.submit(_rows, unique[chunk].tolist(), targets)) for chunk in chunks]
+                self._fill(matrix, inverse, ((chunk, future.result()) for chunk, future in futures))
+        if not np.isfinite(matrix).all():
+            if path is not None:
+                del matrix
+                os.remove(tmp_path)
+            raise ValueError("Some stops are not connected by the road network")
+        if path is not None:
+            matrix.flush()
+            del matrix
+            os.replace(tmp_path, path)  # readers never see a half-written matrix
+            matrix = np.load(path, mmap_mode="r")
+        return RoadDistances(points, matrix, key)
+
+    def _fill(self, matrix, inverse, results):
+        """Scatter per-node rows (chunk of distinct nodes, costs to every distinct node) to stop rows."""
+        for chunk, rows in results:
+            for row, node in zip(rows, chunk.tolist()):
+                matrix[inverse == node] = row[inverse]
+
+
+class RoadDistances:
+    """
+    Injectable distance function (distance_fn= of the solvers and RouteConstraints):
+    calling it with two of the stops it was built for returns their road cost.
+    """
+    def __init__(self, points, matrix, key):
+        self.matrix = matrix
+        self.key = key
+        self.index = {}
+        for k, point in enumerate(points):
+            self.index.setdefault(point, k)
+
+    def __call__(self, a, b):
+        return float(self.matrix[self.index[a], self.index[b]])
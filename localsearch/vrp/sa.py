@@ -0,0 +1,334 @@
+import math
+import time
+
+import numpy as np
+
+def metropolis(delta, temperature, uniform):
+    """
+    Metropolis criterion: accept an improvement, or a cost increase `delta` with
+    probability exp(-delta / temperature).
+    """
+    return delta < 0 or uniform < math.exp(-delta / temperature)
+
+class VRPAgentSimulatedAnnealing:
+    def __init__(self, depot, deliveries, num_vehicles, 
+                 initial_temp=10000, cooling_rate=0.995, min_temp=1e-8, constraints=None, distance_fn=None):
+        """
+        depot: tuple (x, y) for the depot location.
+        deliveries: list of tuples [(x, y), ...] for delivery locations.
+        num_vehicles: number of vehicles (routes) to compute.
+        initial_temp, cooling_rate, min_temp: parameters for simulated annealing.
+        constraints: optional RouteConstraints (capacity and time windows, see constraints.py).
+        distance_fn: optional callable (a, b) -> travel cost, e.g. roads.RoadDistances;
+        straight-line distance by default.
+        """
+        self.depot = depot
+        self.deliveries = deliveries
+        self.num_vehicles = num_vehicles
+        self.initial_temp = initial_temp
+        self.cooling_rate = cooling_rate
+        self.min_temp = min_temp
+        self.constraints = constraints
+        self.distance_fn = distance_fn
+        self.unassigned = []  # stops no vehicle can serve within the constraints
+
+    def compute_initial_routes(self):
+        """
+        Partitions deliveries and builds initial routes for each vehicle.
+        Uses angle sorting and round-robin assignment.
+        Each route starts and ends at the depot.
+        With constraints, routes are built by cheapest feasible insertion instead and
+        stops that fit nowhere are left in self.unassigned.
+        """
+        if self.constraints is not None:
+            routes, self.unassigned = self.constraints.construct_routes(self.deliveries, self.num_vehicles)
+            return routes
+        # Compute angle for each delivery relative to the depot
+        points_with_angle = []
+        for point in self.deliveries:
+            dx = point[0] - self.depot[0]
+            dy = point[1] - self.depot[1]
+            angle = math.atan2(dy, dx)
+            points_with_angle.append((point, angle))
+        points_with_angle.sort(key=lambda x: x[1])
+        
+        # Partition deliveries among vehicles round-robin
+        partitions = [[] for _ in range(self.num_vehicles)]
+        for i, (point, angle) in enumerate(points_with_angle):
+            partitions[i % self.num_vehicles].append(point)
+        
+        routes = []
+        for part in partitions:
+            # If partition is empty, route is depot->depot
+            if not part:
+                routes.append([self.depot, self.depot])
+                continue
+            # Initial route: depot -> deliveries (in partition order) -> depot
+            route = [self.depot] + part + [self.depot]
+            routes.append(route)
+        return routes
+
+    def create_optimizers(self, routes, seed=None, metrics_factory=None, trace_factory=None):
+        """
+        Builds one SAOptimizer per route using this agent's SA parameters.
+        seed: int or np.random.SeedSequence; each optimizer gets an independent
+        child stream, so runs are reproducible regardless of what else runs in the process.
+        metrics_factory: optional callable (e.g. SolverMetrics) giving each optimizer its own metrics.
+        trace_factory: optional callable taking the vehicle index and returning a trace
+        recorder (e.g. a TraceRecorder over SAOptimizer.TRACE_FIELDS) for that optimizer.
+        """
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        return [SAOptimizer(route, self.initial_temp, self.cooling_rate, self.min_temp,
+                            metrics=metrics_factory() if metrics_factory is not None else None,
+                            seed=child_seed,
+                            trace=trace_factory(k) if trace_factory is not None else None,
+                            constraints=self.constraints, distance_fn=self.distance_fn)
+                for k, (route, child_seed) in enumerate(zip(routes, seed.spawn(len(routes))))]
+
+    def create_alns(self, routes, seed=None, metrics=None, trace=None, **options):
+        """
+        Builds one ALNSOptimizer (alns.py) over the whole fleet, starting from `routes`
+        and this agent's unassigned stops, with this agent's constraints, distances and
+        cooling schedule. The start temperature is scaled to the initial cost unless
+        given as initial_temp in `options`, which are passed on to ALNSOptimizer.
+        """
+        from localsearch.vrp.alns import ALNSOptimizer
+        options.setdefault("cooling_rate", self.cooling_rate)
+        options.setdefault("min_temp", self.min_temp)
+        return ALNSOptimizer(self.depot, routes, self.unassigned, constraints=self.constraints,
+                             distance_fn=self.distance_fn, metrics=metrics, seed=seed, trace=trace, **options)
+
+    def create_batch(self, routes, seed=None, metrics=None):
+        """
+        Builds one BatchedAnnealer (batch.py) stepping all `routes` in lockstep with this
+        agent's SA parameters; much faster than one SAOptimizer per route for large
+        fleets of small routes. Swap moves only, so it needs an unconstrained agent.
+        """
+        if self.constraints is not None:
+            raise ValueError("The batched annealer does not support route constraints")
+        from localsearch.vrp.batch import BatchedAnnealer
+        return BatchedAnnealer(routes, self.initial_temp, self.cooling_rate, self.min_temp, metrics=metrics,
+                               seed=seed, distance_fn=self.distance_fn)
+
+class SAOptimizer:
+    # Values written to a trace recorder, in order
+    TRACE_FIELDS = ("best_distance", "current_distance", "temperature", "acceptance_rate")
+
+    def __init__(self, route, initial_temp=10000, cooling_rate=0.995, min_temp=1e-8, metrics=None,
+                 seed=None, block_size=1024, trace=None, constraints=None, distance_fn=None):
+        """
+        Initializes the simulated annealing optimizer for one route.
+        route: initial route (list of points; depot is fixed at start and end).
+        initial_temp, cooling_rate, min_temp: SA parameters.
+        metrics: optional SolverMetrics; counters and timings are skipped when None.
+        seed: int, np.random.SeedSequence or np.random.Generator for this optimizer's own RNG.
+        block_size: number of swap moves and acceptance uniforms drawn per RNG call.
+        trace: optional TraceRecorder over TRACE_FIELDS; rows are written only when it is due.
+        constraints: optional RouteConstraints. The route must then start feasible, and moves
+        become relocations checked in O(1) against a precomputed RouteSchedule, so every
+        accepted route stays feasible.
+        distance_fn: optional callable (a, b) -> travel cost between two stops (e.g. road
+        costs); straight-line distance by default.
+        """
+        self.metrics = metrics
+        self.trace = trace
+        self.rng = np.random.default_rng(seed)
+        self.block_size = block_size
+        # Pre-drawn swap positions and acceptance uniforms, consumed one per iteration
+        self._swap_i = []
+        self._swap_j = []
+        self._uniforms = []
+        self._cursor = 0
+        self.constraints = constraints
+        self.distance_fn = distance_fn
+        self.route = route[:]              # current solution
+        self.best_route = route[:]         # best found solution
+        self.schedule = constraints.schedule(self.route, relocations=True) if constraints is not None else None
+        self.current_distance = self.total_distance(self.route)
+        self.best_distance = self.current_distance
+        self.temperature = initial_temp
+        self.cooling_rate = cooling_rate
+        self.min_temp = min_temp
+        self.iteration = 0
+        self.accepted_moves = 0
+        self._trace_mark = (0, 0)  # (iteration, accepted_moves) at the last trace row
+
+    def total_distance(self, route):
+        """Return the total distance of a route (Euclidean unless a distance_fn was given)."""
+        if self.distance_fn is not None:
+            return sum(self.distance_fn(a, b) for a, b in zip(route, route[1:]))
+        total = 0
+        for i in range(len(route) - 1):
+            total += math.hypot(route[i+1][0] - route[i][0],
+                                route[i+1][1] - route[i][1])
+        return total
+
+    def _draw_block(self):
+        """Draw the next block of distinct swap positions (excluding the depots) and uniforms."""
+        m = len(self.route) - 2
+        first = self.rng.integers(0, m, size=self.block_size)
+        # A non-zero offset modulo m guarantees the second position differs from the first
+        second = (first + self.rng.integers(1, m, size=self.block_size)) % m
+        self._swap_i = (first + 1).tolist()
+        self._swap_j = (second + 1).tolist()
+        self._uniforms = self.rng.random(self.block_size).tolist()
+        self._cursor = 0
+
+    def update(self):
+        """
+        Performs one iteration of simulated annealing:
+         - Generates a neighboring solution by swapping two delivery points (excluding the depot).
+         - Accepts the neighbor if it improves the route or with a probability
+           that decreases with temperature.
+         - Updates the current temperature and iteration count.
+        """
+        if self.temperature <= self.min_temp:
+            return  # finished
+        if len(self.route) < 4:
+            # Fewer than two deliveries: there is nothing to swap, just cool down
+            self.temperature *= self.cooling_rate
+            self.iteration += 1
+            return
+        metrics = self.metrics
+        if metrics is not None:
+            t0 = time.perf_counter()
+        if self._cursor >= len(self._uniforms):
+            self._draw_block()
+        c = self._cursor
+        self._cursor = c + 1
+        if self.constraints is not None:
+            self._relocate(c, t0 if metrics is not None else None)
+            return
+        # Create neighbor by swapping two indices (excluding first and last)
+        new_route = self.route[:]
+        i, j = self._swap_i[c], self._swap_j[c]
+        new_route[i], new_route[j] = new_route[j], new_route[i]
+        if metrics is not None:
+            t1 = time.perf_counter()
+        new_distance = self.total_distance(new_route)
+        if metrics is not None:
+            t2 = time.perf_counter()
+            metrics.add_phase_time("move", t1 - t0)
+            metrics.add_phase_time("evaluation", t2 - t1)
+            metrics.propose("swap")
+            metrics.evaluations += 1
+            metrics.iterations += 1
+        delta = new_distance - self.current_distance
+        if metropolis(delta, self.temperature, self._uniforms[c]):
+            if metrics is not None:
+                metrics.accept("swap")
+            self.accepted_moves += 1
+            self.route = new_route
+            self.current_distance = new_distance
+            if new_distance < self.best_distance:
+                self.best_distance = new_distance
+                self.best_route = new_route[:]
+        self.temperature *= self.cooling_rate
+        self.iteration += 1
+        if self.trace is not None and self.iteration >= self.trace.next_record:
+            self.record_trace()
+
+    def _relocate(self, c, t0=None):
+        """
+        Constrained step: move the stop at one drawn position next to the other. Distance
+        delta and feasibility come from the route schedule in O(1); only an accepted
+        move pays the O(n log n) schedule rebuild. t0 is when update() started (with metrics).
+        """
+        metrics = self.metrics
+        i, j = self._swap_i[c], self._swap_j[c]
+        # Insert between positions k and k + 1; this maps j != i onto every k except i - 1 and i
+        k = j if j > i else j - 1
+        if metrics is not None:
+            t1 = time.perf_counter()
+        delta, feasible = self.schedule.relocate(i, k)
+        if metrics is not None:
+            t2 = time.perf_counter()
+            metrics.add_phase_time("move", t1 - t0)
+            metrics.add_phase_time("evaluation", t2 - t1)
+            metrics.propose("relocate")
+            metrics.evaluations += 1
+            metrics.iterations += 1
+        if feasible and metropolis(delta, self.temperature, self._uniforms[c]):
+            if metrics is not None:
+                metrics.accept("relocate")
+            self.accepted_moves += 1
+            new_route = self.route[:]
+            stop = new_route.pop(i)
+            new_route.insert(k if k > i else k + 1, stop)
+            self.route = new_route
+            self.schedule = self.constraints.schedule(new_route, relocations=True)
+            self.current_distance = self.schedule.distance
+            if self.current_distance < self.best_distance:
+                self.best_distance = self.current_distance
+                self.best_route = new_route[:]
+        self.temperature *= self.cooling_rate
+        self.iteration += 1
+        if self.trace is not None and self.iteration >= self.trace.next_record:
+            self.record_trace()
+
+    def record_trace(self):
+        """Write the current state to the trace; the acceptance rate covers moves since the last row."""
+        iteration, accepted = self._trace_mark
+        steps = self.iteration - iteration
+        rate = (self.accepted_moves - accepted) / steps if steps else 0.0
+        self._trace_mark = (self.iteration, self.accepted_moves)
+        self.trace.record(self.iteration, (self.best_distance, self.current_distance, self.temperature, rate))
+
+    def is_finished(self):
+        """Return True if the optimizer has cooled below the threshold."""
+        return self.temperature <= self.min_temp
+
+    def get_state(self):
+        """Return current state information for display."""
+        return {
+            "iteration": self.iteration,
+            "temperature": self.temperature,
+            "current_distance": self.current_distance,
+            "best_distance": self.best_distance,
+        }
+
+    def state_dict(self):
+        """Return everything needed to resume this optimizer exactly (see checkpoint.py)."""
+        return {
+            "route": self.route,
+            "best_route": self.best_route,
+            "current_distance": self.current_distance,
+            "best_distance": self.best_distance,
+            "temperature": self.temperature,
+            "cooling_rate": self.cooling_rate,
+            "min_temp": self.min_temp,
+            "iteration": self.iteration,
+            "accepted_moves": self.accepted_moves,
+            "rng": self.rng.bit_generator.state,
+            # Only the unused tail of the pre-drawn block is needed to continue exactly
+            "swap_i": self._swap_i[self._cursor:],
+            "swap_j": self._swap_j[self._cursor:],
+            "uniforms": self._uniforms[self._cursor:],
+        }
+
+    def load_state_dict(self, state):
+        """Restore a state produced by state_dict()."""
+        self.route = state["route"][:]
+        self.best_route = state["best_route"][:]
+        if self.constraints is not None:
+            self.schedule = self.constraints.schedule(self.route, relocations=True)
+        self.current_distance = state["current_distance"]
+        self.best_distance = state["best_distance"]
+        self.temperature = state["temperature"]
+        self.cooling_rate = state["cooling_rate"]
+        self.min_temp = state["min_temp"]
+        self.iteration = state["iteration"]
+        self.accepted_moves = state["accepted_moves"]
+        self._trace_mark = (self.iteration, self.accepted_moves)
+        self.rng.bit_generator.state = state["rng"]
+        self._swap_i = state["swap_i"][:]
+        self._swap_j = state["swap_j"][:]
+        self._uniforms = state["uniforms"][:]
+        self._cursor = 0
+
+    def get_metrics(self):
+        """Return a snapshot of the hot-path counters, or None if metrics are disabled."""
+        if self.metrics is None:
+            return None
+        return self.metrics.snapshot()
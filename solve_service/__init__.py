@@ -0,0 +1,8 @@
+"""
+Headless solve service for the localsearch solvers: the job server (server), the solver
+slices its pool processes run (workers), an asyncio client and load test (client), the
+decomposition engine for large VRP instances (decompose) and the parameter tuner (tune).
+
+Run the entry points as modules from the repository root, e.g.
+`python -m solve_service.server --port 8765`, so both packages are importable.
+"""
@@ -0,0 +1,183 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+
+class ServiceError(Exception):
+    def __init__(self, status, payload):
+        super().__init__(f"{status}: {payload.get('error', payload)}")
+        self.status = status
+        self.payload = payload
+
+
+class SolveClient:
+    """
+    Minimal asyncio client for server.py over one keep-alive connection.
+    Requests on one client are serialized; open several clients for parallel traffic.
+    """
+    def __init__(self, host="127.0.0.1", port=8765, unix_path=None):
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.reader = None
+        self.writer = None
+        self.lock = asyncio.Lock()
+
+    async def _open(self):
+        if self.unix_path is not None:
+            return await asyncio.open_unix_connection(self.unix_path)
+        return await asyncio.open_connection(self.host, self.port)
+
+    async def __aenter__(self):
+        self.reader, self.writer = await self._open()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+            self.writer = None
+
+    async def request(self, method, path, payload=None):
+        """Send one request and return the decoded JSON body; raises ServiceError on 4xx/5xx."""
+        body = b"" if payload is None else json.dumps(payload).encode()
+        async with self.lock:
+            if self.writer is None:
+                self.reader, self.writer = await self._open()
+            self.writer.write(_request_head(method, path, len(body)) + body)
+            await self.writer.drain()
+            status, headers = await _read_head(self.reader)
+            data = json.loads(await self.reader.readexactly(int(headers["content-length"])))
+        if status >= 400:
+            raise ServiceError(status, data)
+        return data
+
+    async def submit(self, kind, params, deadline=None):
+        payload = {"kind": kind, "params": params}
+        if deadline is not None:
+            payload["deadline"] = deadline
+        return await self.request("POST", "/jobs", payload)
+
+    async def status(self, job_id):
+        return await self.request("GET", f"/jobs/{job_id}")
+
+    async def cancel(self, job_id):
+        return await self.request("DELETE", f"/jobs/{job_id}")
+
+    async def health(self):
+        return await self.request("GET", "/health")
+
+    async def events(self, job_id):
+        """Yield job updates until the job is final. Uses its own connection."""
+        reader, writer = await self._open()
+        try:
+            writer.write(_request_head("GET", f"/jobs/{job_id}/events", 0))
+            await writer.drain()
+            status, headers = await _read_head(reader)
+            if status != 200:
+                raise ServiceError(status, json.loads(await reader.readexactly(int(headers["content-length"]))))
+            while True:
+                size = int((await reader.readline()).strip(), 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                chunk = await reader.readexactly(size + 2)
+                yield json.loads(chunk[:-2])
+        finally:
+            writer.close()
+
+    async def solve(self, kind, params, deadline=None, on_progress=None):
+        """Submit a job and wait for its final summary, optionally reporting each update."""
+        job = await self.submit(kind, params, deadline)
+        final = job
+        async for update in self.events(job["id"]):
+            final = update
+            if on_progress is not None:
+                on_progress(update)
+        return final
+
+
+def _request_head(method, path, length):
+    return (f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {length}\r\n\r\n").encode()
+
+
+async def _read_head(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Service closed the connection")
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return status, headers
+
+
+def random_vrp_job(rng, num_deliveries=15, num_vehicles=3):
+    deliveries = [[rng.randint(50, 550), rng.randint(50, 750)] for _ in range(num_deliveries)]
+    return {"depot": [300, 400], "deliveries": deliveries, "num_vehicles": num_vehicles,
+            "seed": rng.randrange(2**32)}
+
+
+async def load_test(jobs, concurrency, kind, host, port, unix_path):
+    """Push `jobs` small solves through the service with `concurrency` clients."""
+    rng = random.Random(0)
+    payloads = [random_vrp_job(rng) for _ in range(jobs)]
+    if kind == "vrp-sa":
+        for payload in payloads:
+            payload["cooling_rate"] = 0.99  # small solves: 10^4 -> 10^-8 in 2750 iterations per route
+    elif kind == "vrp-ga":
+        for payload in payloads:
+            payload.update(population_size=30, generations=20)
+    elif kind == "vrp-alns":
+        for payload in payloads:
+            payload["iterations"] = 200
+    statuses = {}
+    pending = list(reversed(payloads))
+
+    async def worker():
+        async with SolveClient(host, port, unix_path) as client:
+            while pending:
+                params = pending.pop()
+                while True:
+                    try:
+                        job = await client.submit(kind, params)
+                        break
+                    except ServiceError as exc:
+                        if exc.status != 503:
+                            raise
+                        await asyncio.sleep(0.05)  # back-pressure: retry shortly
+                while job["status"] not in ("done", "cancelled", "timed_out", "failed"):
+                    await asyncio.sleep(0.01)
+                    job = await client.status(job["id"])
+                statuses[job["status"]] = statuses.get(job["status"], 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    print(f"{jobs} {kind} jobs in {elapsed:.2f}s ({jobs / elapsed:.1f} jobs/s): {statuses}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test a running solve service on localhost")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", dest="unix_path")
+    parser.add_argument("--jobs", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--kind", default="vrp-sa", choices=["vrp-sa", "vrp-ga", "vrp-alns"])
+    args = parser.parse_args()
+    asyncio.run(load_test(args.jobs, args.concurrency, args.kind, args.host, args.port, args.unix_path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from localsearch.vrp import ga, sa
+
+
+def partition_sweep(depot, points, num_vehicles):
+    """
+    Split stops into `num_vehicles` contiguous angular sectors around the depot with
+    (nearly) equal stop counts. Unlike the agents' round-robin split, each vehicle
+    gets a compact region, which is what makes the per-vehicle decomposition local.
+    """
+    angles = np.arctan2(points[:, 1] - depot[1], points[:, 0] - depot[0])
+    return np.array_split(np.argsort(angles, kind="stable"), num_vehicles)
+
+
+def bisect(points, indices, leaf_size):
+    """
+    Recursive bisection: split `indices` at the median of the longer bounding-box
+    axis until every leaf holds at most `leaf_size` stops. O(n log n) overall.
+    """
+    leaves = []
+    stack = [indices]
+    while stack:
+        idx = stack.pop()
+        if len(idx) <= leaf_size:
+            leaves.append(idx)
+            continue
+        xy = points[idx]
+        axis = int(np.argmax(xy.max(axis=0) - xy.min(axis=0)))
+        half = len(idx) // 2
+        order = np.argpartition(xy[:, axis], half)
+        stack.append(idx[order[half:]])
+        stack.append(idx[order[:half]])
+    return leaves
+
+
+def solve_leaf(job):
+    """
+    Order one sub-instance with the existing SA or GA solver, run in a pool process.
+    job: (method, xy, anchor, params, seed). The route is anchor -> stops -> anchor; the
+    result is the visiting order as positions into xy. Stops carry their position as a
+    third tuple element so duplicate coordinates stay distinguishable.
+    """
+    method, xy, anchor, params, seed = job
+    n = len(xy)
+    if n <= 2:
+        return np.arange(n)
+    stops = [(x, y, k) for k, (x, y) in enumerate(xy.tolist())]
+    anchor = (float(anchor[0]), float(anchor[1]), -1)
+    if method == "sa":
+        optimizer = sa.SAOptimizer([anchor] + stops + [anchor], params.get("initial_temp", 10000),
+                                   params.get("cooling_rate", 0.995), params.get("min_temp", 1e-8),
+                                   seed=seed)
+        while not optimizer.is_finished():
+            optimizer.update()
+        best = optimizer.best_route[1:-1]
+    else:
+        solver = ga.RouteGASolver(anchor, stops, params.get("population_size", 50),
+                                  params.get("mutation_rate", 0.02), seed=seed)
+        for _ in range(params.get("generations", 100)):
+            solver.run_generation()
+        best = solver.best_solution
+    return np.array([stop[2] for stop in best])
+
+
+def solve_leaves(jobs, pool, workers):
+    """Run solve_leaf on every job, on `pool` (of `workers` processes) in about four chunks per worker."""
+    if pool is None or len(jobs) < 2:
+        return [solve_leaf(job) for job in jobs]
+    chunksize = max(1, len(jobs) // (4 * workers))
+    return list(pool.map(solve_leaf, jobs, chunksize=chunksize))
+
+
+def _dist(a, b):
+    return np.hypot(a[..., 0] - b[..., 0], a[..., 1] - b[..., 1])
+
+
+def cut_cycle(cycle_xy, order, prev_xy, next_xy):
+    """
+    Open a leaf's cyclic tour into a path from near `prev_xy` to near `next_xy`:
+    pick the edge (and direction) whose removal minimizes
+    d(prev, path start) + d(path end, next) - d(removed edge). O(len(order)).
+    """
+    pts = cycle_xy[order]
+    nxt = np.roll(pts, -1, axis=0)  # edge k joins pts[k] -> pts[k+1]
+    edge = _dist(pts, nxt)
+    # Forward: start at pts[k+1], end at pts[k]. Backward: start at pts[k], end at pts[k+1].
+    forward = _dist(prev_xy, nxt) + _dist(pts, next_xy) - edge
+    backward = _dist(prev_xy, pts) + _dist(nxt, next_xy) - edge
+    kf, kb = int(np.argmin(forward)), int(np.argmin(backward))
+    if forward[kf] <= backward[kb]:
+        return np.roll(order, -(kf + 1))
+    return np.roll(order, -(kb + 1))[::-1]
+
+
+def two_opt_window(route_xy, route, lo, hi, max_passes=5):
+    """
+    2-opt restricted to route positions lo..hi (both ends stay fixed); edits `route`
+    and `route_xy` in place. O((hi - lo)^2) per pass, so boundary repair stays linear
+    in the number of junctions.
+    """
+    for _ in range(max_passes):
+        improved = False
+        for i in range(lo, hi - 2):
+            a, b = route_xy[i], route_xy[i + 1]
+            c, d = route_xy[i + 2:hi], route_xy[i + 3:hi + 1]
+            delta = _dist(a, c) + _dist(b, d) - _dist(a, b) - _dist(c, d)
+            k = int(np.argmin(delta))
+            if delta[k] < -1e-9:
+                j = i + 2 + k
+                route[i + 1:j + 1] = route[i + 1:j + 1][::-1].copy()
+                route_xy[i + 1:j + 1] = route_xy[i + 1:j + 1][::-1].copy()
+                improved = True
+        if not improved:
+            break
+
+
+class DecompositionSolver:
+    """
+    Decompose-solve-stitch pipeline for very large VRP instances:
+      1. sweep the stops into one compact sector per vehicle,
+      2. bisect each sector into leaves of at most `leaf_size` stops and order the leaves
+         by solving a tour over their centroids (recursively, if there are many),
+      3. solve every leaf in parallel with the existing SA or GA solver,
+      4. stitch the leaf tours into one route per vehicle and repair each junction
+         with a windowed 2-opt.
+    Every step is linear (or n log n) in the number of stops; stops live in one
+    (n, 2) array and routes are index arrays. workers: pool processes for the leaves
+    (default os.cpu_count(); 0 solves them in this process).
+    """
+    def __init__(self, depot, deliveries, num_vehicles, method="sa", leaf_size=100, window=15,
+                 workers=None, seed=None, solver_params=None):
+        if method not in ("sa", "ga"):
+            raise ValueError(f"method must be 'sa' or 'ga', got {method!r}")
+        self.depot = np.asarray(depot, dtype=float)
+        self.points = np.asarray(deliveries, dtype=float)
+        self.num_vehicles = num_vehicles
+        self.method = method
+        self.leaf_size = leaf_size
+        self.window = window
+        self.workers = os.cpu_count() if workers is None else workers
+        self.solver_params = solver_params or {}
+        self.seed_seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.routes = None  # per vehicle, an index array into deliveries
+        self.timings = {}
+
+    def solve(self):
+        """Run the pipeline; returns one index array per vehicle (depot excluded)."""
+        t0 = time.perf_counter()
+        sectors = partition_sweep(self.depot, self.points, self.num_vehicles)
+        problems = [(self.points[sector], self.depot) for sector in sectors]
+        if self.workers == 0:
+            orders = self.solve_many(problems, None)
+        else:
+            with ProcessPoolExecutor(self.workers) as pool:
+                orders = self.solve_many(problems, pool)
+        self.routes = [sector[order] for sector, order in zip(sectors, orders)]
+        self.timings["total"] = time.perf_counter() - t0
+        return self.routes
+
+    def solve_many(self, problems, pool):
+        """
+        Order several (xy, anchor) routing problems at once; returns, per problem, the
+        visiting order as positions into its xy. Small problems are solved directly.
+        Large ones are bisected into leaves whose order comes from one recursive batch
+        over all the centroid sets. Then every direct problem and every leaf goes to the
+        pool in a single batch, so many small vehicles parallelize as well as one huge one.
+        pool: the ProcessPoolExecutor for the leaves, or None to solve them in this process.
+        """
+        direct = [k for k, (xy, _) in enumerate(problems) if len(xy) <= self.leaf_size]
+        split = [k for k, (xy, _) in enumerate(problems) if len(xy) > self.leaf_size]
+
+        plans = {}
+        for k in split:
+            xy = problems[k][0]
+            leaves = bisect(xy, np.arange(len(xy)), self.leaf_size)
+            plans[k] = (leaves, np.array([xy[leaf].mean(axis=0) for leaf in leaves]))
+        if split:
+            # The leaf order is itself a (much smaller) routing problem over the centroids
+            leaf_orders = self.solve_many([(plans[k][1], problems[k][1]) for k in split], pool)
+            for k, order in zip(split, leaf_orders):
+                leaves, centroids = plans[k]
+                plans[k] = ([leaves[i] for i in order], centroids[order])
+
+        jobs = [self._job(*problems[k]) for k in direct]
+        for k in split:
+            xy = problems[k][0]
+            leaves, centroids = plans[k]
+            jobs.extend(self._job(xy[leaf], centroid) for leaf, centroid in zip(leaves, centroids))
+        results = solve_leaves(jobs, pool, self.workers)
+
+        orders = [None] * len(problems)
+        for k, order in zip(direct, results):
+            orders[k] = order
+        start = len(direct)
+        for k in split:
+            leaves, centroids = plans[k]
+            cycles = results[start:start + len(leaves)]
+            start += len(leaves)
+            orders[k] = self.stitch(problems[k][0], problems[k][1], leaves, centroids, cycles)
+        return orders
+
+    def stitch(self, xy, anchor, leaves, centroids, cycles):
+        """
+        Join ordered leaf cycles into one route anchor -> stops -> anchor, cutting each
+        cycle so it enters near the previous leaf and exits towards the next, then
+        repair every junction (including the two at the anchor) with a windowed 2-opt.
+        """
+        parts = []
+        junctions = [0]
+        prev_xy = anchor
+        length = 0
+        for k, (leaf, cycle) in enumerate(zip(leaves, cycles)):
+            next_xy = centroids[k + 1] if k + 1 < len(leaves) else anchor
+            path = leaf[cut_cycle(xy[leaf], cycle, prev_xy, next_xy)]
+            parts.append(path)
+            length += len(path)
+            junctions.append(length)  # route position of the last stop before the next leaf
+            prev_xy = xy[path[-1]]
+        route = np.concatenate(parts)
+
+        route_xy = np.vstack([anchor, xy[route], anchor])
+        positions = np.concatenate([[-1], route, [-1]])
+        for junction in junctions:
+            lo = max(0, junction - self.window)
+            hi = min(len(positions) - 1, junction + self.window)
+            two_opt_window(route_xy, positions, lo, hi)
+        return positions[1:-1]
+
+    def _job(self, xy, anchor):
+        return (self.method, xy, anchor, self.solver_params, self.seed_seq.spawn(1)[0])
+
+    def route_distances(self):
+        """Length of each vehicle's route, depot to depot."""
+        distances = []
+        for route in self.routes:
+            xy = np.vstack([self.depot, self.points[route], self.depot])
+            distances.append(float(_dist(xy[:-1], xy[1:]).sum()))
+        return distances
+
+    def get_best_routes(self):
+        """Routes as point lists depot -> deliveries -> depot, like the agents' get_best_routes()."""
+        depot = tuple(self.depot.tolist())
+        return [[depot] + [tuple(p) for p in self.points[route].tolist()] + [depot] for route in self.routes]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve a random large VRP instance by decomposition")
+    parser.add_argument("--stops", type=int, default=100000)
+    parser.add_argument("--vehicles", type=int, default=50)
+    parser.add_argument("--method", choices=["sa", "ga"], default="sa")
+    parser.add_argument("--leaf-size", type=int, default=100)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    side = 100 * np.sqrt(args.stops)
+    points = rng.uniform(0, side, size=(args.stops, 2))
+    solver = DecompositionSolver((side / 2, side / 2), points, args.vehicles, args.method, args.leaf_size,
+                                 workers=args.workers, seed=args.seed,
+                                 solver_params={"cooling_rate": 0.99} if args.method == "sa" else {})
+    routes = solver.solve()
+    assert sorted(np.concatenate(routes).tolist()) == list(range(args.stops))
+    print(f"{args.stops} stops, {args.vehicles} vehicles: total distance {sum(solver.route_distances()):.0f} "
+          f"in {solver.timings['total']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+
+from solve_service.workers import SOLVERS, check_params, run_slice, slice_seconds, warm_up
+
+FINAL_STATUSES = ("done", "cancelled", "timed_out", "failed")
+MAX_BODY = 16 * 1024 * 1024
+REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 503: "Service Unavailable"}
+
+
+class ServiceBusy(Exception):
+    """Raised by submit() when the job queue is full."""
+
+
+class Job:
+    """One solve request and its latest progress. Subscribers wait on `changed`."""
+    def __init__(self, job_id, kind, params, deadline):
+        self.id = job_id
+        self.kind = kind
+        self.params = params
+        self.deadline = deadline  # event-loop time after which the job stops, or None
+        self.status = "queued"
+        self.progress = None
+        self.result = None
+        self.error = None
+        self.cancel_requested = False
+        self.sequence = 0  # bumped on every update so subscribers can tell what they have seen
+        self.changed = asyncio.Condition()
+
+    def is_final(self):
+        return self.status in FINAL_STATUSES
+
+    async def publish(self):
+        self.sequence += 1
+        async with self.changed:
+            self.changed.notify_all()
+
+    def summary(self):
+        info = {"id": self.id, "kind": self.kind, "status": self.status, "progress": self.progress}
+        if self.is_final():
+            info["result"] = self.result
+            if self.error is not None:
+                info["error"] = self.error
+        return info
+
+
+class SolveService:
+    """
+    Queues VRP and task-scheduling jobs and runs them on a bounded process pool.
+    Each job runs as a series of short slices (see workers.run_slice), longer for larger
+    instances (workers.slice_seconds); the solver state is carried between slices, which
+    is what makes progress updates, deadlines and cancellation possible without
+    interrupting a worker process.
+    Back-pressure: submit() raises ServiceBusy once `max_queue` jobs are waiting.
+    """
+    def __init__(self, workers=None, max_queue=1000, slice_seconds=0.2, max_finished=10000):
+        self.workers = workers or os.cpu_count() or 1
+        self.slice_seconds = slice_seconds
+        self.max_finished = max_finished
+        self.pool = None
+        self.queue = asyncio.Queue(max_queue)
+        self.jobs = {}
+        self.finished = deque()  # finished job ids, oldest first, for pruning
+        self.running = 0
+        self._ids = itertools.count(1)
+        self._dispatchers = []
+
+    async def start(self):
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=warm_up)
+        # One dispatcher per worker keeps at most `workers` jobs in the pool at a time
+        self._dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+
+    async def close(self):
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+    def submit(self, kind, params, deadline=None):
+        """
+        Queue a job and return it. kind is one of workers.SOLVERS; deadline is in
+        seconds from now and covers both queueing and solving. Raises ValueError for
+        arguments of the wrong type or value (they come straight from request bodies).
+        """
+        if not isinstance(kind, str) or kind not in SOLVERS:
+            raise ValueError(f"Unknown job kind {kind!r}; expected one of {sorted(SOLVERS)}")
+        if not isinstance(params, dict):
+            raise ValueError(f"params must be an object, not {type(params).__name__}")
+        if deadline is not None and (isinstance(deadline, bool) or not isinstance(deadline, (int, float))
+                                     or not deadline >= 0):
+            raise ValueError(f"deadline must be a number of seconds >= 0, not {deadline!r}")
+        check_params(kind, params)
+        loop = asyncio.get_running_loop()
+        job = Job(str(next(self._ids)), kind, params,
+                  None if deadline is None else loop.time() + deadline)
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise ServiceBusy(f"{self.queue.maxsize} jobs already queued") from None
+        self.jobs[job.id] = job
+        return job
+
+    async def cancel(self, job_id):
+        """Cancel a job. Queued jobs stop at once; running jobs stop after their current slice."""
+        job = self.jobs[job_id]
+        if job.is_final():
+            return job
+        job.cancel_requested = True
+        if job.status == "queued":
+            await self._finish(job, "cancelled")
+        return job
+
+    async def wait(self, job_id):
+        """Wait until a job reaches a final status and return it."""
+        job = self.jobs[job_id]
+        async with job.changed:
+            await job.changed.wait_for(job.is_final)
+        return job
+
+    async def _dispatch(self):
+        while True:
+            job = await self.queue.get()
+            try:
+                if not job.is_final():
+                    self.running += 1
+                    try:
+                        await self._run(job)
+                    finally:
+                        self.running -= 1
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, job):
+        loop = asyncio.get_running_loop()
+        if job.deadline is not None and loop.time() >= job.deadline:
+            await self._finish(job, "timed_out")
+            return
+        job.status = "running"
+        await job.publish()
+        state = None
+        # Larger instances get longer slices (see workers.slice_seconds)
+        job_slice = slice_seconds(job.kind, job.params, self.slice_seconds)
+        while True:
+            budget = job_slice
+            if job.deadline is not None:
+                budget = max(0.0, min(budget, job.deadline - loop.time()))
+            try:
+                state, job.progress, job.result, done = await loop.run_in_executor(
+                    self.pool, run_slice, job.kind, job.params, state, budget)
+            except Exception as exc:
+                job.error = f"{type(exc).__name__}: {exc}"
+                await self._finish(job, "failed")
+                return
+            if done:
+                await self._finish(job, "done")
+                return
+            if job.cancel_requested:
+                await self._finish(job, "cancelled")
+                return
+            if job.deadline is not None and loop.time() >= job.deadline:
+                await self._finish(job, "timed_out")  # the result holds the best found so far
+                return
+            await job.publish()
+
+    async def _finish(self, job, status):
+        job.status = status
+        await job.publish()
+        self.finished.append(job.id)
+        while len(self.finished) > self.max_finished:
+            self.jobs.pop(self.finished.popleft(), None)
+
+    # --- HTTP/1.1 front end (JSON over TCP or a Unix socket) ---
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                await self.route(method, urlsplit(target).path, body, writer)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except HTTPError as exc:
+            await send_json(writer, exc.status, {"error": exc.message})
+        finally:
+            writer.close()
+
+    async def route(self, method, path, body, writer):
+        """
+        POST   /jobs              submit {"kind", "params", "deadline"?} -> 202, or 503 when full
+        GET    /jobs/<id>         job status, progress and (when final) result
+        DELETE /jobs/<id>         cancel
+        GET    /jobs/<id>/events  newline-delimited JSON updates until the job is final
+        GET    /health            queue and pool occupancy
+        """
+        parts = [part for part in path.split("/") if part]
+        if parts == ["health"] and method == "GET":
+            await send_json(writer, 200, {"queued": self.queue.qsize(), "running": self.running,
+                                          "workers": self.workers, "jobs": len(self.jobs)})
+            return
+        if parts == ["jobs"] and method == "POST":
+            try:
+                payload = json.loads(body or b"{}")
+                if not isinstance(payload, dict):
+                    raise ValueError("Request body must be a JSON object")
+                job = self.submit(payload.get("kind"), payload.get("params") or {}, payload.get("deadline"))
+            except ServiceBusy as exc:
+                await send_json(writer, 503, {"error": str(exc)}, {"Retry-After": "1"})
+                return
+            except ValueError as exc:
+                await send_json(writer, 400, {"error": str(exc)})
+                return
+            await send_json(writer, 202, job.summary())
+            return
+        if len(parts) in (2, 3) and parts[0] == "jobs":
+            job = self.jobs.get(parts[1])
+            if job is None:
+                await send_json(writer, 404, {"error": f"No job {parts[1]}"})
+            elif len(parts) == 2 and method == "GET":
+                await send_json(writer, 200, job.summary())
+            elif len(parts) == 2 and method == "DELETE":
+                await send_json(writer, 202, (await self.cancel(job.id)).summary())
+            elif parts[2:] == ["events"] and method == "GET":
+                await stream_events(job, writer)
+            else:
+                await send_json(writer, 405, {"error": f"{method} not allowed on {path}"})
+            return
+        await send_json(writer, 404, {"error": f"No route for {path}"})
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+async def read_request(reader):
+    """Read one HTTP request; returns None when the client has closed the connection."""
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "Malformed request line") from None
+    headers = {}
+    while True:
+        header = await reader.readline()
+        if header in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = header.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HTTPError(400, "Malformed Content-Length") from None
+    if length > MAX_BODY:
+        raise HTTPError(413, f"Body larger than {MAX_BODY} bytes")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, headers, body
+
+
+async def send_json(writer, status, payload, extra_headers=None):
+    body = json.dumps(payload).encode()
+    head = [f"HTTP/1.1 {status} {REASONS[status]}", "Content-Type: application/json",
+            f"Content-Length: {len(body)}"]
+    head.extend(f"{name}: {value}" for name, value in (extra_headers or {}).items())
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+    await writer.drain()
+
+
+async def stream_events(job, writer):
+    """Send the job summary as chunked NDJSON after every update until it is final."""
+    writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+                 b"Transfer-Encoding: chunked\r\n\r\n")
+    seen = -1
+    while True:
+        async with job.changed:
+            await job.changed.wait_for(lambda: job.sequence > seen)
+        # A slow reader skips intermediate updates rather than queueing them
+        seen = job.sequence
+        line = json.dumps(job.summary()).encode() + b"\n"
+        writer.write(b"%x\r\n%s\r\n" % (len(line), line))
+        await writer.drain()
+        if job.is_final():
+            break
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+async def serve(host="127.0.0.1", port=8765, unix_path=None, workers=None, max_queue=1000,
+                slice_seconds=0.2):
+    service = SolveService(workers, max_queue, slice_seconds)
+    await service.start()
+    if unix_path is not None:
+        server = await asyncio.start_unix_server(service.handle_connection, unix_path)
+        where = unix_path
+    else:
+        server = await asyncio.start_server(service.handle_connection, host, port)
+        where = f"http://{host}:{port}"
+    print(f"Solve service on {where} with {service.workers} workers")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local solve service for the VRP and task-scheduling solvers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", dest="unix_path", help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, help="solver processes (default: CPU count)")
+    parser.add_argument("--max-queue", type=int, default=1000, help="queued jobs before rejecting with 503")
+    parser.add_argument("--slice", dest="slice_seconds", type=float, default=0.2,
+                        help="seconds per solver slice; bounds cancellation and progress latency")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix_path, args.workers, args.max_queue,
+                          args.slice_seconds))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
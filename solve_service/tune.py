@@ -0,0 +1,295 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from solve_service import workers
+
+# Tunable parameters per job kind: name -> (low, high, scale). "log" samples log-uniformly,
+# "int" uniformly over integers and "rate" log-uniformly in 1 - value (cooling rates near 1).
+SEARCH_SPACES = {
+    "vrp-sa": {"initial_temp": (1e2, 1e5, "log"), "cooling_rate": (0.99, 0.9995, "rate"),
+               "min_temp": (1e-10, 1e-2, "log")},
+    "vrp-ga": {"population_size": (20, 200, "int"), "mutation_rate": (0.002, 0.2, "log")},
+    "tasks": {"population_size": (20, 200, "int"), "mutation_rate": (0.01, 0.5, "log")},
+}
+
+# The hard-coded defaults; always raced as the first candidate
+DEFAULTS = {
+    "vrp-sa": {"initial_temp": 10000, "cooling_rate": 0.995, "min_temp": 1e-8},
+    "vrp-ga": {"population_size": 100, "mutation_rate": 0.02},
+    "tasks": {"population_size": 50, "mutation_rate": 0.1},
+}
+
+# Instance sizes per size class: (deliveries, vehicles) for VRP kinds, (tasks, robots) for tasks
+SIZE_CLASSES = {
+    "vrp": {"small": (15, 3), "medium": (50, 5), "large": (150, 10)},
+    "tasks": {"small": (10, 5), "medium": (100, 10), "large": (1000, 20)},
+}
+
+# Fixed work budgets (SA iterations per route, GA generations), so every trial of a kind
+# does the same work whatever the machine or its load; the time limit is only a safety cap
+FIXED_PARAMS = {"vrp-sa": {"iterations": 20000}, "vrp-ga": {"generations": 200}, "tasks": {"generations": 100}}
+
+
+def sample_configs(kind, count, seed=0):
+    """`count` candidate configurations: the defaults followed by random draws from SEARCH_SPACES."""
+    rng = np.random.default_rng(seed)
+    configs = [dict(DEFAULTS[kind])]
+    while len(configs) < count:
+        config = {}
+        for name, (low, high, scale) in SEARCH_SPACES[kind].items():
+            if scale == "int":
+                config[name] = int(rng.integers(low, high + 1))
+            elif scale == "rate":
+                config[name] = float(1 - math.exp(rng.uniform(math.log(1 - high), math.log(1 - low))))
+            else:
+                config[name] = float(math.exp(rng.uniform(math.log(low), math.log(high))))
+        configs.append(config)
+    return configs
+
+
+def make_instance(kind, size, seed):
+    """Seeded random instance params (without solver parameters) of a size tuple."""
+    rng = np.random.default_rng(seed)
+    if kind == "tasks":
+        from localsearch.tasks.environment import Environment
+        env = Environment(*size, seed=rng)
+        return {"task_durations": env.task_durations.tolist(), "task_priorities": env.task_priorities.tolist(),
+                "robot_efficiencies": env.robot_efficiencies.tolist(), "seed": seed}
+    deliveries, vehicles = size
+    return {"depot": [300, 400], "deliveries": rng.integers(50, [551, 751], size=(deliveries, 2)).tolist(),
+            "num_vehicles": vehicles, "seed": seed}
+
+
+def run_trial(kind, params, time_limit):
+    """
+    Pool task: solve one instance with one configuration through workers.run_slice until
+    its iteration or generation budget (in `params`) is used up, or for at most `time_limit`
+    seconds. Returns {"objective", "seconds", "done", "time_limit"}; the objective is the
+    total distance for VRP kinds and the best fitness for tasks (lower is better), and
+    done is False when the time limit cut the trial short. The first slice always runs,
+    so there is a result however small the limit.
+    """
+    start = time.perf_counter()
+    slice_length = workers.slice_seconds(kind, params, 1.0)
+    state, done, remaining = None, False, time_limit
+    while True:
+        budget = max(0.0, min(remaining, slice_length))
+        state, _, result, done = workers.run_slice(kind, params, state, budget)
+        remaining = time_limit - (time.perf_counter() - start)
+        if done or remaining <= 0:
+            break
+    objective = result["fitness"] if kind == "tasks" else result["distance"]
+    return {"objective": objective, "seconds": time.perf_counter() - start, "done": done,
+            "time_limit": time_limit}
+
+
+class TrialCache:
+    """
+    Completed trials on disk, one JSON line each, keyed by a hash of the kind and the full
+    trial params (instance, budget and configuration). Lines are appended and flushed as
+    trials finish, so an interrupted sweep resumes with only the missing trials.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.results = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by an interruption
+                    self.results[entry["key"]] = entry["result"]
+
+    @staticmethod
+    def key(kind, params):
+        text = json.dumps([kind, params], sort_keys=True)
+        return hashlib.sha1(text.encode()).hexdigest()
+
+    def get(self, key, time_limit):
+        """The cached result, unless a lower time limit than `time_limit` cut it short."""
+        result = self.results.get(key)
+        if result is None or result["done"] or result.get("time_limit", 0.0) >= time_limit:
+            return result
+        return None
+
+    def add(self, key, result):
+        self.results[key] = result
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(json.dumps({"key": key, "result": result}) + "\n")
+            f.flush()
+
+
+class SuccessiveHalvingTuner:
+    """
+    Races candidate configurations of one job kind on a seeded instance set with
+    successive halving. Every survivor is solved on the first few instances; the best
+    1 / eta go on to eta times as many instances, and so on until one configuration or
+    the whole set is left. Configurations are ranked by their mean relative gap to the
+    best objective found on each instance, plus `time_weight` per second of solve time,
+    with ties going to the faster one. Trials run across a process pool and are cached
+    on disk (TrialCache).
+    Every trial runs the same work budget, FIXED_PARAMS[kind] updated with `budget`, so
+    rankings do not depend on the machine; `time_limit` seconds only caps runaway trials.
+    """
+    def __init__(self, kind, cache, pool=None, time_limit=300.0, eta=3, min_instances=1,
+                 time_weight=0.0, log=print, budget=None):
+        if not time_limit > 0:
+            raise ValueError(f"time_limit must be positive, got {time_limit}")
+        if eta < 2:
+            raise ValueError(f"eta must be at least 2, got {eta}")
+        if min_instances < 1:
+            raise ValueError(f"min_instances must be at least 1, got {min_instances}")
+        self.kind = kind
+        self.cache = cache
+        self.pool = pool
+        self.time_limit = time_limit
+        self.eta = eta
+        self.min_instances = min_instances
+        self.time_weight = time_weight
+        self.log = log
+        self.budget = {**FIXED_PARAMS.get(kind, {}), **(budget or {})}
+
+    def evaluate(self, configs, survivors, instances, results):
+        """Fill `results` {(config index, instance index): trial result}, running only trials not cached."""
+        pending = {}
+        for c in survivors:
+            for i, instance in enumerate(instances):
+                if (c, i) in results:
+                    continue
+                params = {**instance, **self.budget, **configs[c]}
+                key = TrialCache.key(self.kind, params)
+                cached = self.cache.get(key, self.time_limit)
+                if cached is not None:
+                    results[c, i] = cached
+                else:
+                    pending[c, i] = (key, params)
+        if pending and self.pool is None:
+            for index, (key, params) in pending.items():
+                results[index] = run_trial(self.kind, params, self.time_limit)
+                self.cache.add(key, results[index])
+        elif pending:
+            futures = {self.pool.submit(run_trial, self.kind, params, self.time_limit): (index, key)
+                       for index, (key, params) in pending.items()}
+            for future in as_completed(futures):
+                index, key = futures[future]
+                results[index] = future.result()
+                self.cache.add(key, results[index])
+        capped = sum(not results[index]["done"] for index in pending)
+        if capped:
+            self.log(f"  {self.kind}: {capped} of {len(pending)} trials hit the {self.time_limit:g}s "
+                     f"time limit before finishing their budget")
+    def scores(self, results, survivors, count):
+        """Mean relative gap (plus the time term) of each survivor over the first `count` instances."""
+        best = {}
+        for (c, i), result in results.items():
+            if i < count:
+                best[i] = min(best.get(i, math.inf), result["objective"])
+        scores = {}
+        for c in survivors:
+            gaps = [results[c, i]["objective"] / best[i] - 1 if best[i] > 0 else 0.0 for i in range(count)]
+            seconds = [results[c, i]["seconds"] for i in range(count)]
+            scores[c] = float(np.mean(gaps) + self.time_weight * np.mean(seconds))
+        return scores
+
+    def run(self, configs, instances):
+        """Race `configs` on `instances`; returns (best config, its score, instances it was scored on)."""
+        survivors = list(range(len(configs)))
+        count = min(self.min_instances, len(instances))
+        results = {}
+        while True:
+            self.evaluate(configs, survivors, instances[:count], results)
+            scores = self.scores(results, survivors, count)
+            # Ties (e.g. every config solving small instances optimally) go to the faster one
+            seconds = {c: sum(results[c, i]["seconds"] for i in range(count)) for c in survivors}
+            survivors.sort(key=lambda c: (scores[c], seconds[c]))
+            self.log(f"  {self.kind}: {len(survivors)} configs on {count} instances, "
+                     f"best gap {scores[survivors[0]]:.4f}")
+            if len(survivors) == 1 or count == len(instances):
+                break
+            survivors = survivors[:max(1, len(survivors) // self.eta)]
+            count = min(count * self.eta, len(instances))
+        return configs[survivors[0]], scores[survivors[0]], count
+
+
+def tune(kinds, size_classes, num_configs=27, num_instances=9, time_limit=300.0, eta=3, min_instances=1,
+         time_weight=0.0, pool=None, cache_path="tuning/trials.jsonl", seed=0, log=print, budgets=None):
+    """
+    Tune every kind in `kinds` separately for every size class in `size_classes` (names in
+    SIZE_CLASSES). Each class gets its own seeded instance set and the same candidate
+    configurations. `budgets` optionally overrides FIXED_PARAMS per kind.
+    Returns {kind: {size class: {"config", "score", "instances"}}}.
+    """
+    cache = TrialCache(cache_path)
+    best = {}
+    for kind in kinds:
+        classes = SIZE_CLASSES["tasks" if kind == "tasks" else "vrp"]
+        configs = sample_configs(kind, num_configs, seed)
+        tuner = SuccessiveHalvingTuner(kind, cache, pool, time_limit, eta, min_instances, time_weight, log,
+                                       (budgets or {}).get(kind))
+        best[kind] = {}
+        for size_class in size_classes:
+            log(f"{kind} / {size_class}: racing {len(configs)} configs")
+            instances = [make_instance(kind, classes[size_class], seed * 1000 + k) for k in range(num_instances)]
+            config, score, count = tuner.run(configs, instances)
+            best[kind][size_class] = {"config": config, "score": score, "instances": count}
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune solver parameters by successive halving")
+    parser.add_argument("--kinds", nargs="+", choices=sorted(SEARCH_SPACES), default=sorted(SEARCH_SPACES))
+    parser.add_argument("--sizes", nargs="+", choices=["small", "medium", "large"], default=["small", "medium"])
+    parser.add_argument("--configs", type=int, default=27)
+    parser.add_argument("--instances", type=int, default=9)
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--iterations", type=int, default=FIXED_PARAMS["vrp-sa"]["iterations"],
+                        help="SA iterations per route in every vrp-sa trial")
+    parser.add_argument("--generations", type=int,
+                        help="generations per vrp-ga and tasks trial (default: FIXED_PARAMS)")
+    parser.add_argument("--time-limit", type=float, default=300.0,
+                        help="safety cap in seconds per trial; trials are budgeted by iterations or generations")
+    parser.add_argument("--time-weight", type=float, default=0.0,
+                        help="score added per second of solve time, to favour throughput")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--cache", default="tuning/trials.jsonl")
+    parser.add_argument("--output", default="tuning/best_configs.json")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if not args.time_limit > 0:
+        parser.error("--time-limit must be positive")
+    if args.eta < 2:
+        parser.error("--eta must be at least 2")
+    if args.iterations < 1 or (args.generations is not None and args.generations < 1):
+        parser.error("--iterations and --generations must be at least 1")
+    budgets = {"vrp-sa": {"iterations": args.iterations}}
+    if args.generations is not None:
+        budgets.update({kind: {"generations": args.generations} for kind in ("vrp-ga", "tasks")})
+
+    with ProcessPoolExecutor(args.workers, initializer=workers.warm_up) as pool:
+        best = tune(args.kinds, args.sizes, args.configs, args.instances, args.time_limit, args.eta,
+                    time_weight=args.time_weight, pool=pool, cache_path=args.cache, seed=args.seed,
+                    budgets=budgets)
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(best, f, indent=2)
+    for kind, classes in best.items():
+        for size_class, entry in classes.items():
+            print(f"{kind} {size_class}: {entry['config']} "
+                  f"(gap {entry['score']:.4f} on {entry['instances']} instances)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+import importlib
+import math
+import time
+
+import numpy as np
+
+# Solver modules of the localsearch package need only numpy (pygame is never imported
+# here), and each slice imports just its solver.
+SOLVER_MODULES = ("localsearch.vrp.sa", "localsearch.vrp.ga", "localsearch.tasks.agent")
+
+# How often (in SA sweeps) a slice checks the clock
+CLOCK_CHECK_EVERY = 64
+
+# Slices of jobs with more stops or tasks than this get proportionally longer (up to
+# MAX_SLICE_FACTOR times the base length), so rebuilding the solver from its state and
+# pickling it back stays a small share of every slice
+SLICE_SIZE_UNIT = 200
+MAX_SLICE_FACTOR = 10
+
+
+def warm_up():
+    """Pool initializer: import numpy and every solver module before the first job arrives."""
+    for name in SOLVER_MODULES:
+        importlib.import_module(name)
+
+
+# Road cost matrices already opened by this process, so later slices of a job reuse them
+_road_distances = {}
+
+
+def _route_distance(route, distance_fn=None):
+    if distance_fn is not None:
+        return sum(distance_fn(a, b) for a, b in zip(route, route[1:]))
+    return sum(math.hypot(b[0] - a[0], b[1] - a[1]) for a, b in zip(route, route[1:]))
+
+
+def _distance_fn(params, depot, deliveries):
+    """
+    RoadDistances from the optional road_nodes / road_edges params (CSV paths readable by the
+    worker; road_directed, road_cache_dir and road_workers are optional), or None for
+    straight-line distances.
+    """
+    if params.get("road_nodes") is None:
+        return None
+    key = (params["road_nodes"], params["road_edges"], params.get("road_directed", False),
+           params.get("road_cache_dir"), depot, tuple(deliveries))
+    if key not in _road_distances:
+        from localsearch.vrp import roads
+        network = roads.RoadNetwork.from_files(params["road_nodes"], params["road_edges"],
+                                               params.get("road_directed", False))
+        _road_distances[key] = network.cost_matrix([depot] + deliveries, cache_dir=params.get("road_cache_dir"),
+                                                   workers=params.get("road_workers", 0))
+    return _road_distances[key]
+
+
+def _constraints(params, depot, deliveries, distance_fn=None):
+    """RouteConstraints from the optional demands / time_windows params, or None without either."""
+    if params.get("demands") is None and params.get("time_windows") is None:
+        return None
+    from localsearch.vrp import constraints
+    return constraints.RouteConstraints(
+        depot, deliveries, params.get("demands"), params.get("time_windows"), params.get("capacity"),
+        params.get("service_time", 0.0), params.get("speed", 1.0), params.get("horizon"),
+        distance_fn=distance_fn)
+
+
+def _unassigned(deliveries, routes):
+    """Deliveries no route visits (stops the constraints left out), as lists."""
+    visited = {p for route in routes for p in route}
+    return [list(p) for p in deliveries if p not in visited]
+
+
+def solve_vrp_sa(params, state, time_budget):
+    """
+    Run simulated annealing for at most `time_budget` seconds.
+    params: depot, deliveries, num_vehicles and optionally initial_temp, cooling_rate, min_temp, seed,
+    iterations (a cap on every route's iterations), plus the constraint params demands,
+    time_windows, capacity, service_time, speed, horizon and the road params road_nodes,
+    road_edges, road_directed, road_cache_dir, road_workers. The job is done once every route
+    has cooled or run `iterations`.
+    batched=True steps all routes in lockstep with one BatchedAnnealer (unconstrained only),
+    which is much faster for fleets of many small routes.
+    """
+    from localsearch.vrp import sa
+    depot = tuple(params["depot"])
+    deliveries = [tuple(p) for p in params["deliveries"]]
+    distance_fn = _distance_fn(params, depot, deliveries)
+    constraints = _constraints(params, depot, deliveries, distance_fn)
+    if params.get("batched"):
+        return _solve_vrp_batch(params, state, time_budget, depot, deliveries, constraints, distance_fn)
+    if state is None:
+        agent = sa.VRPAgentSimulatedAnnealing(
+            depot, deliveries, params["num_vehicles"],
+            params.get("initial_temp", 10000), params.get("cooling_rate", 0.995),
+            params.get("min_temp", 1e-8), constraints=constraints, distance_fn=distance_fn)
+        optimizers = agent.create_optimizers(agent.compute_initial_routes(), seed=params.get("seed"))
+    else:
+        optimizers = [sa.SAOptimizer(s["route"], constraints=constraints, distance_fn=distance_fn)
+                      for s in state]
+        for optimizer, s in zip(optimizers, state):
+            optimizer.load_state_dict(s)
+
+    iterations = params.get("iterations")
+
+    def finished(optimizer):
+        return optimizer.is_finished() or (iterations is not None and optimizer.iteration >= iterations)
+
+    stop = time.perf_counter() + time_budget
+    while not all(finished(o) for o in optimizers) and time.perf_counter() < stop:
+        running = [o for o in optimizers if not finished(o)]
+        steps = CLOCK_CHECK_EVERY if iterations is None else min(
+            CLOCK_CHECK_EVERY, iterations - max(o.iteration for o in running))
+        for _ in range(steps):
+            for optimizer in running:
+                optimizer.update()
+
+    done = all(finished(o) for o in optimizers)
+    best_distance = sum(o.best_distance for o in optimizers)
+    progress = {
+        "iteration": max(o.iteration for o in optimizers),
+        "temperature": max(o.temperature for o in optimizers),
+        "best_distance": best_distance,
+    }
+    result = {"routes": [[list(p) for p in o.best_route] for o in optimizers],
+              "distance": best_distance,
+              "unassigned": _unassigned(deliveries, [o.best_route for o in optimizers])}
+    return [o.state_dict() for o in optimizers], progress, result, done
+
+
+def _solve_vrp_batch(params, state, time_budget, depot, deliveries, constraints, distance_fn):
+    """solve_vrp_sa with batched=True; the state holds the initial routes and the batch's state."""
+    from localsearch.vrp import sa
+    agent = sa.VRPAgentSimulatedAnnealing(
+        depot, deliveries, params["num_vehicles"],
+        params.get("initial_temp", 10000), params.get("cooling_rate", 0.995),
+        params.get("min_temp", 1e-8), constraints=constraints, distance_fn=distance_fn)
+    if state is None:
+        routes = agent.compute_initial_routes()
+        batch = agent.create_batch(routes, seed=params.get("seed"))
+    else:
+        routes = state["routes"]
+        batch = agent.create_batch(routes)
+        batch.load_state_dict(state["batch"])
+
+    iterations = params.get("iterations")
+
+    def finished():
+        return batch.is_finished() or (iterations is not None and batch.iteration.max() >= iterations)
+
+    stop = time.perf_counter() + time_budget
+    while not finished() and time.perf_counter() < stop:
+        batch.run(CLOCK_CHECK_EVERY if iterations is None
+                  else min(CLOCK_CHECK_EVERY, iterations - int(batch.iteration.max())))
+
+    best_routes = batch.best_routes()
+    progress = batch.get_state()
+    del progress["current_distance"]
+    result = {"routes": [[list(p) for p in route] for route in best_routes],
+              "distance": progress["best_distance"],
+              "unassigned": _unassigned(deliveries, best_routes)}
+    return {"routes": routes, "batch": batch.state_dict()}, progress, result, finished()
+
+
+def solve_vrp_ga(params, state, time_budget):
+    """
+    Run the VRP genetic algorithm for at most `time_budget` seconds.
+    params: depot, deliveries, num_vehicles and optionally population_size, mutation_rate,
+    generations (default 200), seed, local_search_budget, local_search_evaluations, steady_state,
+    stagnation_limit, min_diversity and the constraint and road params (as for solve_vrp_sa). The
+    job is done after `generations` or once every vehicle has converged.
+    """
+    from localsearch.vrp import ga
+    depot = tuple(params["depot"])
+    deliveries = [tuple(p) for p in params["deliveries"]]
+    distance_fn = _distance_fn(params, depot, deliveries)
+    # A resumed slice builds the agent straight from its state, without new populations
+    agent = ga.VRPAgentGenetic(
+        depot, deliveries, params["num_vehicles"],
+        params.get("population_size", 100), params.get("mutation_rate", 0.02), seed=params.get("seed"),
+        local_search_budget=params.get("local_search_budget", 0),
+        local_search_evaluations=params.get("local_search_evaluations", 2000),
+        steady_state=params.get("steady_state", False), stagnation_limit=params.get("stagnation_limit"),
+        min_diversity=params.get("min_diversity"),
+        constraints=_constraints(params, depot, deliveries, distance_fn), distance_fn=distance_fn,
+        state=state)
+    generations = params.get("generations", 200)
+
+    def finished():
+        return max(s.generation for s in agent.solvers) >= generations or agent.is_converged()
+
+    stop = time.perf_counter() + time_budget
+    while not finished() and time.perf_counter() < stop:
+        agent.run_generation()
+
+    routes = agent.get_best_routes()
+    distance = sum(_route_distance(route, distance_fn) for route in routes)
+    progress = {"generation": max(s.generation for s in agent.solvers), "best_distance": distance}
+    result = {"routes": [[list(p) for p in route] for route in routes], "distance": distance,
+              "unassigned": _unassigned(deliveries, routes)}
+    return agent.state_dict(), progress, result, finished()
+
+
+def solve_vrp_alns(params, state, time_budget):
+    """
+    Run adaptive large neighborhood search over the whole fleet for at most `time_budget`
+    seconds. params: as for solve_vrp_sa (cooling_rate, min_temp, seed and the constraint
+    and road params; initial_temp defaults to one scaled to the instance), plus optionally
+    iterations to cap the search. The job is done once cooled or after `iterations`.
+    """
+    from localsearch.vrp import sa
+    depot = tuple(params["depot"])
+    deliveries = [tuple(p) for p in params["deliveries"]]
+    distance_fn = _distance_fn(params, depot, deliveries)
+    agent = sa.VRPAgentSimulatedAnnealing(
+        depot, deliveries, params["num_vehicles"], cooling_rate=params.get("cooling_rate", 0.995),
+        min_temp=params.get("min_temp", 1e-8), constraints=_constraints(params, depot, deliveries, distance_fn),
+        distance_fn=distance_fn)
+    options = {"initial_temp": params["initial_temp"]} if "initial_temp" in params else {}
+    # The state keeps the initial routes, which fix the stop ids, so a resumed slice does
+    # not construct them again
+    if state is None:
+        initial_routes = agent.compute_initial_routes()
+        initial_unassigned = agent.unassigned
+    else:
+        initial_routes, initial_unassigned = state["routes"], state["unassigned"]
+        agent.unassigned = initial_unassigned
+    optimizer = agent.create_alns(initial_routes, seed=params.get("seed"), **options)
+    if state is not None:
+        optimizer.load_state_dict(state["alns"])
+    iterations = params.get("iterations")
+
+    def finished():
+        return optimizer.is_finished() or (iterations is not None and optimizer.iteration >= iterations)
+
+    stop = time.perf_counter() + time_budget
+    while not finished() and time.perf_counter() < stop:
+        optimizer.update()
+
+    routes = optimizer.best_routes()
+    distance = optimizer.best_distance()
+    progress = {"iteration": optimizer.iteration, "temperature": optimizer.temperature, "best_distance": distance}
+    result = {"routes": [[list(p) for p in route] for route in routes], "distance": distance,
+              "unassigned": [list(p) for p in optimizer.best_unassigned()]}
+    state = {"routes": initial_routes, "unassigned": initial_unassigned, "alns": optimizer.state_dict()}
+    return state, progress, result, finished()
+
+
+def solve_tasks(params, state, time_budget):
+    """
+    Run the task-scheduling genetic algorithm for at most `time_budget` seconds.
+    params: task_durations, task_priorities, robot_efficiencies and optionally
+    population_size, mutation_rate, generations (default 100), seed, steady_state,
+    stagnation_limit, min_diversity. The job is done after `generations` or on convergence.
+    """
+    from localsearch.tasks import agent as ts
+    durations = np.asarray(params["task_durations"])
+    priorities = np.asarray(params["task_priorities"])
+    efficiencies = np.asarray(params["robot_efficiencies"], dtype=float)
+    population_size = params.get("population_size", 50)
+    seed_seq = np.random.SeedSequence(params.get("seed"))
+    init_seed, ga_seed = seed_seq.spawn(2)
+    if state is None:
+        population = np.random.default_rng(init_seed).integers(
+            0, len(efficiencies), size=(population_size, len(durations)))
+    else:
+        population = state["population"]  # no initial population to draw for a resumed slice
+    scheduler = ts.GeneticScheduler(durations, priorities, efficiencies, population,
+                                    population_size, params.get("mutation_rate", 0.1), seed=ga_seed,
+                                    steady_state=params.get("steady_state", False),
+                                    stagnation_limit=params.get("stagnation_limit"),
+                                    min_diversity=params.get("min_diversity"))
+    if state is not None:
+        scheduler.load_state_dict(state)
+    generations = params.get("generations", 100)
+
+    def finished():
+        return scheduler.generation >= generations or scheduler.convergence() is not None
+
+    stop = time.perf_counter() + time_budget
+    while not finished() and time.perf_counter() < stop:
+        scheduler.next_generation()
+
+    best = scheduler.best_solution
+    best_fitness = None if best is None else float(scheduler.best_fitness)
+    progress = {"generation": scheduler.generation, "best_fitness": best_fitness}
+    result = {"assignment": None if best is None else best.tolist(), "fitness": best_fitness}
+    return scheduler.state_dict(), progress, result, finished()
+
+
+SOLVERS = {
+    "vrp-sa": solve_vrp_sa,
+    "vrp-ga": solve_vrp_ga,
+    "vrp-alns": solve_vrp_alns,
+    "tasks": solve_tasks,
+}
+
+REQUIRED_PARAMS = {
+    "vrp-sa": ("depot", "deliveries", "num_vehicles"),
+    "vrp-ga": ("depot", "deliveries", "num_vehicles"),
+    "vrp-alns": ("depot", "deliveries", "num_vehicles"),
+    "tasks": ("task_durations", "task_priorities", "robot_efficiencies"),
+}
+
+
+def _number(value, low=-math.inf, high=math.inf):
+    return (isinstance(value, (int, float)) and not isinstance(value, bool)
+            and math.isfinite(value) and low <= value <= high)
+
+
+def _integer(value, low=-math.inf):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= low
+
+
+def _pair(value):
+    return isinstance(value, (list, tuple)) and len(value) == 2 and all(_number(v) for v in value)
+
+
+def _numbers(value, low=-math.inf, high=math.inf):
+    return isinstance(value, (list, tuple)) and all(_number(v, low, high) for v in value)
+
+
+# Type and range of every parameter a solver reads: name -> (test, description)
+PARAM_RULES = {
+    "depot": (_pair, "an [x, y] pair of numbers"),
+    "deliveries": (lambda v: isinstance(v, (list, tuple)) and len(v) > 0 and all(map(_pair, v)),
+                   "a non-empty list of [x, y] pairs"),
+    "num_vehicles": (lambda v: _integer(v, 1), "an integer >= 1"),
+    "task_durations": (lambda v: _numbers(v, 0.0) and len(v) > 0, "a non-empty list of numbers >= 0"),
+    "task_priorities": (_numbers, "a list of numbers"),
+    "robot_efficiencies": (lambda v: _numbers(v, 1e-9) and len(v) > 0, "a non-empty list of numbers > 0"),
+    "seed": (lambda v: _integer(v, 0), "an integer >= 0"),
+    "initial_temp": (lambda v: _number(v, 1e-300), "a number > 0"),
+    "cooling_rate": (lambda v: _number(v, 1e-9, 1 - 1e-12), "a number between 0 and 1 (exclusive)"),
+    "min_temp": (lambda v: _number(v, 1e-300), "a number > 0"),
+    "iterations": (lambda v: _integer(v, 1), "an integer >= 1"),
+    "generations": (lambda v: _integer(v, 1), "an integer >= 1"),
+    "batched": (lambda v: isinstance(v, bool), "true or false"),
+    "population_size": (lambda v: _integer(v, 2), "an integer >= 2"),
+    "mutation_rate": (lambda v: _number(v, 0.0, 1.0), "a number between 0 and 1"),
+    "local_search_budget": (lambda v: _integer(v, 0), "an integer >= 0"),
+    "local_search_evaluations": (lambda v: _integer(v, 1), "an integer >= 1"),
+    "steady_state": (lambda v: isinstance(v, bool), "true or false"),
+    "stagnation_limit": (lambda v: _integer(v, 1), "an integer >= 1"),
+    "min_diversity": (lambda v: _number(v, 0.0, 1.0), "a number between 0 and 1"),
+    "demands": (lambda v: _numbers(v, 0.0), "a list of numbers >= 0, one per delivery"),
+    "time_windows": (lambda v: isinstance(v, (list, tuple)) and all(_pair(w) and w[0] <= w[1] for w in v),
+                     "a list of [start, end] pairs with start <= end, one per delivery"),
+    "capacity": (lambda v: _number(v, 0.0), "a number >= 0"),
+    "service_time": (lambda v: _number(v, 0.0), "a number >= 0"),
+    "speed": (lambda v: _number(v, 1e-9), "a number > 0"),
+    "horizon": (lambda v: _number(v, 0.0), "a number >= 0"),
+    "road_nodes": (lambda v: isinstance(v, str), "a file path"),
+    "road_edges": (lambda v: isinstance(v, str), "a file path"),
+    "road_directed": (lambda v: isinstance(v, bool), "true or false"),
+    "road_cache_dir": (lambda v: isinstance(v, str), "a directory path"),
+    "road_workers": (lambda v: _integer(v, 0), "an integer >= 0"),
+}
+
+# Parameters where null means "use the default" (or "off")
+NULLABLE_PARAMS = {"seed", "iterations", "stagnation_limit", "min_diversity", "demands", "time_windows",
+                   "capacity", "horizon", "road_nodes", "road_edges", "road_cache_dir"}
+
+
+def check_params(kind, params):
+    """
+    Raise ValueError unless `params` has every parameter `kind` requires and every
+    parameter in PARAM_RULES has the right type and range; unknown names are ignored.
+    Solvers trust their params, so the service checks them before queueing a job.
+    """
+    missing = [name for name in REQUIRED_PARAMS[kind] if name not in params]
+    if missing:
+        raise ValueError(f"Missing parameters for {kind}: {', '.join(missing)}")
+    for name, value in params.items():
+        if name not in PARAM_RULES or (value is None and name in NULLABLE_PARAMS):
+            continue
+        test, description = PARAM_RULES[name]
+        if not test(value):
+            raise ValueError(f"{name} must be {description}, not {value!r:.60}")
+    if kind == "tasks":
+        if len(params["task_priorities"]) != len(params["task_durations"]):
+            raise ValueError("task_priorities must have one entry per task duration")
+        return
+    for name in ("demands", "time_windows"):
+        if params.get(name) is not None and len(params[name]) != len(params["deliveries"]):
+            raise ValueError(f"{name} must have one entry per delivery")
+    if params.get("road_nodes") is not None and params.get("road_edges") is None:
+        raise ValueError("road_nodes needs road_edges")
+
+
+def slice_seconds(kind, params, base):
+    """
+    Slice length for a job: `base` seconds for instances of up to SLICE_SIZE_UNIT stops or
+    tasks, growing linearly with the instance size beyond that (at most MAX_SLICE_FACTOR times).
+    """
+    try:
+        size = len(params["task_durations"] if kind == "tasks" else params["deliveries"])
+    except (KeyError, TypeError):
+        size = 0  # malformed params; the first slice reports the error
+    return base * min(max(1.0, size / SLICE_SIZE_UNIT), MAX_SLICE_FACTOR)
+
+
+def run_slice(kind, params, state, time_budget):
+    """
+    Entry point executed in a pool process: advance one job by up to `time_budget` seconds.
+    Returns (state, progress, result, done); state is fed back into the next slice.
+    """
+    return SOLVERS[kind](params, state, time_budget)
@@ -1,8 +1,16 @@
+import os
+import sys
 import pygame
-from agent import Agent
-from environment import Environment
 import numpy as np
-import random
+
+# Visual front end for the localsearch package at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from localsearch.tasks.agent import Agent, GeneticScheduler
+from localsearch.tasks.environment import Environment
+from localsearch.tasks.parallel import SharedEvaluator
+from localsearch.metrics import SolverMetrics, Profiler
+from localsearch.checkpoint import AutoCheckpointer, read_checkpoint, restore_checkpoint
+from localsearch.recorder import TraceRecorder
 
 # Initialize Pygame
 pygame.init()
@@ -15,7 +23,10 @@ font = pygame.font.Font(None, 24)
 # Environment setup
 num_tasks = 10
 num_robots = 5
-environment = Environment(num_tasks, num_robots)
+# Set seed to an int for a reproducible instance and solve; each part gets its own stream
+seed = None
+env_seed, solver_seed = np.random.SeedSequence(seed).spawn(2)
+environment = Environment(num_tasks, num_robots, seed=env_seed)
 task_assignments = environment.generate_assignments()
 
 # Initialize agents
@@ -24,68 +35,103 @@ agents = [Agent(id=i, efficiency=environment.robot_efficiencies[i]) for i in ran
 # Genetic Algorithm parameters
 population_size = 50
 mutation_rate = 0.1
+# Steady-state mode: children replace the worst assignments in place instead of a new population each generation
+steady_state = False
 n_generations = 10
+# Stopping rules: stop after `stagnation_limit` generations without improvement or once the
+# population diversity (sampled Hamming distance) drops below `min_diversity`; None disables a rule
+stagnation_limit = 5
+min_diversity = 0.02
 generation_delay = 1000  # Delay (milliseconds) between each generation for visualization
 
-# Updates list to display below the grid
-updates = []
-max_updates = 5  # Max number of updates to display at once
-
-# Genetic Algorithm functions
-def fitness(individual):
-    robot_times = np.zeros(num_robots)
-    for task, robot in enumerate(individual):
-        duration = environment.task_durations[task]
-        priority = environment.task_priorities[task]
-        robot_times[robot] += duration / agents[robot].efficiency * priority
-    total_time = np.max(robot_times)
-    workload_balance = np.std(robot_times)
-    return total_time + workload_balance
-
-def selection(population):
-    return sorted(population, key=fitness)[:population_size // 2]
-
-def crossover(parent1, parent2):
-    point = random.randint(1, num_tasks - 1)
-    return np.concatenate([parent1[:point], parent2[point:]])
-
-def mutate(individual):
-    for i in range(len(individual)):
-        if random.random() < mutation_rate:
-            individual[i] = random.randint(0, num_robots - 1)
-    return individual
-
-# Initialize population
+# Event-driven mode: tasks arrive, complete or get cancelled and robots go offline over
+# simulated time. After each batch of events the GA repairs its population (only the
+# affected tasks are reassigned) and keeps evolving instead of restarting from scratch.
+dynamic = False
+event_horizon = 200.0       # simulated hours of generated events
+time_per_generation = 1.0   # simulated hours that pass per generation
+
+# Generations listed below the grid; the full history is kept by the trace recorder
+max_updates = 5
+
+# Instrumentation: hot-path counters are cheap; profilers are off unless enabled here
+collect_metrics = True
+profile_cpu = False
+profile_memory = False
+profiler = Profiler(cpu=profile_cpu, memory=profile_memory)
+
+# Convergence trace: feeds the update list and fitness curve. Set trace_path to e.g.
+# "task_trace.jsonl" (or .npz) to also write it to a file.
+trace_path = None
+trace = TraceRecorder(GeneticScheduler.TRACE_FIELDS, path=trace_path)
+
+# Parallel evaluation: score whole populations in this many worker processes through shared
+# memory (0 = vectorized in this process); None keeps the per-individual fitness loop.
+# Started from this script, workers need the "fork" start method (the Linux default).
+evaluation_workers = None
+evaluator = SharedEvaluator(evaluation_workers) if evaluation_workers is not None else None
+
+# Initialize population and the GA
 population = environment.generate_assignments()
+scheduler = GeneticScheduler(environment.task_durations, environment.task_priorities,
+                             [agent.efficiency for agent in agents], population,
+                             population_size, mutation_rate,
+                             metrics=SolverMetrics() if collect_metrics else None, seed=solver_seed,
+                             steady_state=steady_state, stagnation_limit=stagnation_limit,
+                             min_diversity=min_diversity, trace=trace, evaluator=evaluator)
 
 # Visualization loop
 running = True
-best_solution = None
-best_fitness = float('inf')
 generation_count = 0
 
+# Checkpointing: set a path to save the GA every `checkpoint_every` generations.
+# If the file exists at startup the run resumes from it exactly where it stopped.
+checkpoint_path = None
+checkpoint_every = 1
+checkpointer = None
+if checkpoint_path is not None:
+    checkpointer = AutoCheckpointer(checkpoint_path, every=checkpoint_every)
+    if os.path.exists(checkpoint_path):
+        payload = read_checkpoint(checkpoint_path)
+        instance = payload["extra"]
+        environment.task_durations = instance["task_durations"]
+        environment.task_priorities = instance["task_priorities"]
+        environment.robot_efficiencies = instance["robot_efficiencies"]
+        if instance.get("environment") is not None:
+            environment.load_state_dict(instance["environment"])
+        agents = [Agent(id=i, efficiency=environment.robot_efficiencies[i]) for i in range(num_robots)]
+        scheduler = GeneticScheduler(environment.task_durations, environment.task_priorities,
+                                     [agent.efficiency for agent in agents], population,
+                                     population_size, mutation_rate,
+                                     metrics=SolverMetrics() if collect_metrics else None, seed=solver_seed,
+                                     steady_state=steady_state, stagnation_limit=stagnation_limit,
+                                     min_diversity=min_diversity, trace=trace, evaluator=evaluator)
+        restore_checkpoint(payload, [scheduler])
+        generation_count = scheduler.generation
+if dynamic and generation_count == 0:
+    environment.generate_events(event_horizon)
+
 while running:
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
 
     # Genetic Algorithm step-by-step per generation
-    selected = selection(population)
-    next_generation = []
-    while len(next_generation) < population_size:
-        parent1, parent2 = random.sample(selected, 2)
-        child = crossover(parent1, parent2)
-        next_generation.append(mutate(child))
-    
-    # Update population with next generation
-    population = next_generation
-
-    # Find the best solution in the current generation
-    current_best = min(population, key=fitness)
-    current_fitness = fitness(current_best)
-    if current_fitness < best_fitness:
-        best_fitness = current_fitness
-        best_solution = current_best
+    with profiler:
+        if dynamic:
+            columns = environment.advance(environment.time + time_per_generation)
+            if columns is not None:
+                scheduler.repair(environment.task_durations, environment.task_priorities, columns,
+                                 np.flatnonzero(environment.robots_online))
+        scheduler.next_generation()
+    if checkpointer is not None:
+        checkpointer.step([scheduler], {"task_durations": environment.task_durations,
+                                        "task_priorities": environment.task_priorities,
+                                        "robot_efficiencies": environment.robot_efficiencies,
+                                        "environment": environment.state_dict() if dynamic else None})
+    current_best = scheduler.current_best
+    best_fitness = scheduler.best_fitness
+    info = scheduler.get_generation_info()
 
     # Draw current generation's best solution on the grid
     environment.draw_grid(screen, font, current_best)
@@ -95,30 +141,54 @@ while running:
     fitness_text = font.render(f"Best Fitness: {best_fitness:.2f}", True, (0, 0, 0))
     screen.blit(generation_text, (SCREEN_WIDTH - 200, 50))
     screen.blit(fitness_text, (SCREEN_WIDTH - 200, 80))
-
-    # Add update for the current generation to the updates list
-    update_text = f"Generation {generation_count + 1}: Best Fitness = {best_fitness:.2f}"
-    updates.append(update_text)
-    if len(updates) > max_updates:
-        updates.pop(0)  # Remove the oldest update if we exceed the display limit
-
-    # Display the list of updates below the grid
+    metrics = scheduler.get_metrics()
+    if metrics is not None:
+        metrics_lines = [f"Evaluations: {metrics['evaluations']}",
+                         f"Cache hits: {metrics['cache_hits']}",
+                         f"Gen/s: {metrics['iterations_per_second']:.1f}",
+                         f"Diversity: {info['diversity']:.2f}",
+                         f"Duplicates: {info['duplicates_removed']}"]
+        if dynamic:
+            metrics_lines += [f"Time: {environment.time:.0f}h  Tasks: {environment.num_tasks}",
+                              f"Events queued: {len(environment.events)}"]
+        for i, line in enumerate(metrics_lines):
+            screen.blit(font.render(line, True, (0, 0, 0)), (SCREEN_WIDTH - 200, 110 + i * 25))
+
+    # Best-fitness curve over the whole run, read from the trace recorder
+    chart_rect = pygame.Rect(SCREEN_WIDTH - 200, 300, 180, 100)
+    pygame.draw.rect(screen, (230, 230, 230), chart_rect)
+    points = trace.curve_points("best_fitness", chart_rect)
+    if len(points) > 1:
+        pygame.draw.lines(screen, (0, 0, 200), False, points, 2)
+
+    # Display the latest recorded generations below the grid
     update_start_y = 650  # Starting Y position below the grid
-    for i, update in enumerate(updates):
-        update_surface = font.render(update, True, (0, 0, 0))
+    for i, (generation, best) in enumerate(trace.recent(max_updates)[:, :2].tolist()):
+        update_surface = font.render(f"Generation {int(generation)}: Best Fitness = {best:.2f}", True, (0, 0, 0))
         screen.blit(update_surface, (50, update_start_y + i * 25))
 
     pygame.display.flip()
     pygame.time.delay(generation_delay)
 
     generation_count += 1
-    if generation_count >= n_generations:
+    if dynamic:
+        # Keep evolving between events; convergence only means waiting for the next change
+        if environment.time >= event_horizon:
+            break
+    elif generation_count >= n_generations or info["converged"] is not None:
         break
 
+if profile_cpu or profile_memory:
+    print(profiler.report())
+    profiler.stop()
+
 # Keep window open after completion
 while running:
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
 
+trace.close()
+if evaluator is not None:
+    evaluator.close()
 pygame.quit()
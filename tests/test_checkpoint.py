@@ -0,0 +1,147 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from localsearch.tasks.agent import GeneticScheduler
+from localsearch.tasks.environment import Environment
+from localsearch.vrp.alns import ALNSOptimizer
+from localsearch.vrp.batch import BatchedAnnealer
+from localsearch.vrp.constraints import RouteConstraints
+from localsearch.vrp.ga import RouteGASolver
+from localsearch.vrp.sa import SAOptimizer, VRPAgentSimulatedAnnealing
+
+
+def points(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [tuple(p) for p in rng.integers(0, 500, size=(count, 2)).tolist()]
+
+
+def round_trip(state):
+    """A state as it comes back from a checkpoint file."""
+    return pickle.loads(pickle.dumps(state))
+
+
+def same(a, b):
+    """Exact equality of nested containers holding numpy arrays (which == does not handle)."""
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return np.array_equal(a, b)
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(same(a[key], b[key]) for key in a)
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def make_ga(size, **kwargs):
+    return RouteGASolver((250, 250), points(size), population_size=20, mutation_rate=0.05, seed=7, **kwargs)
+
+
+def ga_case(size, **options):
+    return (lambda: make_ga(size, **options), RouteGASolver.run_generation,
+            lambda solver: (solver.best_solution[:], solver.best_fitness, solver.population_stats()))
+
+
+def sa_case(constrained):
+    depot = (250, 250)
+    stops = points(15, seed=1)
+    constraints = None
+    if constrained:
+        constraints = RouteConstraints(depot, stops, demands=[1] * len(stops), capacity=len(stops),
+                                       time_windows=[(0.0, 4000.0)] * len(stops), speed=1.0)
+    route = [depot] + stops + [depot]
+    return (lambda: SAOptimizer(route, cooling_rate=0.99, seed=5, block_size=256, constraints=constraints),
+            SAOptimizer.update,
+            lambda solver: (solver.route[:], solver.best_route[:], solver.best_distance, solver.temperature))
+
+
+def task_ga_case(steady_state):
+    environment = Environment(30, 5, seed=2)
+    population = np.random.default_rng(3).integers(0, 5, size=(20, 30))
+    return (lambda: GeneticScheduler(environment.task_durations, environment.task_priorities,
+                                     environment.robot_efficiencies, population, population_size=20,
+                                     mutation_rate=0.1, seed=4, steady_state=steady_state),
+            GeneticScheduler.next_generation,
+            lambda solver: (solver.population.copy(), solver.best_solution.copy(), solver.get_generation_info()))
+
+
+def alns_case(constrained):
+    depot = (250, 250)
+    stops = points(30, seed=6)
+    constraints = None
+    if constrained:
+        windows = [(0.0, 300.0 + 20.0 * k) for k in range(len(stops))]
+        constraints = RouteConstraints(depot, stops, demands=[1] * len(stops), capacity=7,
+                                       time_windows=windows, speed=5.0)
+    agent = VRPAgentSimulatedAnnealing(depot, stops, 4, cooling_rate=0.97, constraints=constraints)
+    routes = agent.compute_initial_routes()
+    return (lambda: agent.create_alns(routes, seed=8, segment_length=10), ALNSOptimizer.update,
+            lambda solver: (solver.state_dict(), solver.best_routes()))
+
+
+def batch_case():
+    depot = (250, 250)
+    # Routes of different lengths, including one too short to move, so rows are padded
+    routes = [[depot] + points(size, seed=size) + [depot] for size in (1, 3, 8, 12)]
+    return (lambda: BatchedAnnealer(routes, initial_temp=[500, 1000, 2000, 4000], cooling_rate=0.9, seed=9,
+                                    block_size=16),
+            BatchedAnnealer.update,
+            lambda solver: (solver.state_dict(), solver.best_routes()))
+
+
+# name, (make, step, snapshot) builder, steps run, steps before the checkpoint
+CASES = [
+    ("ga_plain", lambda: ga_case(12), 12, [0, 1, 5]),
+    # 5 stops: a route and its reverse tie for best
+    ("ga_plain_tie", lambda: ga_case(5), 12, [0, 1, 5]),
+    ("ga_steady_state", lambda: ga_case(12, steady_state=True), 12, [0, 1, 5]),
+    ("ga_steady_state_tie", lambda: ga_case(5, steady_state=True), 12, [0, 1, 5]),
+    ("ga_memetic", lambda: ga_case(12, local_search_budget=2), 12, [0, 1, 5]),
+    ("ga_steady_memetic", lambda: ga_case(12, steady_state=True, local_search_budget=2), 12, [0, 1, 5]),
+    # Long enough to cool below min_temp
+    ("sa_swap", lambda: sa_case(False), 3000, [0, 700, 1500]),
+    ("sa_relocate", lambda: sa_case(True), 3000, [0, 700, 1500]),
+    ("task_ga", lambda: task_ga_case(False), 15, [0, 1, 6]),
+    ("task_ga_steady_state", lambda: task_ga_case(True), 15, [0, 1, 6]),
+    ("alns", lambda: alns_case(False), 60, [0, 7, 25]),
+    ("alns_constrained", lambda: alns_case(True), 60, [0, 7, 25]),
+    ("batch", batch_case, 300, [0, 5, 40]),
+]
+
+
+@pytest.mark.parametrize("build, steps, stop", [pytest.param(build, steps, stop, id=f"{name}-{stop}")
+                                                for name, build, steps, stops in CASES for stop in stops])
+def test_resume_matches_uninterrupted(build, steps, stop):
+    """Checkpointing after `stop` steps and resuming gives exactly the uninterrupted run."""
+    make, step, snapshot = build()
+    reference = make()
+    history = []
+    for _ in range(steps):
+        step(reference)
+        history.append(snapshot(reference))
+    interrupted = make()
+    for _ in range(stop):
+        step(interrupted)
+    resumed = make()
+    resumed.load_state_dict(round_trip(interrupted.state_dict()))
+    for expected in history[stop:]:
+        step(resumed)
+        assert same(snapshot(resumed), expected)
+
+
+def test_steady_state_statistics_round_trip():
+    solver = make_ga(8, steady_state=True)
+    for _ in range(3):
+        solver.run_generation()
+    resumed = make_ga(8, steady_state=True)
+    resumed.load_state_dict(round_trip(solver.state_dict()))
+    assert resumed._worst_heap == solver._worst_heap
+    assert resumed.population_stats() == solver.population_stats()
+    # The same children replace the same slots in the same order
+    children = [solver.rng.permutation(solver.route_points).tolist() for _ in range(30)]
+    for child in children:
+        child = [tuple(point) for point in child]
+        assert resumed.replace_worst(child) == solver.replace_worst(child)
+        assert resumed.population == solver.population
+        assert resumed._worst_heap[0] == solver._worst_heap[0]
+    assert resumed.population_stats() == solver.population_stats()
@@ -0,0 +1,112 @@
+import random
+
+import pytest
+
+from localsearch.vrp.constraints import RouteConstraints, concatenate
+
+
+def random_instance(seed, stops=8, tight=True):
+    """Random constraints and one random route through all of their deliveries."""
+    rng = random.Random(seed)
+    depot = (50.0, 50.0)
+    deliveries = [(rng.uniform(0, 100), rng.uniform(0, 100)) for _ in range(stops)]
+    demands = [rng.randint(1, 5) for _ in deliveries]
+    windows = []
+    for _ in deliveries:
+        opens = rng.uniform(0, 200 if tight else 50)
+        windows.append((opens, opens + rng.uniform(100, 300 if tight else 600)))
+    capacity = sum(demands) + rng.randint(-2, 5)
+    constraints = RouteConstraints(depot, deliveries, demands, windows, capacity=capacity,
+                                   service_time=rng.choice([0.0, 5.0]), speed=3.0,
+                                   horizon=rng.uniform(500, 1000))
+    route = deliveries[:]
+    rng.shuffle(route)
+    return constraints, [depot] + route + [depot]
+
+
+def simulate(constraints, route):
+    """(lateness, overload) by driving the route stop by stop, independently of RouteSchedule."""
+    lateness, time, load = 0.0, 0.0, 0
+    for k in range(1, len(route)):
+        time += constraints.distance(route[k - 1], route[k]) / constraints.speed
+        time += constraints.service_time if k > 1 else 0.0
+        earliest, latest = constraints.window[route[k]]
+        if time < earliest:
+            time = earliest
+        elif time > latest:
+            lateness += time - latest
+            time = latest
+        load += constraints.demand[route[k]]
+    return lateness, max(0, load - constraints.capacity)
+
+
+def feasible(constraints, route):
+    lateness, overload = simulate(constraints, route)
+    return lateness <= 1e-9 and overload == 0
+
+
+def route_distance(constraints, route):
+    return sum(constraints.distance(a, b) for a, b in zip(route, route[1:]))
+
+
+@pytest.mark.parametrize("tight", [True, False])
+def test_relocate_matches_brute_force(tight):
+    outcomes = set()
+    for seed in range(300):
+        # Route lengths around powers of two exercise every shape of the segment table
+        constraints, route = random_instance(seed, stops=seed % 13 + 2, tight=tight)
+        schedule = constraints.schedule(route, relocations=True)
+        for i in range(1, len(route) - 1):
+            for k in range(len(route) - 1):
+                if k in (i - 1, i):
+                    continue
+                moved = route[:i] + route[i + 1:]
+                moved.insert(k if k > i else k + 1, route[i])
+                delta, ok = schedule.relocate(i, k)
+                # The load never changes, so only the lateness decides
+                expected = simulate(constraints, moved)[0] <= 1e-9
+                assert ok == expected, (seed, i, k)
+                assert delta == pytest.approx(route_distance(constraints, moved) - schedule.distance)
+                outcomes.add(ok)
+    assert outcomes == {True, False}
+
+
+@pytest.mark.parametrize("tight", [True, False])
+def test_insertion_matches_brute_force(tight):
+    outcomes = set()
+    for seed in range(300):
+        constraints, route = random_instance(seed, tight=tight)
+        point, route = route[1], route[:1] + route[2:]
+        schedule = constraints.schedule(route)
+        for k in range(len(route) - 1):
+            inserted = route[:k + 1] + [point] + route[k + 1:]
+            delta, ok = schedule.insertion(k, point)
+            assert ok == feasible(constraints, inserted), (seed, k)
+            assert delta == pytest.approx(route_distance(constraints, inserted) - schedule.distance)
+            outcomes.add(ok)
+    assert outcomes == {True, False}
+
+
+@pytest.mark.parametrize("stops", [1, 2, 6, 7, 14, 30])
+def test_segment_table_matches_left_fold(stops):
+    constraints, route = random_instance(stops, stops=stops)
+    schedule = constraints.schedule(route, relocations=True)
+    for first in range(len(route)):
+        segment = schedule.nodes[first]
+        assert schedule._middle(first, first) == segment
+        for last in range(first + 1, len(route)):
+            segment = concatenate(segment, schedule.nodes[last], schedule.travel[last - 1])
+            assert schedule._middle(first, last) == pytest.approx(segment)
+
+
+def test_violation_matches_simulation():
+    for seed in range(100):
+        constraints, route = random_instance(seed)
+        schedule = constraints.schedule(route)
+        lateness, overload = simulate(constraints, route)
+        assert constraints.evaluate(route) == (schedule.distance, schedule.lateness, schedule.overload)
+        assert constraints.violation(route) == (schedule.lateness, schedule.overload)
+        assert schedule.lateness == pytest.approx(lateness, abs=1e-9)
+        assert schedule.overload == overload
+        assert schedule.feasible == feasible(constraints, route)
+        assert schedule.distance == pytest.approx(route_distance(constraints, route))
@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+from localsearch.tasks.agent import GeneticScheduler
+from localsearch.tasks.environment import Environment
+from localsearch.vrp.ga import RouteGASolver, VRPAgentGenetic
+from solve_service import workers
+
+DEPOT = (250, 250)
+
+
+def points(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [tuple(p) for p in rng.integers(0, 500, size=(count, 2)).tolist()]
+
+
+def vrp_solver(**options):
+    return RouteGASolver(DEPOT, points(12), population_size=20, seed=1, **options)
+
+
+def task_solver(**options):
+    environment = Environment(20, 4, seed=1)
+    population = np.random.default_rng(0).integers(0, 4, size=(20, 20))
+    return GeneticScheduler(environment.task_durations, environment.task_priorities,
+                            environment.robot_efficiencies, population, population_size=20, seed=1, **options)
+
+
+def step(solver):
+    if isinstance(solver, GeneticScheduler):
+        solver.next_generation()
+    else:
+        solver.run_generation()
+
+
+def clone_population(solver):
+    if isinstance(solver, GeneticScheduler):
+        solver.population[:] = solver.population[0]
+    else:
+        solver.population = [solver.population[0][:] for _ in solver.population]
+
+
+SOLVERS = [pytest.param(vrp_solver, id="vrp"), pytest.param(task_solver, id="tasks")]
+
+
+@pytest.mark.parametrize("make", SOLVERS)
+def test_stagnation_fires_after_the_limit_without_improvement(make):
+    solver = make(stagnation_limit=3)
+    for _ in range(200):
+        if solver.generation - solver.last_improvement >= 3:
+            break
+        assert solver.convergence() is None
+        step(solver)
+    assert solver.generation - solver.last_improvement == 3
+    assert solver.convergence() == "stagnation"
+    assert make().convergence() is None  # no rules, no stop
+
+
+@pytest.mark.parametrize("make", SOLVERS)
+def test_low_diversity_fires_on_a_cloned_population(make):
+    solver = make(min_diversity=0.05)
+    assert solver.diversity() > 0.05
+    assert solver.convergence() is None
+    clone_population(solver)
+    assert solver.diversity() == 0.0
+    assert solver.convergence() == "low_diversity"
+
+
+@pytest.mark.parametrize("make", SOLVERS)
+def test_diversity_draws_no_random_numbers(make):
+    solver = make()
+    state = solver.rng.bit_generator.state
+    solver.diversity()
+    solver.convergence()
+    assert solver.rng.bit_generator.state == state
+
+
+@pytest.mark.parametrize("make", SOLVERS)
+def test_duplicates_are_removed_from_the_next_population(make):
+    solver = make()
+    clone_population(solver)
+    step(solver)
+    assert solver.duplicates_removed > 0
+    unchecked = make(eliminate_duplicates=False)
+    clone_population(unchecked)
+    step(unchecked)
+    assert unchecked.duplicates_removed == 0
+    # Crossover of clones only gives clones back, so mutation alone spreads the unchecked run
+    assert unchecked.population_stats()["distinct"] < solver.population_stats()["distinct"] == 1.0
+
+
+def test_single_stop_routes_are_trivially_converged():
+    assert RouteGASolver(DEPOT, points(1), population_size=5, seed=1).convergence() == "trivial"
+
+
+def test_agent_skips_converged_vehicles():
+    agent = VRPAgentGenetic(DEPOT, points(30), 3, population_size=20, seed=2, min_diversity=0.05)
+    clone_population(agent.solvers[0])
+    generations = [solver.generation for solver in agent.solvers]
+    agent.run_generation()
+    assert agent.solvers[0].generation == generations[0]
+    assert [solver.generation for solver in agent.solvers[1:]] == [g + 1 for g in generations[1:]]
+    assert agent.get_generation_info()[0]["converged"] == "low_diversity"
+    assert not agent.is_converged()
+
+
+def test_service_jobs_finish_on_convergence():
+    environment = Environment(20, 4, seed=1)
+    params = {"task_durations": environment.task_durations.tolist(),
+              "task_priorities": environment.task_priorities.tolist(),
+              "robot_efficiencies": environment.robot_efficiencies.tolist(),
+              "seed": 1, "generations": 10000, "stagnation_limit": 5}
+    _, progress, _, done = workers.run_slice("tasks", params, None, 60.0)
+    assert done and progress["generation"] < 10000
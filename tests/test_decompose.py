@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from solve_service.decompose import DecompositionSolver, bisect, partition_sweep
+
+FAST = {"initial_temp": 100, "cooling_rate": 0.9}
+
+
+def assert_permutation(routes, count):
+    assert sorted(np.concatenate(routes).tolist()) == list(range(count))
+
+
+def test_sweep_and_bisect_partition_the_stops():
+    points = np.random.default_rng(0).uniform(0, 100, size=(500, 2))
+    sectors = partition_sweep((50, 50), points, 7)
+    assert_permutation(sectors, 500)
+    assert max(map(len, sectors)) - min(map(len, sectors)) <= 1
+    leaves = bisect(points, np.arange(500), 32)
+    assert_permutation(leaves, 500)
+    assert max(map(len, leaves)) <= 32
+
+
+@pytest.mark.parametrize("method", ["sa", "ga"])
+def test_leaves_cover_every_stop_once(method):
+    points = np.random.default_rng(1).uniform(0, 1000, size=(300, 2))
+    params = FAST if method == "sa" else {"population_size": 10, "generations": 5}
+    # Leaves of 8 under sectors of 100 stops: the centroid tours are decomposed too
+    solver = DecompositionSolver((500, 500), points, 3, method, leaf_size=8, window=4, workers=0, seed=2,
+                                 solver_params=params)
+    routes = solver.solve()
+    assert len(routes) == 3
+    assert_permutation(routes, 300)
+    assert len(solver.get_best_routes()[0]) == len(routes[0]) + 2
+
+
+def test_duplicate_points_are_kept_apart():
+    rng = np.random.default_rng(3)
+    # Ten distinct sites visited four times each, plus stops on the depot itself
+    points = np.vstack([np.repeat(rng.uniform(0, 100, size=(10, 2)), 4, axis=0), [[50, 50]] * 5])
+    solver = DecompositionSolver((50, 50), points, 2, leaf_size=6, workers=0, seed=4, solver_params=FAST)
+    assert_permutation(solver.solve(), 45)
+
+
+def test_more_vehicles_than_stops():
+    points = [(10, 10), (20, 80), (90, 40)]
+    solver = DecompositionSolver((50, 50), points, 5, workers=0, seed=5, solver_params=FAST)
+    routes = solver.solve()
+    assert len(routes) == 5
+    assert_permutation(routes, 3)
+    assert sorted(map(len, routes)) == [0, 0, 1, 1, 1]
+    assert sum(solver.route_distances()) > 0
+
+
+def test_pool_matches_in_process():
+    points = np.random.default_rng(6).uniform(0, 1000, size=(120, 2))
+
+    def solve(workers):
+        return DecompositionSolver((500, 500), points, 2, leaf_size=10, workers=workers, seed=7,
+                                   solver_params=FAST).solve()
+    for serial, parallel in zip(solve(0), solve(2)):
+        np.testing.assert_array_equal(serial, parallel)
@@ -0,0 +1,79 @@
+import math
+
+import numpy as np
+import pytest
+
+from localsearch.vrp.ga import LocalSearch, RouteGASolver
+
+DEPOT = (250, 250)
+
+
+def length(route, depot=DEPOT):
+    path = [depot] + list(route) + [depot]
+    return sum(math.hypot(b[0] - a[0], b[1] - a[1]) for a, b in zip(path, path[1:]))
+
+
+def points(count, seed):
+    rng = np.random.default_rng(seed)
+    return [tuple(p) for p in rng.integers(0, 500, size=(count, 2)).tolist()]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_improve_never_lengthens_a_tour_and_reports_its_gain(seed):
+    stops = points(seed % 25 + 1, seed)
+    search = LocalSearch(DEPOT, stops, num_neighbors=seed % 8 + 1, max_segment=seed % 3 + 1)
+    route = list(np.random.default_rng(seed).permutation(len(stops)))
+    route = [stops[k] for k in route]
+    improved, gain, checked, applied = search.improve(route)
+    assert sorted(improved) == sorted(stops)
+    assert length(improved) <= length(route) + 1e-9
+    assert gain == pytest.approx(length(route) - length(improved), abs=1e-6)
+    assert set(checked) == set(applied) == {"2opt", "oropt"}
+
+
+def test_fixes_a_crossing_next_to_the_depot():
+    # The first and last edges cross; only a move through the depot position removes it
+    stops = [(300, 200), (400, 250), (400, 400), (100, 400), (100, 250), (200, 200)]
+    route = [stops[5]] + stops[1:5] + [stops[0]]
+    improved, gain, _, applied = LocalSearch(DEPOT, stops).improve(route)
+    assert gain > 0 and sum(applied.values()) >= 1
+    assert length(improved) == pytest.approx(length(route) - gain)
+    assert length(improved) < length(route)
+
+
+def test_moves_a_stop_across_the_wrap_around():
+    # The last stop belongs next to the first one, across the depot at the wrap-around
+    route = [(100, 100), (120, 100), (400, 400), (110, 130)]
+    improved, gain, _, _ = LocalSearch(DEPOT, route).improve(route)
+    assert length(improved) == pytest.approx(length(route) - gain)
+    assert length(improved) < length(route) - 300
+    assert sorted(improved) == sorted(route)
+    position = improved.index((110, 130))
+    assert {improved[position - 1], improved[(position + 1) % 4]} == {(100, 100), (400, 400)}
+
+
+def test_small_routes_and_repeated_points():
+    assert LocalSearch(DEPOT, [(1, 1)]).improve([(1, 1)])[:2] == ([(1, 1)], 0.0)
+    stops = [(10, 10), (400, 400), (10, 10), (400, 10), (400, 400)]
+    improved, _, _, _ = LocalSearch(DEPOT, stops).improve(stops)
+    assert sorted(improved) == sorted(stops)
+    assert length(improved) <= length(stops)
+
+
+def test_evaluation_budget_is_respected():
+    stops = points(60, 1)
+    _, _, checked, _ = LocalSearch(DEPOT, stops).improve(stops, max_evaluations=50)
+    # The budget is checked between stops, so one stop's moves may overshoot it
+    assert 50 <= sum(checked.values()) < 50 + 4 * 8 * 3
+
+
+def test_memetic_ga_stays_a_permutation_and_is_no_worse():
+    stops = points(30, 2)
+    plain = RouteGASolver(DEPOT, stops, population_size=20, seed=4)
+    memetic = RouteGASolver(DEPOT, stops, population_size=20, seed=4, local_search_budget=5)
+    for _ in range(5):
+        plain.run_generation()
+        memetic.run_generation()
+    for candidate in memetic.population:
+        assert sorted(candidate) == sorted(stops)
+    assert length(memetic.best_solution) <= length(plain.best_solution)
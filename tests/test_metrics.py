@@ -0,0 +1,110 @@
+import numpy as np
+
+from localsearch.metrics import Profiler, SolverMetrics
+from localsearch.tasks.agent import GeneticScheduler
+from localsearch.tasks.environment import Environment
+from localsearch.vrp.constraints import RouteConstraints
+from localsearch.vrp.ga import RouteGASolver
+from localsearch.vrp.sa import SAOptimizer
+
+
+def route(count=12, seed=0):
+    rng = np.random.default_rng(seed)
+    stops = [tuple(p) for p in rng.integers(0, 500, size=(count, 2)).tolist()]
+    return [(250, 250)] + stops + [(250, 250)]
+
+
+def test_sa_counts_every_step():
+    metrics = SolverMetrics()
+    optimizer = SAOptimizer(route(), seed=1, metrics=metrics)
+    for _ in range(500):
+        optimizer.update()
+    snapshot = optimizer.get_metrics()
+    assert snapshot["iterations"] == 500
+    assert snapshot["evaluations"] == 500
+    assert snapshot["proposed"] == {"swap": 500}
+    assert snapshot["accepted"] == {"swap": optimizer.accepted_moves}
+    assert 0 < optimizer.accepted_moves < 500
+    assert set(snapshot["phase_time"]) == {"move", "evaluation"}
+    assert all(seconds > 0 for seconds in snapshot["phase_time"].values())
+    assert snapshot["iterations_per_second"] > 0
+
+
+def test_constrained_sa_counts_relocations():
+    path = route()
+    constraints = RouteConstraints(path[0], path[1:-1], time_windows=[(0.0, 5000.0)] * (len(path) - 2))
+    metrics = SolverMetrics()
+    optimizer = SAOptimizer(path, seed=1, metrics=metrics, constraints=constraints)
+    for _ in range(300):
+        optimizer.update()
+    assert metrics.iterations == metrics.evaluations == metrics.proposed["relocate"] == 300
+    assert metrics.accepted["relocate"] == optimizer.accepted_moves
+
+
+def test_metrics_do_not_change_the_run():
+    plain = SAOptimizer(route(), seed=3)
+    measured = SAOptimizer(route(), seed=3, metrics=SolverMetrics())
+    for _ in range(300):
+        plain.update()
+        measured.update()
+    assert plain.route == measured.route
+    assert plain.get_metrics() is None
+
+
+def test_ga_counts_generations_and_cache_hits():
+    metrics = SolverMetrics()
+    solver = RouteGASolver((250, 250), route()[1:-1], population_size=20, seed=2, metrics=metrics)
+    for _ in range(5):
+        solver.run_generation()
+    snapshot = solver.get_metrics()
+    assert snapshot["iterations"] == 5
+    assert snapshot["proposed"]["ox"] == snapshot["accepted"]["ox"] == 5 * 19
+    # The initial population is scored once and every generation twice (by next_generation
+    # and by run_generation); the second scoring is answered entirely from the cache
+    assert snapshot["evaluations"] + snapshot["cache_hits"] == 20 + 5 * 2 * 20
+    assert snapshot["cache_hits"] >= 5 * 20
+    assert {"selection", "crossover", "mutation", "evaluation"} <= set(snapshot["phase_time"])
+
+
+def test_task_ga_counts_generations():
+    environment = Environment(20, 4, seed=1)
+    population = np.random.default_rng(0).integers(0, 4, size=(10, 20))
+    metrics = SolverMetrics()
+    scheduler = GeneticScheduler(environment.task_durations, environment.task_priorities,
+                                 environment.robot_efficiencies, population, population_size=10,
+                                 seed=1, metrics=metrics)
+    for _ in range(3):
+        scheduler.next_generation()
+    assert metrics.iterations == 3
+    assert metrics.proposed["one_point"] == 30
+    assert metrics.evaluations + metrics.cache_hits >= 30
+
+
+def test_snapshot_is_a_copy_and_reset_clears():
+    metrics = SolverMetrics()
+    metrics.propose("swap", 3)
+    metrics.accept("swap")
+    metrics.add_phase_time("evaluation", 0.5)
+    snapshot = metrics.snapshot()
+    snapshot["proposed"]["swap"] = 99
+    assert metrics.proposed == {"swap": 3}
+    assert snapshot["accepted"] == {"swap": 1} and snapshot["phase_time"] == {"evaluation": 0.5}
+    metrics.reset()
+    assert metrics.snapshot()["proposed"] == {} and metrics.iterations == 0
+
+
+def test_profiler_is_inert_when_off_and_reports_when_on():
+    with Profiler() as profiler:
+        sum(range(1000))
+    assert profiler.report() == ""
+    profiler = Profiler(cpu=True, memory=True)
+    try:
+        with profiler:
+            optimizer = SAOptimizer(route(), seed=1)
+            for _ in range(200):
+                optimizer.update()
+        report = profiler.report()
+    finally:
+        profiler.stop()
+    assert "update" in report
+    assert profiler.memory_peak > 0
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from localsearch.tasks.agent import GeneticScheduler
+from localsearch.tasks.environment import Environment
+from localsearch.tasks.parallel import SharedEvaluator
+
+
+def make_scheduler(environment, evaluator=None, **kwargs):
+    population = np.random.default_rng(0).integers(0, len(environment.robot_efficiencies),
+                                                   size=(30, environment.num_tasks))
+    return GeneticScheduler(environment.task_durations, environment.task_priorities,
+                            environment.robot_efficiencies, population,
+                            population_size=30, mutation_rate=0.1, seed=3, evaluator=evaluator, **kwargs)
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_shared_fitness_matches_serial(workers):
+    environment = Environment(40, 6, seed=1)
+    serial = make_scheduler(environment)
+    population = np.random.default_rng(2).integers(0, 6, size=(50, 40))
+    expected = np.array([serial.fitness(individual) for individual in population])
+    with SharedEvaluator(workers) as evaluator:
+        evaluator.set_problem(environment.task_durations, environment.task_priorities,
+                              environment.robot_efficiencies, np.arange(6))
+        np.testing.assert_allclose(evaluator.evaluate(population), expected)
+        # The same rows built in the shared block are scored in place
+        shared = evaluator.allocate(population.shape, population.dtype)
+        shared[:] = population
+        np.testing.assert_allclose(evaluator.evaluate(shared), expected)
+
+
+@pytest.mark.parametrize("steady_state", [False, True])
+def test_population_lives_in_shared_memory(steady_state):
+    environment = Environment(30, 5, seed=4)
+    with SharedEvaluator(0) as evaluator:
+        scheduler = make_scheduler(environment, evaluator, steady_state=steady_state)
+        for _ in range(5):
+            scheduler.next_generation()
+            assert evaluator._is_shared(scheduler.population)
+        # Serial and in-process shared scoring evolve the same populations
+        reference = make_scheduler(environment, steady_state=steady_state)
+        for _ in range(5):
+            reference.next_generation()
+        np.testing.assert_array_equal(scheduler.population, reference.population)
+        assert scheduler.best_fitness == pytest.approx(reference.best_fitness)
+
+
+def test_workers_match_in_process_scoring():
+    environment = Environment(60, 8, seed=5)
+    results = []
+    for workers in (0, 2):
+        with SharedEvaluator(workers) as evaluator:
+            scheduler = make_scheduler(environment, evaluator)
+            for _ in range(10):
+                scheduler.next_generation()
+            results.append((scheduler.population.copy(), scheduler.best_fitness))
+    np.testing.assert_array_equal(results[0][0], results[1][0])
+    assert results[0][1] == results[1][1]
+
+
+def test_repair_moves_to_a_larger_block():
+    environment = Environment(20, 4, seed=6)
+    environment.generate_events(50.0)
+    with SharedEvaluator(2) as evaluator:
+        scheduler = make_scheduler(environment, evaluator)
+        for step in range(1, 30):
+            columns = environment.advance(step * 2.0)
+            if columns is not None:
+                scheduler.repair(environment.task_durations, environment.task_priorities, columns,
+                                 np.flatnonzero(environment.robots_online))
+            scheduler.next_generation()
+            assert evaluator._is_shared(scheduler.population)
+            expected = [scheduler.fitness(individual) for individual in scheduler.population]
+            np.testing.assert_allclose(scheduler.evaluate(scheduler.population), expected)
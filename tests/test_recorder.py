@@ -0,0 +1,118 @@
+import json
+import threading
+
+import numpy as np
+import pytest
+
+from localsearch.recorder import TraceRecorder
+
+
+def record_run(recorder, iterations):
+    """Record like a solver does: only iterations that reach next_record."""
+    for iteration in range(iterations):
+        if iteration >= recorder.next_record:
+            recorder.record(iteration, (2.0 * iteration, -iteration))
+
+
+def test_history_halves_and_stride_doubles():
+    recorder = TraceRecorder(("value", "other"), capacity=8)
+    record_run(recorder, 4)
+    assert recorder.every == 1
+    np.testing.assert_array_equal(recorder.curve("value")[0], [0, 1, 2, 3])
+    record_run(recorder, 1000)
+    iterations, values = recorder.curve("value")
+    # Between capacity / 2 and capacity evenly spaced rows, one per stride
+    assert 4 <= len(iterations) <= 8
+    assert recorder.every == 256
+    np.testing.assert_array_equal(iterations, np.arange(len(iterations)) * 256)
+    np.testing.assert_array_equal(values, 2.0 * iterations)
+
+
+def test_rows_stay_evenly_spaced_from_a_late_start():
+    recorder = TraceRecorder(("value", "other"), capacity=8)
+    for iteration in range(5, 300):
+        if iteration >= recorder.next_record:
+            recorder.record(iteration, (2.0 * iteration, -iteration))
+    iterations = recorder.curve("value")[0]
+    np.testing.assert_array_equal(iterations, 5 + np.arange(len(iterations)) * recorder.every)
+
+
+def test_recent_returns_the_last_rows_oldest_first():
+    recorder = TraceRecorder(("value", "other"), capacity=4)
+    for iteration in range(10):
+        recorder.record(iteration, (2.0 * iteration, -iteration))
+    np.testing.assert_array_equal(recorder.recent()[:, 0], [6, 7, 8, 9])
+    np.testing.assert_array_equal(recorder.recent(2)[:, 1], [16, 18])
+
+
+def test_rejects_bad_capacity_and_path(tmp_path):
+    with pytest.raises(ValueError):
+        TraceRecorder(("value",), capacity=7)
+    with pytest.raises(ValueError):
+        TraceRecorder(("value",), path=str(tmp_path / "trace.csv"))
+
+
+def read_jsonl(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_jsonl_round_trip(tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+    with TraceRecorder(("value", "other"), capacity=64, path=path, flush_interval=0.01) as recorder:
+        for iteration in range(20):
+            recorder.record(iteration, (2.0 * iteration, -iteration))
+    rows = read_jsonl(path)
+    assert rows == [{"iteration": k, "value": 2.0 * k, "other": -k} for k in range(20)]
+    assert recorder.dropped == 0
+
+
+def test_npz_round_trip(tmp_path):
+    path = str(tmp_path / "trace.npz")
+    with TraceRecorder(("value", "other"), capacity=16, path=path, flush_interval=0.01) as recorder:
+        for iteration in range(12):
+            recorder.record(iteration, (2.0 * iteration, -iteration))
+            recorder.flush()
+    with np.load(path) as data:
+        assert sorted(data.files) == ["iteration", "other", "value"]
+        np.testing.assert_array_equal(data["iteration"], np.arange(12))
+        np.testing.assert_array_equal(data["value"], 2.0 * np.arange(12))
+
+
+def test_overwritten_rows_are_counted_as_dropped(tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+    recorder = TraceRecorder(("value", "other"), capacity=8, path=path, flush_interval=60)
+    # Holding the lock keeps the writer thread away while the ring wraps three times
+    with recorder._lock:
+        for iteration in range(30):
+            recorder.record(iteration, (2.0 * iteration, -iteration))
+    recorder.close()
+    rows = read_jsonl(path)
+    # One slot stays as headroom for the row being written, so 7 of the last 8 survive
+    assert [row["iteration"] for row in rows] == list(range(23, 30))
+    assert recorder.dropped == 23
+    assert recorder.dropped + len(rows) == recorder.written
+
+
+def test_concurrent_flushes_never_write_torn_rows(tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+    recorder = TraceRecorder(("value", "other"), capacity=4, path=path, flush_interval=0)
+    stop = threading.Event()
+
+    def flush_constantly():
+        while not stop.is_set():
+            recorder.flush()
+    flusher = threading.Thread(target=flush_constantly)
+    flusher.start()
+    try:
+        for iteration in range(20000):
+            recorder.record(iteration, (2.0 * iteration, -iteration))
+    finally:
+        stop.set()
+        flusher.join()
+    recorder.close()
+    rows = read_jsonl(path)
+    iterations = [row["iteration"] for row in rows]
+    assert iterations == sorted(set(iterations))
+    assert all(row["value"] == 2.0 * row["iteration"] and row["other"] == -row["iteration"] for row in rows)
+    assert recorder.dropped + len(rows) == recorder.written
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from localsearch.tasks.agent import GeneticScheduler
+from localsearch.tasks.environment import Environment
+
+
+def scheduler(environment, **options):
+    population = np.random.default_rng(0).integers(0, environment.num_robots, size=(20, environment.num_tasks))
+    return GeneticScheduler(environment.task_durations, environment.task_priorities,
+                            environment.robot_efficiencies, population, population_size=20, seed=1, **options)
+
+
+def online_robots(environment):
+    return np.flatnonzero(environment.robots_online)
+
+
+def assert_only_online(solver, environment):
+    offline = ~environment.robots_online
+    assert not offline[solver.population].any()
+    assert not offline[solver.best_solution].any()
+
+
+@pytest.mark.parametrize("steady_state", [False, True], ids=["generational", "steady_state"])
+def test_offline_robots_never_get_tasks(steady_state):
+    environment = Environment(30, 5, seed=2)
+    solver = scheduler(environment, steady_state=steady_state)
+    for _ in range(5):
+        solver.next_generation()
+    environment.schedule_event(1.0, "offline", 1)
+    environment.schedule_event(1.0, "offline", 3)
+    environment.schedule_event(1.0, "arrive", 5, 2)
+    environment.schedule_event(1.0, "complete", 0)
+    previous = solver.population.copy()
+    columns = environment.advance(1.0)
+    solver.repair(environment.task_durations, environment.task_priorities, columns, online_robots(environment))
+    assert_only_online(solver, environment)
+    # Surviving tasks on robots still online keep their robot in every row but the greedy best
+    survivors = columns >= 0
+    kept = previous[1:, columns[survivors]]
+    still_online = environment.robots_online[kept]
+    np.testing.assert_array_equal(solver.population[1:, survivors][still_online], kept[still_online])
+    # Mutation, steady-state genes and duplicate removal draw only from the robots online
+    for _ in range(20):
+        solver.next_generation()
+        assert_only_online(solver, environment)
+
+
+def test_greedy_assign_picks_the_earliest_finishing_online_robot():
+    environment = Environment(6, 3, seed=0)
+    solver = scheduler(environment)
+    solver.robot_efficiencies = np.array([1.0, 4.0, 1.0])
+    solver.task_durations = np.array([4, 4, 4, 4, 4, 4])
+    solver.task_priorities = np.ones(6, dtype=int)
+    solver.robots = np.array([0, 2])  # the fast robot 1 is offline
+    individual = np.zeros(6, dtype=int)
+    solver.greedy_assign(individual, np.arange(6))
+    assert set(individual.tolist()) == {0, 2}
+    assert np.bincount(individual, minlength=3).tolist() == [3, 0, 3]
+    # Placed tasks count: robot 0 already carries the first four, so both new ones go to 2
+    individual = np.array([0, 0, 0, 0, 1, 1])
+    solver.greedy_assign(individual, np.array([4, 5]))
+    assert individual.tolist() == [0, 0, 0, 0, 2, 2]
+
+
+def test_random_event_stream_keeps_every_schedule_on_online_robots():
+    environment = Environment(15, 4, seed=5)
+    environment.generate_events(60.0, offline_rate=0.05, repair_time=8.0)
+    solver = scheduler(environment)
+    went_offline = False
+    for time in np.arange(2.0, 62.0, 2.0):
+        columns = environment.advance(time)
+        if columns is not None:
+            solver.repair(environment.task_durations, environment.task_priorities, columns,
+                          online_robots(environment))
+            went_offline |= not environment.robots_online.all()
+        for _ in range(3):
+            solver.next_generation()
+        assert environment.robots_online.any()
+        assert solver.population.shape[1] == environment.num_tasks
+        assert_only_online(solver, environment)
+    assert went_offline
+
+
+def test_last_robot_stays_online_and_quiet_steps_change_nothing():
+    environment = Environment(5, 2, seed=0)
+    environment.schedule_event(1.0, "offline", 0)
+    environment.schedule_event(1.0, "offline", 1)
+    environment.advance(1.0)
+    assert environment.robots_online.tolist() == [False, True]
+    assert environment.advance(2.0) is None
@@ -0,0 +1,101 @@
+import os
+
+import numpy as np
+import pytest
+
+from localsearch.vrp import roads
+from localsearch.vrp.roads import RoadNetwork
+
+
+def random_graph(seed, nodes=40, edges=90):
+    rng = np.random.default_rng(seed)
+    node_xy = rng.uniform(0, 500, size=(nodes, 2))
+    # A chain keeps every node connected; the extra edges add shortcuts
+    tails = list(range(nodes - 1)) + rng.integers(0, nodes, size=edges).tolist()
+    heads = list(range(1, nodes)) + rng.integers(0, nodes, size=edges).tolist()
+    costs = rng.uniform(1, 50, size=len(tails))
+    return node_xy, tails, heads, costs
+
+
+def floyd_warshall(count, tails, heads, costs, directed):
+    """All-pairs costs, independent of the Dijkstra in roads.py."""
+    dist = np.full((count, count), np.inf)
+    np.fill_diagonal(dist, 0.0)
+    for tail, head, cost in zip(tails, heads, costs):
+        dist[tail, head] = min(dist[tail, head], cost)
+        if not directed:
+            dist[head, tail] = min(dist[head, tail], cost)
+    for k in range(count):
+        dist = np.minimum(dist, dist[:, k:k + 1] + dist[k:k + 1, :])
+    return dist
+
+
+def stops(node_xy, seed, count=12):
+    """Points jittered around random nodes, so they snap back to those nodes (repeats included)."""
+    rng = np.random.default_rng(seed)
+    chosen = rng.integers(0, len(node_xy), size=count)
+    return [tuple(p) for p in (node_xy[chosen] + rng.uniform(-1e-3, 1e-3, size=(count, 2))).tolist()], chosen
+
+
+@pytest.mark.parametrize("directed", [False, True], ids=["two_way", "directed"])
+@pytest.mark.parametrize("seed", range(3))
+def test_cost_matrix_matches_all_pairs_shortest_paths(directed, seed):
+    node_xy, tails, heads, costs = random_graph(seed)
+    if directed:
+        # The reverse chain keeps every node reachable from every other
+        tails, heads = tails + list(range(1, len(node_xy))), heads + list(range(len(node_xy) - 1))
+        costs = np.concatenate([costs, np.full(len(node_xy) - 1, 100.0)])
+    network = RoadNetwork(node_xy, tails, heads, costs, directed=directed)
+    points, chosen = stops(node_xy, seed)
+    expected = floyd_warshall(len(node_xy), tails, heads, costs, directed)[np.ix_(chosen, chosen)]
+    distances = network.cost_matrix(points, workers=0, dtype=np.float64)
+    np.testing.assert_allclose(distances.matrix, expected)
+    assert distances(points[0], points[1]) == pytest.approx(expected[0, 1])
+
+
+def test_worker_processes_match_in_process():
+    network = RoadNetwork(*random_graph(4))
+    points, _ = stops(network.node_xy, 4)
+    serial = network.cost_matrix(points, workers=0)
+    parallel = network.cost_matrix(points, workers=2)
+    np.testing.assert_array_equal(serial.matrix, parallel.matrix)
+
+
+def test_cached_matrix_is_reused(tmp_path, monkeypatch):
+    network = RoadNetwork(*random_graph(5))
+    points, _ = stops(network.node_xy, 5)
+    first = network.cost_matrix(points, cache_dir=str(tmp_path), workers=0)
+    assert len(os.listdir(tmp_path)) == 1
+
+    def fail(*args):
+        raise AssertionError("the cached matrix was recomputed")
+    monkeypatch.setattr(roads, "_rows", fail)
+    second = network.cost_matrix(points, cache_dir=str(tmp_path), workers=0)
+    assert isinstance(second.matrix, np.memmap)
+    assert second.key == first.key
+    np.testing.assert_array_equal(second.matrix, first.matrix)
+    # Another instance on the same graph gets its own file
+    monkeypatch.undo()
+    network.cost_matrix(points[:5], cache_dir=str(tmp_path), workers=0)
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_disconnected_stops_raise_and_leave_no_file(tmp_path):
+    node_xy = [(0, 0), (10, 0), (100, 100)]
+    network = RoadNetwork(node_xy, [0], [1], [5.0])
+    with pytest.raises(ValueError):
+        network.cost_matrix([(0, 0), (100, 100)], cache_dir=str(tmp_path), workers=0)
+    assert os.listdir(tmp_path) == []
+
+
+def test_from_files_maps_arbitrary_node_ids(tmp_path):
+    nodes = tmp_path / "nodes.csv"
+    edges = tmp_path / "edges.csv"
+    nodes.write_text("# id,x,y\n9001,0,0\n42,10,0\n777,10,10\n")
+    edges.write_text("# tail,head,cost\n9001,42,3\n42,777,4\n9001,777,10\n")
+    network = RoadNetwork.from_files(str(nodes), str(edges))
+    distances = network.cost_matrix([(0, 0), (10, 10)], workers=0)
+    assert distances((0, 0), (10, 10)) == 7.0
+    edges.write_text("9001,5,3\n")
+    with pytest.raises(ValueError):
+        RoadNetwork.from_files(str(nodes), str(edges))
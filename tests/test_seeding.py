@@ -0,0 +1,86 @@
+import random
+
+import numpy as np
+
+from localsearch.tasks.agent import GeneticScheduler
+from localsearch.tasks.environment import Environment as TaskEnvironment
+from localsearch.vrp.environment import VRPEnvironment
+from localsearch.vrp.ga import RouteGASolver, VRPAgentGenetic
+from localsearch.vrp.sa import SAOptimizer, VRPAgentSimulatedAnnealing
+
+
+def route(count=15, seed=0):
+    rng = np.random.default_rng(seed)
+    stops = [tuple(p) for p in rng.integers(0, 500, size=(count, 2)).tolist()]
+    return [(250, 250)] + stops + [(250, 250)]
+
+
+def anneal(optimizer, steps=2000):
+    for _ in range(steps):
+        optimizer.update()
+    return optimizer.route
+
+
+def test_same_seed_same_run_and_different_seeds_differ():
+    assert anneal(SAOptimizer(route(), seed=7)) == anneal(SAOptimizer(route(), seed=7))
+    assert anneal(SAOptimizer(route(), seed=7)) != anneal(SAOptimizer(route(), seed=8))
+
+
+def test_solvers_side_by_side_do_not_disturb_each_other():
+    alone = anneal(SAOptimizer(route(), seed=3))
+    ga_alone = RouteGASolver((250, 250), route()[1:-1], population_size=20, seed=3)
+    for _ in range(5):
+        ga_alone.run_generation()
+
+    first = SAOptimizer(route(), seed=3)
+    other = SAOptimizer(route(), seed=4)
+    ga = RouteGASolver((250, 250), route()[1:-1], population_size=20, seed=3)
+    for step in range(2000):
+        first.update()
+        other.update()
+        # Draws from the global generators must not leak into the solvers either
+        random.random()
+        np.random.random()
+        if step % 400 == 0:
+            ga.run_generation()
+    assert first.route == alone
+    assert ga.population == ga_alone.population
+
+
+def test_agents_give_every_vehicle_its_own_stream():
+    # Identical routes still anneal differently, since each optimizer has a child stream
+    agent = VRPAgentSimulatedAnnealing((250, 250), route()[1:-1], 3)
+    optimizers = agent.create_optimizers([route()] * 3, seed=5)
+    assert len({tuple(anneal(optimizer)) for optimizer in optimizers}) == 3
+    again = agent.create_optimizers([route()] * 3, seed=np.random.SeedSequence(5))
+    assert [anneal(optimizer) for optimizer in again] == [optimizer.route for optimizer in optimizers]
+
+    deliveries = route(30)[1:-1]
+    first = VRPAgentGenetic((250, 250), deliveries, 3, population_size=20, seed=5)
+    second = VRPAgentGenetic((250, 250), deliveries, 3, population_size=20, seed=5)
+    for _ in range(3):
+        first.run_generation()
+        second.run_generation()
+    assert first.get_best_routes() == second.get_best_routes()
+
+
+def test_environments_are_reproducible():
+    first, second = VRPEnvironment(800, 600, 20, seed=11), VRPEnvironment(800, 600, 20, seed=11)
+    assert first.deliveries == second.deliveries
+    assert first.deliveries != VRPEnvironment(800, 600, 20, seed=12).deliveries
+    tasks = TaskEnvironment(30, 5, seed=11)
+    np.testing.assert_array_equal(tasks.task_durations, TaskEnvironment(30, 5, seed=11).task_durations)
+
+
+def test_task_scheduler_is_reproducible():
+    environment = TaskEnvironment(20, 4, seed=1)
+    population = np.random.default_rng(0).integers(0, 4, size=(10, 20))
+
+    def run(seed):
+        scheduler = GeneticScheduler(environment.task_durations, environment.task_priorities,
+                                     environment.robot_efficiencies, population, population_size=10, seed=seed)
+        for _ in range(10):
+            scheduler.next_generation()
+        return scheduler.population
+    np.testing.assert_array_equal(run(2), run(2))
+    assert not np.array_equal(run(2), run(3))
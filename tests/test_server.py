@@ -0,0 +1,121 @@
+import asyncio
+import json
+
+import pytest
+
+from solve_service.client import ServiceError, SolveClient
+from solve_service.server import SolveService
+from solve_service.workers import check_params
+
+VRP = {"depot": [300, 400], "deliveries": [[100, 120], [500, 700], [250, 600], [420, 90], [330, 330]],
+       "num_vehicles": 2, "seed": 1}
+
+
+def serve(test):
+    """Run `test(service, port)` against a service on a free local port."""
+    async def main():
+        service = SolveService(workers=1, slice_seconds=0.05)
+        await service.start()
+        server = await asyncio.start_server(service.handle_connection, "127.0.0.1", 0)
+        try:
+            async with server:
+                return await test(service, server.sockets[0].getsockname()[1])
+        finally:
+            await service.close()
+    return asyncio.run(main())
+
+
+async def raw_post(port, body, content_length=None):
+    """POST `body` bytes to /jobs; returns (status, decoded JSON)."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    length = len(body) if content_length is None else content_length
+    writer.write(b"POST /jobs HTTP/1.1\r\nHost: test\r\nConnection: close\r\n"
+                 b"Content-Length: %s\r\n\r\n%s" % (str(length).encode(), body))
+    await writer.drain()
+    response = await asyncio.wait_for(reader.read(), 10)
+    writer.close()
+    head, _, data = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(data)
+
+
+def test_valid_job_runs_to_completion():
+    async def test(service, port):
+        async with SolveClient(port=port) as client:
+            job = await client.submit("vrp-sa", VRP)
+            assert job["status"] == "queued"
+            while job["status"] not in ("done", "failed"):
+                await asyncio.sleep(0.05)
+                job = await client.request("GET", f"/jobs/{job['id']}")
+            return job
+    job = serve(test)
+    assert job["status"] == "done"
+    assert sorted(map(tuple, sum((route[1:-1] for route in job["result"]["routes"]), []))) == \
+        sorted(map(tuple, VRP["deliveries"]))
+
+
+@pytest.mark.parametrize("payload", [
+    {"kind": ["vrp-sa"], "params": VRP},
+    {"kind": {"a": 1}, "params": VRP},
+    {"kind": "vrp-xx", "params": VRP},
+    {"kind": "vrp-sa", "params": [1, 2]},
+    {"kind": "vrp-sa", "params": {"depot": [0, 0]}},
+    {"kind": "vrp-sa", "params": VRP, "deadline": "soon"},
+    {"kind": "vrp-sa", "params": VRP, "deadline": True},
+    {"kind": "vrp-sa", "params": VRP, "deadline": -1},
+    {"kind": "vrp-sa", "params": VRP, "deadline": [5]},
+    ["vrp-sa"],
+    "vrp-sa",
+    {"kind": "vrp-sa", "params": {**VRP, "deliveries": "abc"}},
+    {"kind": "vrp-sa", "params": {**VRP, "deliveries": []}},
+    {"kind": "vrp-sa", "params": {**VRP, "deliveries": [[1, 2], [3]]}},
+    {"kind": "vrp-sa", "params": {**VRP, "depot": [0, "x"]}},
+    {"kind": "vrp-sa", "params": {**VRP, "num_vehicles": 0}},
+    {"kind": "vrp-sa", "params": {**VRP, "num_vehicles": 2.5}},
+    {"kind": "vrp-sa", "params": {**VRP, "num_vehicles": True}},
+    {"kind": "vrp-sa", "params": {**VRP, "cooling_rate": 1.5}},
+    {"kind": "vrp-sa", "params": {**VRP, "initial_temp": None}},
+    {"kind": "vrp-sa", "params": {**VRP, "seed": -1}},
+    {"kind": "vrp-sa", "params": {**VRP, "demands": [1, 2]}},
+    {"kind": "vrp-sa", "params": {**VRP, "time_windows": [[5, 1]] * 5}},
+    {"kind": "vrp-ga", "params": {**VRP, "population_size": 1}},
+    {"kind": "vrp-ga", "params": {**VRP, "generations": "many"}},
+    {"kind": "tasks", "params": {"task_durations": [1, 2], "task_priorities": [1], "robot_efficiencies": [1.0]}},
+    {"kind": "tasks", "params": {"task_durations": [1], "task_priorities": [1], "robot_efficiencies": [0]}},
+])
+def test_invalid_post_returns_400(payload):
+    async def test(service, port):
+        return await raw_post(port, json.dumps(payload).encode())
+    status, data = serve(test)
+    assert status == 400
+    assert "error" in data
+
+
+def test_valid_optional_params_are_accepted():
+    check_params("vrp-sa", {**VRP, "seed": None, "demands": [1] * 5, "capacity": 10, "time_windows": [[0, 100]] * 5,
+                            "cooling_rate": 0.99, "iterations": 100, "unknown": "ignored"})
+    check_params("tasks", {"task_durations": [1, 2], "task_priorities": [3, 1], "robot_efficiencies": [0.5, 1.5],
+                           "population_size": 10, "steady_state": True, "stagnation_limit": None})
+
+
+@pytest.mark.parametrize("body, length", [(b"{not json", None), (b"\xff\xfe", None), (b"{}", "ten")])
+def test_malformed_body_returns_400(body, length):
+    async def test(service, port):
+        return await raw_post(port, body, length)
+    status, _ = serve(test)
+    assert status == 400
+
+
+def test_deadline_stops_a_job():
+    async def test(service, port):
+        async with SolveClient(port=port) as client:
+            job = await client.submit("vrp-sa", VRP, deadline=0)
+            job = await client.request("GET", f"/jobs/{job['id']}")
+            while job["status"] in ("queued", "running"):
+                await asyncio.sleep(0.05)
+                job = await client.request("GET", f"/jobs/{job['id']}")
+            with pytest.raises(ServiceError) as error:
+                await client.request("GET", "/jobs/missing")
+            return job, error.value.status
+    job, status = serve(test)
+    assert job["status"] == "timed_out"
+    assert status == 404
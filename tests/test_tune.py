@@ -0,0 +1,88 @@
+import pytest
+
+from solve_service import tune, workers
+from solve_service.tune import SuccessiveHalvingTuner, TrialCache
+
+
+def fake_trials(monkeypatch):
+    """Replace run_trial with one whose objective is the config's mutation_rate; returns the calls."""
+    calls = []
+
+    def run_trial(kind, params, time_limit):
+        calls.append(params)
+        return {"objective": params["mutation_rate"] * (1 + params["seed"]), "seconds": 0.0,
+                "done": True, "time_limit": time_limit}
+    monkeypatch.setattr(tune, "run_trial", run_trial)
+    return calls
+
+
+def configs(count):
+    return [{"population_size": 20, "mutation_rate": 0.01 * (count - k)} for k in range(count)]
+
+
+def instances(count):
+    return [{"task_durations": [1], "task_priorities": [1], "robot_efficiencies": [1.0], "seed": k}
+            for k in range(count)]
+
+
+def test_rungs_promote_the_best_third(tmp_path, monkeypatch):
+    calls = fake_trials(monkeypatch)
+    logs = []
+    tuner = SuccessiveHalvingTuner("tasks", TrialCache(str(tmp_path / "trials.jsonl")), log=logs.append)
+    best, score, count = tuner.run(configs(9), instances(9))
+    # 9 configs on 1 instance, the best 3 on 3 instances, the best one on all 9
+    assert [line.split(":")[1].strip() for line in logs] == [
+        "9 configs on 1 instances, best gap 0.0000", "3 configs on 3 instances, best gap 0.0000",
+        "1 configs on 9 instances, best gap 0.0000"]
+    assert len(calls) == 9 + 3 * 2 + 6
+    assert best == configs(9)[-1] and score == 0.0 and count == 9
+    # The survivors of the first rung are the three lowest objectives
+    assert {params["mutation_rate"] for params in calls if params["seed"] == 1} == {0.01, 0.02, 0.03}
+    # Every trial runs the fixed generation budget
+    assert all(params["generations"] == tune.FIXED_PARAMS["tasks"]["generations"] for params in calls)
+
+
+def test_resumed_sweep_reruns_no_finished_trial(tmp_path, monkeypatch):
+    path = str(tmp_path / "trials.jsonl")
+    calls = fake_trials(monkeypatch)
+    first = SuccessiveHalvingTuner("tasks", TrialCache(path), log=lambda line: None).run(configs(9), instances(9))
+    trials = len(calls)
+    with open(path, "a") as f:
+        f.write('{"key": "cut sho')  # a line cut short by an interruption
+    second = SuccessiveHalvingTuner("tasks", TrialCache(path), log=lambda line: None).run(configs(9), instances(9))
+    assert second == first
+    assert len(calls) == trials
+    # A different budget is a different trial
+    SuccessiveHalvingTuner("tasks", TrialCache(path), log=lambda line: None,
+                           budget={"generations": 5}).run(configs(3), instances(1))
+    assert len(calls) == trials + 3
+
+
+def test_trials_cut_short_are_rerun_with_a_longer_limit(tmp_path):
+    cache = TrialCache(str(tmp_path / "trials.jsonl"))
+    cache.add("capped", {"objective": 1.0, "seconds": 1.0, "done": False, "time_limit": 1.0})
+    cache.add("finished", {"objective": 1.0, "seconds": 1.0, "done": True, "time_limit": 1.0})
+    assert cache.get("capped", 1.0) is not None
+    assert cache.get("capped", 2.0) is None
+    assert cache.get("finished", 2.0) is not None
+
+
+def test_budgeted_trials_are_reproducible():
+    params = {**tune.make_instance("vrp-sa", (12, 2), 3), "iterations": 3000, **tune.DEFAULTS["vrp-sa"]}
+    first = tune.run_trial("vrp-sa", params, 60.0)
+    second = tune.run_trial("vrp-sa", params, 60.0)
+    assert first["done"] and second["done"]
+    assert first["objective"] == second["objective"]
+    _, progress, _, done = workers.run_slice("vrp-sa", params, None, 60.0)
+    assert done and progress["iteration"] == 3000
+    # The iteration budget ended the run, well before the temperature (about 8300 iterations)
+    assert tune.run_trial("vrp-sa", {**params, "iterations": 6000}, 60.0)["objective"] <= first["objective"]
+    capped = tune.run_trial("vrp-sa", {**params, "iterations": 10 ** 9, "cooling_rate": 0.999999}, 0.05)
+    assert not capped["done"]
+
+
+def test_rejects_bad_settings(tmp_path):
+    cache = TrialCache(str(tmp_path / "trials.jsonl"))
+    for options in ({"time_limit": 0}, {"eta": 1}, {"min_instances": 0}):
+        with pytest.raises(ValueError):
+            SuccessiveHalvingTuner("tasks", cache, **options)